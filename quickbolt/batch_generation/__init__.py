@@ -1 +1 @@
-from quickbolt.batch_generation.batch_generation import generate_batch
+from quickbolt.batch_generation.batch_generation import generate_batch, iter_batch
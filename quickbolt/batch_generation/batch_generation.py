@@ -1,9 +1,13 @@
 import itertools as it
 import re
+from hashlib import blake2b
 from itertools import combinations
 from math import ceil
+from typing import Iterator
 from urllib.parse import parse_qs, urlencode, urlparse
 
+import orjson
+
 import quickbolt.utils.dictionary as dh
 import quickbolt.utils.json as jh
 
@@ -40,6 +44,57 @@ def generate_batch(
     Returns:
         batch: The list of 200-500 request corruptions.
     """
+    return list(
+        iter_batch(
+            method,
+            url,
+            description=description,
+            headers=headers,
+            json=json,
+            data=data,
+            bad_header_count=bad_header_count,
+            unsafe_bodies=unsafe_bodies,
+            corrupt_query_params=corrupt_query_params,
+            min=min,
+            corrupt_keys=corrupt_keys,
+        )
+    )
+
+
+def iter_batch(
+    method: str,
+    url: str,
+    description: str = "",
+    headers: None | dict = None,
+    json: None | dict = None,
+    data: None | dict = None,
+    bad_header_count: int = 1,
+    unsafe_bodies: bool = False,
+    corrupt_query_params: bool = True,
+    min: bool = True,
+    corrupt_keys: bool = False,
+) -> Iterator[dict]:
+    """
+    This lazily generates the batch of generate_batch, in the same order, so each
+    corruption is only made when it's needed. It can be passed straight to the
+    aio_requests.async_request loader, which sends the first requests right away.
+
+    Args:
+        method: The method of the request.
+        url: A 200 type url(a passing request).
+        description: A description of the request.
+        headers: The headers of the request.
+        json: A json (dict) body of the request.
+        data: A data (dict) body of the request.
+        bad_header_count: The amount of bad header possibilities used.
+        unsafe_bodies: Whether to include unsafe bodies in the batch.
+        corrupt_query_params: Whether to corrupt the query params.
+        min: Whether to give the minimum amount of corruptions.
+        corrupt_keys: Whether to corrupt the keys of a data set.
+
+    Returns:
+        batch: The generator of 200-500 request corruptions.
+    """
     method = method.lower()
     good_code = {
         "get": "200",
@@ -50,116 +105,48 @@ def generate_batch(
     }[method]
 
     headers = headers or {}
-    bad_headers = []
-    if headers:
-        bad_headers = generate_bad_bodies(headers, min=min)[:bad_header_count]
-
     invalid_sub_values = {"str": "aaa", "digit": "999"}
-    invalid_urls = generate_bad_urls(url, invalid_sub_values, corrupt_query_params, min)
-    not_found_urls = generate_bad_urls(
-        url, corrupt_query_params=corrupt_query_params, min=min
-    )
-
     clean_url = url.replace(";", "")
     if description:
         description += " "
 
-    batch = [
-        *[
-            {
-                "code": good_code,
-                "description": f"{description}good",
-                "method": method,
-                "headers": headers,
-                "url": clean_url,
-            }
-        ],
-        *[
-            {
-                "code": "400",
-                "description": f"{description}invalid",
-                "method": method,
-                "headers": headers,
-                "url": u,
-            }
-            for u in invalid_urls
-        ],
-        *[
-            {
-                "code": "401",
-                "description": f"{description}not auth",
-                "method": method,
-                "headers": h,
-                "url": clean_url,
-            }
-            for h in bad_headers
-        ],
-        *[
-            {
-                "code": "404",
-                "description": f"{description}not found",
-                "method": method,
-                "headers": headers,
-                "url": u,
-            }
-            for u in not_found_urls
-        ],
-    ]
-
-    if json or data:
-        body = json
-        key = "json"
-        if data:
-            body = data
-            key = "data"
+    body = data or json
+    key = "data" if data else "json"
 
-        for b in batch:
-            b[key] = body
-
-        good_batch = {
-            "code": good_code,
-            "description": f"{description}good",
+    def entry(code, text, entry_headers=headers, entry_url=clean_url, entry_body=body):
+        e = {
+            "code": code,
+            "description": f"{description}{text}",
             "method": method,
-            "headers": headers,
-            "url": clean_url,
+            "headers": entry_headers,
+            "url": entry_url,
         }
+        if body:
+            e[key] = entry_body
+        return e
 
-        bad_bodies_batch = [
-            *[
-                {
-                    **good_batch,
-                    **{key: b, "description": f"{description}invalid"},
-                    "code": "400",
-                }
-                for b in generate_bad_bodies(
-                    body, invalid_sub_values, min=min, corrupt_keys=corrupt_keys
-                )
-            ],
-            *[
-                {
-                    **good_batch,
-                    **{key: b, "description": f"{description}not found"},
-                    "code": "404",
-                }
-                for b in generate_bad_bodies(body, min=min, corrupt_keys=corrupt_keys)
-            ],
-        ]
+    # the entries are yielded in the order of their codes, like a sorted batch
+    yield entry(good_code, "good")
 
-        if unsafe_bodies:
-            extra_batch = [
-                {
-                    **good_batch,
-                    **{key: b, "description": f"{description}unsafe bodies"},
-                    "code": "???",
-                }
-                for b in generate_unsafe_bodies(body)
-            ]
-            bad_bodies_batch.extend(extra_batch)
+    for u in iter_bad_urls(url, invalid_sub_values, corrupt_query_params, min):
+        yield entry("400", "invalid", entry_url=u)
+    if body:
+        for b in iter_bad_bodies(body, invalid_sub_values, min, corrupt_keys):
+            yield entry("400", "invalid", entry_body=b)
 
-        batch.extend(bad_bodies_batch)
-        batch.sort(key=lambda k: k["code"].split("|")[0])
+    if headers:
+        for h in it.islice(iter_bad_bodies(headers, min=min), bad_header_count):
+            yield entry("401", "not auth", entry_headers=h)
+
+    for u in iter_bad_urls(url, corrupt_query_params=corrupt_query_params, min=min):
+        yield entry("404", "not found", entry_url=u)
+    if body:
+        for b in iter_bad_bodies(body, min=min, corrupt_keys=corrupt_keys):
+            yield entry("404", "not found", entry_body=b)
 
-    return batch
+        if unsafe_bodies:
+            for b in generate_unsafe_bodies(body):
+                yield entry("???", "unsafe bodies", entry_body=b)
 
 
 def generate_bad_urls(
@@ -180,6 +167,27 @@ def generate_bad_urls(
     Returns:
         bad_urls: The list of bad urls for the request.
     """
+    return list(iter_bad_urls(url, sub_values, corrupt_query_params, min))
+
+
+def iter_bad_urls(
+    url: str,
+    sub_values: None | dict = None,
+    corrupt_query_params: bool = True,
+    min: bool = True,
+) -> Iterator[str]:
+    """
+    This lazily generates the unique bad urls of generate_bad_urls.
+
+    Args:
+        data: A 200 type url.
+        sub_values: Regex type substitutes for char type replacements.
+        corrupt_query_params: Whether to corrupt the query params.
+        min: Whether to give the minimum amount of corruptions.
+
+    Returns:
+        bad_urls: The generator of bad urls for the request.
+    """
     parsed = urlparse(url)
 
     query = parsed.query
@@ -200,15 +208,13 @@ def generate_bad_urls(
     if corrupt_query_params:
         corruptables.update(query_dict)
     corruptables = dh.flatten(corruptables)
-    corruptables_ser = jh.serialize(corruptables)
+    corruptables_ser = jh.serialize(corruptables, compact=True)
 
-    bad_combos_des = generate_bad_data(corruptables_ser, corruptables, sub_values, min)
-    bad_combos_unfl = [dh.unflatten(b) for b in bad_combos_des]
-
-    bad_urls = []
+    seen = set()
     clean_url = url.replace(";", "")
     base_url = marked_url.split(";")[0].lstrip("/").rstrip("/")
-    for bad_combo in bad_combos_unfl:
+    for bad_combo_des in iter_bad_data(corruptables_ser, corruptables, sub_values, min):
+        bad_combo = dh.unflatten(bad_combo_des)
         query = bad_combo.get("query", "") or query_dict.get("query", "")
         if query:
             query = urlencode(query, doseq=True)
@@ -219,10 +225,9 @@ def generate_bad_urls(
             params = "/".join(params.values()).rstrip("/")
 
         bad_url = f"{base_url}/{params + query}"
-        if bad_url != clean_url:
-            bad_urls.append(bad_url)
-
-    return list(dict.fromkeys(bad_urls))
+        if bad_url != clean_url and bad_url not in seen:
+            seen.add(bad_url)
+            yield bad_url
 
 
 def generate_bad_bodies(
@@ -243,6 +248,28 @@ def generate_bad_bodies(
     Returns:
         bad_data: The unflattened list of bad data for the request.
     """
+    return list(iter_bad_bodies(data, sub_values, min, corrupt_keys))
+
+
+def iter_bad_bodies(
+    data: dict,
+    sub_values: None | dict = None,
+    min: bool = True,
+    corrupt_keys: bool = False,
+) -> Iterator[dict]:
+    """
+    This lazily generates the unique bad bodies of generate_bad_bodies. Only a hash
+    of each body is kept to drop the duplicates, not the bodies themselves.
+
+    Args:
+        data: A 200 type body.
+        sub_values: Regex type substitutes for char type replacements.
+        min: Whether to give the minimum amount of corruptions.
+        corrupt_keys: Whether to corrupt the keys of a data set.
+
+    Returns:
+        bad_data: The generator of unflattened bad data for the request.
+    """
     data_copy_flat = dh.flatten(data)
 
     corruptables = {}
@@ -252,27 +279,25 @@ def generate_bad_bodies(
             incorruptibles[key] = value
         else:
             corruptables[key] = value
-    data_copy_flat_ser = jh.serialize(corruptables)
+    data_copy_flat_ser = jh.serialize(corruptables, compact=True)
 
-    bad_combos_des = generate_bad_data(
+    seen = set()
+    for bad_combo in iter_bad_data(
         data_copy_flat_ser, corruptables, sub_values, min, corrupt_keys
-    )
-
-    if incorruptibles:
-        for bad_combo in bad_combos_des:
+    ):
+        if incorruptibles:
             bad_combo.update(incorruptibles)
+        bad_combo = dh.unflatten(bad_combo)
 
-    bad_combos_unfl = [dh.unflatten(b) for b in bad_combos_des]
+        digest = body_digest(bad_combo)
+        if digest not in seen:
+            seen.add(digest)
+            yield bad_combo
 
-    seen = []
-    unique_dicts = []
-    for bad_combo in bad_combos_unfl:
-        t = tuple(bad_combo.items())
-        if t not in seen:
-            unique_dicts.append(bad_combo)
-            seen.append(t)
 
-    return unique_dicts
+def body_digest(body: dict) -> bytes:
+    data = orjson.dumps(body, default=repr, option=orjson.OPT_NON_STR_KEYS)
+    return blake2b(data, digest_size=16).digest()
 
 
 def generate_bad_data(
@@ -286,7 +311,7 @@ def generate_bad_data(
     This creates the corrupted combinations.
 
     Args:
-        data_flat_ser: A flat, serialized version of the data being corrupted.
+        data_flat_ser: A flat, compact serialized version of the data being corrupted.
         corruptables: The values to target for corruption.
         sub_values: Regex type substitutes for char type replacements.
         min: Whether to give the minimum amount of corruptions.
@@ -295,6 +320,31 @@ def generate_bad_data(
     Returns:
         bad_combos_des: The list of deserialized bad data for the request.
     """
+    return list(
+        iter_bad_data(data_flat_ser, corruptables, sub_values, min, corrupt_keys)
+    )
+
+
+def iter_bad_data(
+    data_flat_ser: str,
+    corruptables: dict,
+    sub_values: dict,
+    min: bool = True,
+    corrupt_keys: bool = False,
+) -> Iterator[dict]:
+    """
+    This lazily creates the corrupted combinations of generate_bad_data.
+
+    Args:
+        data_flat_ser: A flat, compact serialized version of the data being corrupted.
+        corruptables: The values to target for corruption.
+        sub_values: Regex type substitutes for char type replacements.
+        min: Whether to give the minimum amount of corruptions.
+        corrupt_keys: Whether to corrupt the keys of a data set.
+
+    Returns:
+        bad_combos_des: The generator of deserialized bad data for the request.
+    """
 
     def corruption_regex(value_str, active_sub_values):
         corrupt_value = value_str
@@ -317,10 +367,11 @@ def generate_bad_data(
     if not min:
         num_of_combos = ceil(len(corruptables) / 3)
 
-    combos = list(combinations(corruptables.items(), num_of_combos))
-    combos.append(tuple(corruptables.items()))
+    combos = it.chain(
+        combinations(corruptables.items(), num_of_combos),
+        [tuple(corruptables.items())],
+    )
 
-    bad_combos = []
     for combo in combos:
         bad_combo_value = data_flat_ser
         bad_combo_key = data_flat_ser
@@ -335,21 +386,19 @@ def generate_bad_data(
 
             corrupt_value = corruption_regex(value_str, active_sub_values)
             bad_combo_value = bad_combo_value.replace(
-                f"{key_str}: {value_str}", f"{key_str}: {corrupt_value}"
+                f"{key_str}:{value_str}", f"{key_str}:{corrupt_value}"
             )
 
             corrupt_key = None
             if corrupt_keys and len(corruptables) != len(combo):
                 corrupt_key = corruption_regex(key_str, {"str": "a"})
                 bad_combo_key = bad_combo_key.replace(
-                    f"{key_str}: {value_str}", f"{corrupt_key}: {value_str}"
+                    f"{key_str}:{value_str}", f"{corrupt_key}:{value_str}"
                 )
 
-        bad_combos.append(bad_combo_value)
+        yield jh.deserialize(bad_combo_value)
         if corrupt_keys and corrupt_key:
-            bad_combos.append(bad_combo_key)
-
-    return [jh.deserialize(b) for b in bad_combos]
+            yield jh.deserialize(bad_combo_key)
 
 
 def generate_unsafe_bodies(body: dict) -> list[dict]:
@@ -1,41 +1,56 @@
-from asyncio import sleep
+from asyncio import Semaphore, create_task, gather, get_running_loop, sleep
+from collections import Counter
 from copy import copy, deepcopy
 from datetime import datetime, timezone
 from operator import itemgetter
 from time import perf_counter
+from typing import Any
 
 import pypeln as pl
 from google.protobuf.json_format import MessageToDict
-from grpc import ssl_channel_credentials
+from grpc import Compression, ssl_channel_credentials
 from grpc.aio import AioRpcError, Channel, insecure_channel, secure_channel
 
-import quickbolt.reporting.response_csv as rc
 import quickbolt.utils.sync_async as sa
-from quickbolt.logging import AsyncLogger
+import quickbolt.validations.schema as sch
+from quickbolt.reporting.client_reports import ClientReports
+from quickbolt.utils.histogram import LatencyHistogram
 
+COMPRESSIONS = {
+    None: Compression.NoCompression,
+    "gzip": Compression.Gzip,
+    "deflate": Compression.Deflate,
+}
 
-class AioGPRC(object):
+KEEPALIVE_OPTIONS = {
+    "time_ms": "grpc.keepalive_time_ms",
+    "timeout_ms": "grpc.keepalive_timeout_ms",
+    "permit_without_calls": "grpc.keepalive_permit_without_calls",
+    "max_pings_without_data": "grpc.http2.max_pings_without_data",
+}
+
+
+class AioGPRC(ClientReports):
     """
     Code minifier for batching async grpc calls.
     """
 
     channel: None | Channel = None
 
-    def __init__(self, root_dir: None | str = None, reuse: bool = False):
+    def __init__(
+        self, root_dir: None | str = None, reuse: bool = False, **options: Any
+    ):
         """
         This is the constructor for AioGPRC.
 
         Args:
             root_dir: A specified root directory.
             reuse: Whether to reuse an existing channel.
+            options: The options of the logs, _return history and reports e.g.
+                history='summary' or background_reports=True, see ClientReports.
         """
-        self.logging = AsyncLogger(root_dir=root_dir)
-        self.logger = self.logging.logger
-        self.csv_path = self.logging.log_file_path.replace(".log", ".csv")
-
+        super().__init__(root_dir, **options)
         self.reuse = reuse
-        self.batch_number = 0
-        self._return_history: list = []
 
     async def create_channel(
         self, address: str, options: dict, secure: bool = True
@@ -51,8 +66,10 @@ class AioGPRC(object):
         Returns:
             channel: The insecure channel to the server.
         """
-        await self.logger.info(
-            f"Creating the channel at {address} with options {options}."
+        await self.request_logger.info(
+            "Creating the channel at {address} with options {options}.",
+            address=address,
+            options=options,
         )
 
         ssl_creds = ssl_channel_credentials()
@@ -65,8 +82,10 @@ class AioGPRC(object):
                 else insecure_channel(address, _options)
             )
 
-        await self.logger.info(
-            f"Created the channel at {address} with options {options}."
+        await self.request_logger.info(
+            "Created the channel at {address} with options {options}.",
+            address=address,
+            options=options,
         )
         return self.channel
 
@@ -88,13 +107,16 @@ class AioGPRC(object):
         Returns:
             response: The response of the call.
         """
-        await self.logger.info(f"Making the call with the options {options}.")
         _options = deepcopy(options)
+        index = _options.get("index", 0)
+        await self.request_logger.info(
+            "Making the call with the options {options}.", index, options=options
+        )
 
         description = _options.get("description", None)
         code = _options.get("code", None)
         delay = _options.get("delay", 0)
-        index = _options.get("index", 0)
+        schema = _options.get("schema", None)
 
         secure = options.get("secure", True)
         address = _options.get("address", "")
@@ -130,8 +152,10 @@ class AioGPRC(object):
         if code and actual_code not in code.split("|"):
             code_mismatch = "X"
 
-        await self.logger.info(f"Made the call with the options {options}.")
-        return {
+        await self.request_logger.info(
+            "Made the call with the options {options}.", index, options=options
+        )
+        _return = {
             "description": description,
             "code_mismatch": code_mismatch,
             "batch_number": self.batch_number,
@@ -148,6 +172,7 @@ class AioGPRC(object):
             "headers": dict(headers),
             "kwargs": channel_options,
         }
+        return sch.validate_response(_return, schema)
 
     async def each_call(self, options: list[dict]) -> list:
         """
@@ -212,19 +237,16 @@ class AioGPRC(object):
         t0 = perf_counter()
         responses = await self.each_call(options)
         t1 = perf_counter()
+        await self.request_logger.flush()
 
         _return = {
             "duration": round(t1 - t0, 2),
             "responses": sorted(responses, key=itemgetter("index")),
         }
-        self._return_history.append(_return)
-
-        if _return["responses"]:
-            not report or await rc.create_csv_report(
-                self.csv_path, _return, scrub=True, full_scrub_fields=full_scrub_fields
-            )
+        await self.record_batch(_return, report, full_scrub_fields)
 
-        await self.logger.info(f"Completed the call {_return}.")
+        await self.request_logger.info("Completed the call {_return}.", _return=_return)
+        await self.request_logger.flush()
         return _return
 
     @sa.force_sync
@@ -247,4 +269,176 @@ class AioGPRC(object):
         Returns:
             responses: The responses of the calls.
         """
-        return await self.call(options, delay, report, full_scrub_fields)
+        _return = await self.call(options, delay, report, full_scrub_fields)
+        await self.flush()
+        return _return
+
+    async def _load_call(
+        self,
+        stub_method: Any,
+        options: dict,
+        compression: None | str,
+        scheduled: float,
+        histograms: dict,
+    ):
+        """
+        This makes a single load call and records its latency, under the status code
+        or, for an unexpected error, its type name e.g. ValueError.
+
+        Args:
+            stub_method: The bound method of the active stub.
+            options: The options of the call.
+            compression: The per call compression e.g. gzip or deflate.
+            scheduled: The loop time the call was meant to start at.
+            histograms: The latency histograms by status code to record into.
+        """
+        headers = list(options.get("headers", {}).items())
+        loop = get_running_loop()
+
+        try:
+            await stub_method(
+                options.get("method_args", None),
+                metadata=headers,
+                compression=COMPRESSIONS[compression],
+            )
+            actual_code = "OK"
+        except AioRpcError as e:
+            actual_code = e.code().name
+        except Exception as e:
+            actual_code = type(e).__name__
+
+        # measured from the scheduled start so a slow server can't hide queueing
+        latency = loop.time() - scheduled
+        histograms.setdefault(actual_code, LatencyHistogram()).record(latency)
+
+    async def load(
+        self,
+        options: dict,
+        duration: int | float,
+        rate: None | int | float = None,
+        concurrency: None | int = None,
+        keepalive: None | dict = None,
+        compression: None | str = None,
+    ) -> dict:
+        """
+        This is the user facing method for load testing a grpc method.
+        With a rate the calls are open-loop i.e. started on schedule whether or not
+        earlier calls have finished, otherwise concurrency workers call back to back.
+        The calls scheduled while a rate's concurrency is in flight are dropped and
+        counted.
+
+        Args:
+            options: The options of the call, the same as for call.
+            duration: How long to generate load for in seconds.
+            rate: The target calls per second.
+            concurrency: The amount of workers or, with a rate, the max in-flight calls.
+            keepalive: The channel keepalive settings e.g. {'time_ms': 10000, 'timeout_ms':
+                5000, 'permit_without_calls': True, 'max_pings_without_data': 0}.
+            compression: The per call compression e.g. gzip or deflate.
+
+        Returns:
+            results: The load results eg {'duration': ..., 'calls': ..., 'dropped': ...,
+                'codes': ..., 'latency': ..., 'histograms': ...}.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression {compression}.")
+        if not rate and not concurrency:
+            raise ValueError("Either a rate or a concurrency must be given.")
+
+        channel_options = dict(options.get("channel_options", {}))
+        for key, value in (keepalive or {}).items():
+            channel_options[KEEPALIVE_OPTIONS[key]] = int(value)
+
+        await self.logger.info(
+            f"Starting the load at {options.get('address', '')} for {duration} seconds "
+            f"with rate {rate} and concurrency {concurrency}."
+        )
+
+        await self.create_channel(
+            options.get("address", ""),
+            channel_options,
+            secure=options.get("secure", True),
+        )
+        stub_active = options.get("stub", None)(self.channel)
+        stub_method = getattr(stub_active, options.get("method", None))
+
+        loop = get_running_loop()
+        t0 = loop.time()
+        deadline = t0 + duration
+        # one histogram set per worker keeps recording lock free, they're merged after
+        worker_histograms: list[dict] = []
+        dropped = 0
+
+        try:
+            if rate:
+                histograms: dict = {}
+                worker_histograms.append(histograms)
+                semaphore = Semaphore(concurrency) if concurrency else None
+                interval = 1 / rate
+
+                async def scheduled_call(scheduled):
+                    try:
+                        await self._load_call(
+                            stub_method, options, compression, scheduled, histograms
+                        )
+                    finally:
+                        if semaphore is not None:
+                            semaphore.release()
+
+                # only the calls in flight are kept, each drops out once it's done
+                tasks: set = set()
+
+                next_call = t0
+                while next_call < deadline:
+                    scheduled, next_call = next_call, next_call + interval
+                    wait = scheduled - loop.time()
+                    if wait > 0:
+                        await sleep(wait)
+                    # the slot is taken before the task exists so they can't pile up
+                    if semaphore is not None:
+                        if semaphore.locked():
+                            dropped += 1
+                            continue
+                        await semaphore.acquire()
+                    task = create_task(scheduled_call(scheduled))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await gather(*tasks)
+            else:
+
+                async def worker(histograms):
+                    while loop.time() < deadline:
+                        await self._load_call(
+                            stub_method, options, compression, loop.time(), histograms
+                        )
+
+                worker_histograms = [{} for _ in range(concurrency)]
+                await gather(*[worker(h) for h in worker_histograms])
+        finally:
+            self.reuse or await self.close()
+            await self.request_logger.flush()
+
+        elapsed = loop.time() - t0
+        histograms = {}
+        for h in worker_histograms:
+            for code, histogram in h.items():
+                histograms.setdefault(code, LatencyHistogram()).merge(histogram)
+
+        latency = LatencyHistogram()
+        for histogram in histograms.values():
+            latency.merge(histogram)
+
+        codes = Counter({code: h.count for code, h in histograms.items()})
+        results = {
+            "duration": round(elapsed, 2),
+            "calls": latency.count,
+            "dropped": dropped,
+            "throughput": round(latency.count / elapsed, 2) if elapsed else 0.0,
+            "codes": dict(codes),
+            "latency": latency.to_dict(),
+            "histograms": histograms,
+        }
+
+        summary = {k: v for k, v in results.items() if k != "histograms"}
+        await self.logger.info(f"Completed the load {summary}.")
+        return results
@@ -4,43 +4,43 @@ from copy import deepcopy
 from datetime import datetime, timezone
 from operator import itemgetter
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterable, AsyncIterator, Iterable
 
 import orjson
-import pypeln as pl
 from aiofiles import open as aopen
 from aiohttp import ClientSession, FormData, TCPConnector
 
-import quickbolt.reporting.response_csv as rc
 import quickbolt.utils.directory as dh
 import quickbolt.utils.sync_async as sa
-from quickbolt.logging import AsyncLogger
+import quickbolt.validations.schema as sch
+from quickbolt.reporting.client_reports import ClientReports
 
+# the default amount of concurrent requests of a streamed batch
+STREAM_WORKERS = 100
 
-class AioRequests(object):
+
+class AioRequests(ClientReports):
     """
     Code minifier for batching async aio requests.
     """
 
     session: None | ClientSession = None
 
-    def __init__(self, root_dir: None | str = None, reuse: bool = False):
+    def __init__(
+        self, root_dir: None | str = None, reuse: bool = False, **options: Any
+    ):
         """
         This is the constructor for AioRequests.
 
         Args:
             root_dir: A specified root directory.
             reuse: Whether to reuse an existing session or open and close one for each request.
+            options: The options of the logs, _return history and reports e.g.
+                history='summary' or background_reports=True, see ClientReports.
         """
-        self.logging = AsyncLogger(root_dir=root_dir)
-        self.logger = self.logging.logger
-        self.csv_path = self.logging.log_file_path.replace(".log", ".csv")
-
+        super().__init__(root_dir, **options)
         self.reuse = reuse
 
-        self.batch_number = 0
-        self._return_history: list = []
-
     async def close(self):
         if self.session is not None:
             await self.session.close()
@@ -112,18 +112,51 @@ class AioRequests(object):
         agg_delay = 0.0
         for i, d in enumerate(data):
             agg_delay += delay
-            f_data = d.get("data")
+            data[i] = await self.prep_request(d, i, agg_delay)
 
-            if (
-                f_data
-                and not isinstance(f_data, FormData)
-                and not isinstance(f_data, str)
-            ):
-                f_data = await self.dict_as_form_data(**f_data)
+        return [data, deepcopy(kwargs)]
 
-            data[i] = {**d, "delay": round(agg_delay, 2), "index": i, "data": f_data}
+    async def iter_request_info(
+        self, data: Iterable[dict], delay: int | float = 0
+    ) -> AsyncIterator[dict]:
+        """
+        This lazily preps the info of a stream of requests, like build_request_info.
+        Each request keeps its aggregate delay, but as it's timed from the start of
+        the batch a request pulled late only waits for what's left of it.
 
-        return [data, deepcopy(kwargs)]
+        Args:
+            data: The iterable of info needed to make the requests e.g. a generator.
+            delay: How long to delay between requests.
+
+        Returns:
+            data: The generator of prepped data.
+        """
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        for i, d in enumerate(data):
+            agg_delay = delay * (i + 1)
+            d = await self.prep_request(d, i, agg_delay)
+            d["wait"] = max(t0 + agg_delay - loop.time(), 0)
+            yield d
+
+    async def prep_request(self, d: dict, index: int, delay: int | float) -> dict:
+        """
+        This preps the info of a single request, converting its data into form data.
+
+        Args:
+            d: The info needed to make the request eg {'url': ..., 'method': 'get'}.
+            index: The index of the request in the batch.
+            delay: How long to delay the request.
+
+        Returns:
+            d: The prepped data.
+        """
+        f_data = d.get("data")
+
+        if f_data and not isinstance(f_data, FormData) and not isinstance(f_data, str):
+            f_data = await self.dict_as_form_data(**f_data)
+
+        return {**d, "delay": round(delay, 2), "index": index, "data": f_data}
 
     async def _request(self, session: ClientSession, data: dict, **kwargs: Any) -> dict:
         """
@@ -145,11 +178,15 @@ class AioRequests(object):
         method = kwargs.pop("method", "").lower()
         url = kwargs.pop("url", "")
         delay = kwargs.pop("delay", 0)
+        wait = kwargs.pop("wait", delay)
         stream_path = kwargs.pop("stream_path", "")
+        schema = kwargs.pop("schema", None)
         index = kwargs.pop("index", 0)
 
-        await self.logger.info(f"Making the request with {data}.")
-        not delay or await asyncio.sleep(delay)
+        await self.request_logger.info(
+            "Making the request with {data}.", index, data=data
+        )
+        not wait or await asyncio.sleep(wait)
 
         t0 = datetime.now(timezone.utc)
         async with session.request(method, url, ssl=False, **kwargs) as response:
@@ -190,35 +227,52 @@ class AioRequests(object):
                 "headers": kwargs.pop("headers", {}),
                 "kwargs": kwargs,
             }
+            sch.validate_response(_return, schema)
 
             if stream_path:
                 _return["stream_path"] = stream_path
 
-        await self.logger.info(f"Made the request with {data} \n returning {_return}.")
+        await self.request_logger.info(
+            "Made the request with {data} \n returning {_return}.",
+            index,
+            data=data,
+            _return=_return,
+        )
 
         return _return
 
-    async def each_request(self, data: list[dict], **kwargs: Any) -> list:
+    async def each_request(
+        self,
+        data: list[dict] | AsyncIterable[dict],
+        workers: None | int = None,
+        **kwargs: Any,
+    ) -> list:
         """
         The looping wrapper for _request.
 
         Args:
-            data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}].
+            data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}],
+                or a stream of it, see iter_request_info.
+            workers: The max amount of concurrent requests, defaults to all of a list
+                and STREAM_WORKERS of a stream.
             **kwargs: The additional params eg headers or data etc. See
                 https://docs.aiohttp.org/en/stable/client_reference.html for more details.
 
         Returns:
             responses: The responses of the batch.
         """
+        if workers is None:
+            workers = len(data) if isinstance(data, list) else STREAM_WORKERS
+
         try:
             if not self.session:
                 conn = TCPConnector(limit=1000)
                 self.session = ClientSession(connector=conn)
 
-            return await pl.task.map(
+            return await sa.map_bounded(
                 lambda d: self._request(self.session, d, **kwargs),
                 data,
-                workers=len(data),
+                workers=workers,
             )
         finally:
             if not self.reuse:
@@ -227,10 +281,11 @@ class AioRequests(object):
     @sa.force_sync
     async def request(
         self,
-        data: list[dict] | dict,
+        data: list[dict] | dict | Iterable[dict],
         delay: int | float = 0,
         report: bool = True,
         full_scrub_fields: None | list = None,
+        workers: None | int = None,
         **kwargs: Any,
     ) -> dict:
         """
@@ -238,29 +293,37 @@ class AioRequests(object):
 
         Args:
             data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}].
+                Any other iterable e.g. batch_generation.iter_batch is streamed, the
+                requests go out as it's read and only the ones in flight are held.
             delay: How long to delay between requests.
             report: Whether to create or update a report with the current responses.
             full_scrub_fields: The fields to do a full char scrub on.
+            workers: The max amount of concurrent requests, defaults to all of a list
+                and STREAM_WORKERS of a stream.
             **kwargs: The additional params eg headers or data etc. See
                 https://docs.aiohttp.org/en/stable/client_reference.html for more details.
 
         Returns:
             responses: The global response object eg {'duration': ..., 'responses': ...}.
         """
-        return await self.async_request(
+        _return = await self.async_request(
             data=data,
             delay=delay,
             report=report,
             full_scrub_fields=full_scrub_fields,
+            workers=workers,
             **kwargs,
         )
+        await self.flush()
+        return _return
 
     async def async_request(
         self,
-        data: list[dict] | dict,
+        data: list[dict] | dict | Iterable[dict],
         delay: int | float = 0,
         report: bool = True,
         full_scrub_fields: None | list = None,
+        workers: None | int = None,
         **kwargs: Any,
     ) -> dict:
         """
@@ -268,9 +331,13 @@ class AioRequests(object):
 
         Args:
             data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}].
+                Any other iterable e.g. batch_generation.iter_batch is streamed, the
+                requests go out as it's read and only the ones in flight are held.
             delay: How long to delay between requests.
             report: Whether to create or update a report with the current responses.
             full_scrub_fields: The fields to do a full char scrub on.
+            workers: The max amount of concurrent requests, defaults to all of a list
+                and STREAM_WORKERS of a stream.
             **kwargs: The additional params eg headers or data etc. See
                 https://docs.aiohttp.org/en/stable/client_reference.html for more details.
 
@@ -278,21 +345,20 @@ class AioRequests(object):
             responses: The global response object eg {'duration': ..., 'responses': ...}.
         """
         self.batch_number += 1
-        data, kwargs = await self.build_request_info(data, delay, **kwargs)
+        if isinstance(data, list | dict):
+            data, kwargs = await self.build_request_info(data, delay, **kwargs)
+        else:
+            data, kwargs = self.iter_request_info(data, delay), deepcopy(kwargs)
 
         t0 = time.perf_counter()
-        responses = await self.each_request(data, **kwargs)
+        responses = await self.each_request(data, workers, **kwargs)
         t1 = time.perf_counter()
+        await self.request_logger.flush()
 
         _return = {
             "duration": round(t1 - t0, 2),
             "responses": sorted(responses, key=itemgetter("index")),
         }
-        self._return_history.append(_return)
         await self.logger.info(f"The batch duration was {_return['duration']} seconds.")
-
-        if _return["responses"]:
-            not report or await rc.create_csv_report(
-                self.csv_path, _return, scrub=True, full_scrub_fields=full_scrub_fields
-            )
+        await self.record_batch(_return, report, full_scrub_fields)
         return _return
@@ -3,20 +3,22 @@ import time
 from copy import deepcopy
 from datetime import datetime, timezone
 from operator import itemgetter
-from typing import Any
+from typing import Any, AsyncIterable, AsyncIterator, Iterable
 
 import aiofiles.os as aos
-import pypeln as pl
 from aiofiles import open as aopen
 from httpx import AsyncClient
 
-import quickbolt.reporting.response_csv as rc
 import quickbolt.utils.json as jh
 import quickbolt.utils.sync_async as sa
-from quickbolt.logging import AsyncLogger
+import quickbolt.validations.schema as sch
+from quickbolt.reporting.client_reports import REPORT_OPTIONS, ClientReports
 
+# the default amount of concurrent requests of a streamed batch
+STREAM_WORKERS = 100
 
-class HttpxRequests(object):
+
+class HttpxRequests(ClientReports):
     """
     Code minifier for batching async httpx requests.
     """
@@ -32,20 +34,20 @@ class HttpxRequests(object):
         Args:
             root_dir: A specified root directory.
             reuse: Whether to reuse an existing client or open and close one for each request.
-            client_configs: Additional configs are available here
+            client_configs: The options of the logs, _return history and reports e.g.
+                history='summary' or background_reports=True, see ClientReports.
+                Additional configs of the client are available here
                             https://github.com/encode/httpx/blob/5b06aea1d64f0815af6fe71da3ac725bed3ec09f/httpx/_client.py#L1291
                 app: The Python web application to send requests to.
                 base_url: The base url to use when calling into python web apps.
                 transport: The transport class for sending requests over the network.
         """
-        self.logging = AsyncLogger(root_dir=root_dir)
-        self.logger = self.logging.logger
-        self.csv_path = self.logging.log_file_path.replace(".log", ".csv")
-
+        options = {
+            k: client_configs.pop(k) for k in REPORT_OPTIONS if k in client_configs
+        }
+        super().__init__(root_dir, **options)
         self.reuse = reuse
         self.client_configs = client_configs
-        self.batch_number = 0
-        self._return_history = []
 
     async def close(self):
         """
@@ -107,28 +109,64 @@ class HttpxRequests(object):
         agg_delay = 0
         for i, d in enumerate(data):
             agg_delay += delay
-            f_data = d.pop("data", {})
-            for field in ["file", "files"]:
-                f_file = d.pop(field, None)
-                if f_file:
-                    f_data[field] = f_file
-
-            d["delay"] = round(agg_delay, 2)
-            d["index"] = i
-
-            if f_data:
-                body = f_data
-                if isinstance(body, dict) and any(
-                    isinstance(body.get(field), str | bytes)
-                    for field in ["file", "files"]
-                ):
-                    body = await self.separate_form_data(**body)
-                else:
-                    body = {"data": body}
-                d.update(body)
-            data[i] = d
-
-            return [data, deepcopy(kwargs)]
+            data[i] = await self.prep_request(d, i, agg_delay)
+
+        return [data, deepcopy(kwargs)]
+
+    async def iter_request_info(
+        self, data: Iterable[dict], delay: int | float = 0
+    ) -> AsyncIterator[dict]:
+        """
+        This lazily preps the info of a stream of requests, like build_request_info.
+        Each request keeps its aggregate delay, but as it's timed from the start of
+        the batch a request pulled late only waits for what's left of it.
+
+        Args:
+            data: The iterable of info needed to make the requests e.g. a generator.
+            delay: How long to delay between requests.
+
+        Returns:
+            data: The generator of prepped data.
+        """
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        for i, d in enumerate(data):
+            agg_delay = delay * (i + 1)
+            d = await self.prep_request(d, i, agg_delay)
+            d["wait"] = max(t0 + agg_delay - loop.time(), 0)
+            yield d
+
+    async def prep_request(self, d: dict, index: int, delay: int | float) -> dict:
+        """
+        This preps the info of a single request, separating its files from its data.
+
+        Args:
+            d: The info needed to make the request eg {'url': ..., 'method': 'get'}.
+            index: The index of the request in the batch.
+            delay: How long to delay the request.
+
+        Returns:
+            d: The prepped data.
+        """
+        f_data = d.pop("data", {})
+        for field in ["file", "files"]:
+            f_file = d.pop(field, None)
+            if f_file:
+                f_data[field] = f_file
+
+        d["delay"] = round(delay, 2)
+        d["index"] = index
+
+        if f_data:
+            body = f_data
+            if isinstance(body, dict) and any(
+                isinstance(body.get(field), str | bytes) for field in ["file", "files"]
+            ):
+                body = await self.separate_form_data(**body)
+            else:
+                body = {"data": body}
+            d.update(body)
+        return d
 
     async def _request(self, client: AsyncClient, data: dict, **kwargs: Any) -> dict:
         """
@@ -151,11 +189,15 @@ class HttpxRequests(object):
         method = kwargs.pop("method", "").upper()
         url = kwargs.pop("url", "")
         delay = kwargs.pop("delay", 0)
+        wait = kwargs.pop("wait", delay)
         stream_path = kwargs.pop("stream_path", "")
+        schema = kwargs.pop("schema", None)
         index = kwargs.pop("index", 0)
 
-        await self.logger.info(f"Making the request with {data}.")
-        not delay or await asyncio.sleep(delay)
+        await self.request_logger.info(
+            "Making the request with {data}.", index, data=data
+        )
+        not wait or await asyncio.sleep(wait)
 
         t0 = datetime.now(timezone.utc)
         response = await client.request(method, url, **kwargs)
@@ -195,20 +237,34 @@ class HttpxRequests(object):
             "headers": kwargs.pop("headers", {}),
             "kwargs": kwargs,
         }
+        sch.validate_response(_return, schema)
 
         if stream_path:
             _return["stream_path"] = stream_path
 
-        await self.logger.info(f"Made the request with {data} \n returning {_return}.")
+        await self.request_logger.info(
+            "Made the request with {data} \n returning {_return}.",
+            index,
+            data=data,
+            _return=_return,
+        )
 
         return _return
 
-    async def each_request(self, data: list[dict], **kwargs: Any) -> list:
+    async def each_request(
+        self,
+        data: list[dict] | AsyncIterable[dict],
+        workers: None | int = None,
+        **kwargs: Any,
+    ) -> list:
         """
         The looping wrapper for _request.
 
         Args:
-            data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}].
+            data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}],
+                or a stream of it, see iter_request_info.
+            workers: The max amount of concurrent requests, defaults to all of a list
+                and STREAM_WORKERS of a stream.
             **kwargs: The additional params eg headers or data etc. See
                 https://github.com/encode/httpx/blob/5b06aea1d64f0815af6fe71da3ac725bed3ec09f/httpx/_client.py#L1291
                 for more details.
@@ -216,14 +272,17 @@ class HttpxRequests(object):
         Returns:
             responses: The responses of the batch.
         """
+        if workers is None:
+            workers = len(data) if isinstance(data, list) else STREAM_WORKERS
+
         try:
             if not self.client:
                 self.client = AsyncClient(timeout=300, **self.client_configs)
 
-            return await pl.task.map(
+            return await sa.map_bounded(
                 lambda d: self._request(self.client, d, **kwargs),
                 data,
-                workers=len(data),
+                workers=workers,
             )
         finally:
             if not self.reuse:
@@ -232,10 +291,11 @@ class HttpxRequests(object):
     @sa.force_sync
     async def request(
         self,
-        data: list[dict] | dict,
+        data: list[dict] | dict | Iterable[dict],
         delay: int | float = 0,
         report: bool = True,
         full_scrub_fields: None | list = None,
+        workers: None | int = None,
         **kwargs: Any,
     ) -> dict:
         """
@@ -243,9 +303,13 @@ class HttpxRequests(object):
 
         Args:
             data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}].
+                Any other iterable e.g. batch_generation.iter_batch is streamed, the
+                requests go out as it's read and only the ones in flight are held.
             delay: How long to delay between requests.
             report: Whether to create or update a report with the current responses.
             full_scrub_fields: The fields to do a full char scrub on.
+            workers: The max amount of concurrent requests, defaults to all of a list
+                and STREAM_WORKERS of a stream.
             **kwargs: The additional params eg headers or data etc. See
                 https://github.com/encode/httpx/blob/5b06aea1d64f0815af6fe71da3ac725bed3ec09f/httpx/_client.py#L1481
                 for more details.
@@ -253,20 +317,24 @@ class HttpxRequests(object):
         Returns:
             responses: The global response object eg {'duration': ..., 'responses': ...}.
         """
-        return await self.async_request(
+        _return = await self.async_request(
             data=data,
             delay=delay,
             report=report,
             full_scrub_fields=full_scrub_fields,
+            workers=workers,
             **kwargs,
         )
+        await self.flush()
+        return _return
 
     async def async_request(
         self,
-        data: list[dict] | dict,
+        data: list[dict] | dict | Iterable[dict],
         delay: int | float = 0,
         report: bool = True,
         full_scrub_fields: None | list = None,
+        workers: None | int = None,
         **kwargs: Any,
     ) -> dict:
         """
@@ -274,9 +342,13 @@ class HttpxRequests(object):
 
         Args:
             data: The list of info needed to make the request eg [{'url': ..., 'method': 'get'}].
+                Any other iterable e.g. batch_generation.iter_batch is streamed, the
+                requests go out as it's read and only the ones in flight are held.
             delay: How long to delay between requests.
             report: Whether to create or update a report with the current responses.
             full_scrub_fields: The fields to do a full char scrub on.
+            workers: The max amount of concurrent requests, defaults to all of a list
+                and STREAM_WORKERS of a stream.
             **kwargs: The additional params eg headers or data etc. See
                 https://github.com/encode/httpx/blob/5b06aea1d64f0815af6fe71da3ac725bed3ec09f/httpx/_client.py#L1481
                 for more details.
@@ -285,21 +357,20 @@ class HttpxRequests(object):
             responses: The global response object eg {'duration': ..., 'responses': ...}.
         """
         self.batch_number += 1
-        data, kwargs = await self.build_request_info(data, delay, **kwargs)
+        if isinstance(data, list | dict):
+            data, kwargs = await self.build_request_info(data, delay, **kwargs)
+        else:
+            data, kwargs = self.iter_request_info(data, delay), deepcopy(kwargs)
 
         t0 = time.perf_counter()
-        responses = await self.each_request(data, **kwargs)
+        responses = await self.each_request(data, workers, **kwargs)
         t1 = time.perf_counter()
+        await self.request_logger.flush()
 
         _return = {
             "duration": round(t1 - t0, 2),
             "responses": sorted(responses, key=itemgetter("index")),
         }
-        self._return_history.append(_return)
         await self.logger.info(f"The batch duration was {_return['duration']} seconds.")
-
-        if _return["responses"]:
-            not report or await rc.create_csv_report(
-                self.csv_path, _return, scrub=True, full_scrub_fields=full_scrub_fields
-            )
+        await self.record_batch(_return, report, full_scrub_fields)
         return _return
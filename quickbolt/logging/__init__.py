@@ -1 +1,5 @@
 from quickbolt.logging.async_logger import AsyncLogger
+from quickbolt.logging.compressed_file_handler import CompressedFileHandler
+from quickbolt.logging.event_log import EventLog, EventLogReader
+from quickbolt.logging.log_file_handler import LogFileHandler
+from quickbolt.logging.structured_logger import StructuredLogger
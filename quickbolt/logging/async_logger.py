@@ -9,10 +9,17 @@ from typing import Generator
 from aiofiles import open as aopen
 from aiologger import Logger
 from aiologger.formatters.base import Formatter
-from aiologger.handlers.files import AsyncFileHandler
 
 import __main__ as main
+import quickbolt.utils.compression as cx
 import quickbolt.utils.directory as dh
+from quickbolt.logging.compressed_file_handler import CompressedFileHandler
+from quickbolt.logging.event_log import EventLog
+from quickbolt.logging.log_file_handler import LogFileHandler
+from quickbolt.logging.structured_logger import StructuredLogger
+
+# how many decompressed characters of a compressed log to read at a time
+READ_SIZE = 64 * 1024
 
 
 class AsyncLogger(object):
@@ -20,13 +27,25 @@ class AsyncLogger(object):
     This is a wrapper around the async aio logging module.
     """
 
-    def __init__(self, root_dir: None | str = None, by_time: bool = False):
+    def __init__(
+        self,
+        root_dir: None | str = None,
+        by_time: bool = False,
+        request_log: None | dict = None,
+        event_log: bool = False,
+        compression: None | str = None,
+    ):
         """
         This gets the logger.
 
         Args:
             by_time: Whether to keep all successive runs by time.
             root_dir: The specified root directory.
+            request_log: The options of the request logger e.g. {'level': 'INFO',
+                'sample_rate': 0.1, 'max_field_length': 1000}. See StructuredLogger.
+            event_log: Whether to also keep a jsonl event log of each request.
+            compression: The compression of the log and reports, gzip or zstd, e.g.
+                test.log.gz and test.csv.gz. None to not compress them.
 
         Returns:
             logger: The logger to use for logging.
@@ -34,15 +53,25 @@ class AsyncLogger(object):
         self.logger = Logger(level="INFO")
 
         self.root_dir = root_dir or dh.get_root_dir()
-        self.log_file_path = self.get_log_path(by_time)
+        self.compression = compression
+        self.log_file_path = self.get_log_path(by_time) + cx.get_suffix(compression)
 
         log_file_path_parts = Path(self.log_file_path).parts
         index = log_file_path_parts.index("run_info")
         run_info_path = Path(*log_file_path_parts[: index + 1]).as_posix()
         self.run_info_path = str(run_info_path)
 
+        self.request_logger = StructuredLogger(
+            self.log_file_path, **(request_log or {})
+        )
         self.set_logger_handler(filename=self.log_file_path)
 
+        # the event log is read by byte offset so it's never compressed
+        self.event_log_path = cx.strip_suffix(self.log_file_path).replace(
+            ".log", "_events.jsonl"
+        )
+        self.event_log = EventLog(self.event_log_path) if event_log else None
+
     def get_log_path(self, by_time: bool = False) -> str:
         """
         This gets the logging directories and file paths.
@@ -61,9 +90,7 @@ class AsyncLogger(object):
         calling_test = Path(calling_test.split("::")[0])
 
         root_path = Path(self.root_dir)
-        file_path = next(
-            (f for f in root_path.rglob("*") if str(calling_test) in str(f)), None
-        )
+        file_path = dh.find_path(self.root_dir, calling_test)
 
         if file_path:
             tests_index = next(
@@ -111,11 +138,19 @@ class AsyncLogger(object):
         if not options:
             options = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 
-        handler = AsyncFileHandler(filename)
+        # the request lines are written through the handler so they stay in order
+        if cx.get_compression(filename):
+            handler = CompressedFileHandler(
+                filename, request_logger=self.request_logger
+            )
+        else:
+            handler = LogFileHandler(filename, request_logger=self.request_logger)
         handler.formatter = Formatter(options)
+        self.request_logger.handler = handler
         self.logger.add_handler(handler)
 
     async def shutdown(self):
+        await self.request_logger.flush()
         await self.logger.shutdown()
 
     async def delete_run_info(self, path: None | str = None):
@@ -130,7 +165,7 @@ class AsyncLogger(object):
 
     async def read_log_file(self, path: None | str = None) -> Generator:
         """
-        This reads a log file.
+        This reads a log file, decompressing it on the fly if it's compressed.
 
         Args:
             path: A custom path to a log file.
@@ -139,6 +174,23 @@ class AsyncLogger(object):
             file: A generator to the log file
         """
         path = path or self.log_file_path
+        if path == self.log_file_path:
+            # the lines of the compressed handler are buffered until they're read
+            for handler in self.logger.handlers:
+                if isinstance(handler, CompressedFileHandler):
+                    await handler.flush()
+
+        if cx.get_compression(path):
+            # the lines are decompressed a chunk at a time off the event loop
+            f = await asyncio.to_thread(cx.open_file, path, "rt")
+            try:
+                while lines := await asyncio.to_thread(f.readlines, READ_SIZE):
+                    for line in lines:
+                        yield line
+            finally:
+                await asyncio.to_thread(f.close)
+            return
+
         async with aopen(path) as f:
             async for line in f:
                 yield line
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import Any
+
+from aiologger.handlers.base import Handler
+from aiologger.records import LogRecord
+
+import quickbolt.utils.compression as cx
+
+
+class CompressedFileHandler(Handler):
+    """
+    This is a log handler for compressed log files e.g. test.log.gz. Lines are
+    buffered and appended as a compressed member once the buffer size or interval
+    is hit, so the log stays readable while it's written. The lines of a
+    StructuredLogger are buffered with the records, so the file has a single writer.
+    """
+
+    terminator = "\n"
+
+    def __init__(
+        self,
+        filename: str,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        request_logger: Any = None,
+    ):
+        """
+        The constructor for CompressedFileHandler.
+
+        Args:
+            filename: The filename of the log file, its suffix picks the compression.
+            buffer_size: How many characters to buffer before writing to the file.
+            flush_interval: How many seconds to buffer before writing to the file.
+            request_logger: The StructuredLogger writing through the handler.
+        """
+        super().__init__()
+        self.filename = filename
+        self.request_logger = request_logger
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+
+        self.buffer: list[str] = []
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+
+    @property
+    def initialized(self) -> bool:
+        return True
+
+    async def emit(self, record: LogRecord):
+        try:
+            # the lines logged before the record are buffered ahead of it
+            if self.request_logger is not None:
+                await self.request_logger.flush()
+            await self.write(self.formatter.format(record) + self.terminator)
+        except Exception as exc:
+            await self.handle_error(record, exc)
+
+    async def write(self, text: str):
+        """
+        This buffers formatted lines e.g. from a StructuredLogger.
+
+        Args:
+            text: The lines to write.
+        """
+        self.buffer.append(text)
+        self.buffered += len(text)
+
+        if (
+            self.buffered >= self.buffer_size
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self):
+        """
+        This writes the buffered lines to the log file.
+        """
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+
+        lines = "".join(self.buffer)
+        self.buffer = []
+        self.buffered = 0
+        await asyncio.to_thread(cx.append, self.filename, lines)
+
+    async def close(self):
+        await self.flush()
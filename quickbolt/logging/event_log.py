@@ -0,0 +1,159 @@
+import mmap
+from pathlib import Path
+from typing import Generator
+
+import orjson
+from aiofiles import open as aopen
+
+EVENT_FIELDS = [
+    "batch_number",
+    "index",
+    "description",
+    "method",
+    "expected_code",
+    "actual_code",
+    "code_mismatch",
+    "schema_mismatch",
+    "schema_error",
+    "url",
+    "address",
+    "response_seconds",
+    "delay_seconds",
+    "utc_time",
+]
+
+
+class EventLog(object):
+    """
+    This is a machine readable jsonl log of each request with a sidecar index of
+    the byte offsets of each batch.
+    """
+
+    def __init__(self, path: str):
+        """
+        The constructor for EventLog.
+
+        Args:
+            path: The path of the jsonl event log, the index is written to path + '.idx'.
+        """
+        self.path = path
+        self.index_path = f"{path}.idx"
+
+    async def write_batch(self, _return: dict):
+        """
+        This appends the events of a batch and its index entry.
+
+        Args:
+            _return: The _return from a batch request.
+        """
+        responses = _return["responses"]
+        if not responses:
+            return
+
+        records = b"".join(
+            orjson.dumps({f: r[f] for f in EVENT_FIELDS if f in r}, default=str) + b"\n"
+            for r in responses
+        )
+
+        async with aopen(self.path, "ab") as f:
+            offset = await f.tell()
+            await f.write(records)
+
+        entry = {
+            "batch_number": responses[0]["batch_number"],
+            "offset": offset,
+            "length": len(records),
+            "count": len(responses),
+        }
+        async with aopen(self.index_path, "ab") as f:
+            await f.write(orjson.dumps(entry) + b"\n")
+
+
+class EventLogReader(object):
+    """
+    This reads an event log by jumping straight to the bytes of a batch.
+    """
+
+    def __init__(self, path: str):
+        """
+        The constructor for EventLogReader.
+
+        Args:
+            path: The path of the jsonl event log.
+        """
+        self.path = path
+        self.index: dict[int, list[dict]] = {}
+
+        index_path = Path(f"{path}.idx")
+        if index_path.exists():
+            for line in index_path.read_bytes().splitlines():
+                entry = orjson.loads(line)
+                self.index.setdefault(entry["batch_number"], []).append(entry)
+
+        self.file = open(path, "rb")
+        self.mmap = None
+        if Path(path).stat().st_size:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self.mmap is None or self.mmap.close()
+        self.file.close()
+
+    def __enter__(self) -> "EventLogReader":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def batch_numbers(self) -> list[int]:
+        return sorted(self.index)
+
+    def batch(self, batch_number: int) -> list[dict]:
+        """
+        This reads the events of a batch.
+
+        Args:
+            batch_number: The batch number, batches sharing it across runs are all read.
+
+        Returns:
+            events: The events of the batch.
+        """
+        events = []
+        for entry in self.index.get(batch_number, []):
+            chunk = self.mmap[entry["offset"] : entry["offset"] + entry["length"]]
+            events.extend(orjson.loads(line) for line in chunk.splitlines())
+        return events
+
+    def request(self, batch_number: int, index: int) -> None | dict:
+        """
+        This reads the event of a single request.
+
+        Args:
+            batch_number: The batch number of the request.
+            index: The (1 based) index of the request within the batch.
+
+        Returns:
+            event: The event of the request or None if there isn't one.
+        """
+        for entry in self.index.get(batch_number, []):
+            if not 0 < index <= entry["count"]:
+                continue
+
+            # the events of a batch are written in index order, one per line
+            start = entry["offset"]
+            for _ in range(index - 1):
+                start = self.mmap.find(b"\n", start) + 1
+            end = self.mmap.find(b"\n", start)
+            event = orjson.loads(self.mmap[start:end])
+            if event.get("index") == index:
+                return event
+        return None
+
+    def __iter__(self) -> Generator:
+        if self.mmap is None:
+            return
+
+        self.mmap.seek(0)
+        for line in iter(self.mmap.readline, b""):
+            yield orjson.loads(line)
@@ -0,0 +1,40 @@
+from typing import Any
+
+from aiologger.handlers.files import AsyncFileHandler
+from aiologger.records import LogRecord
+
+
+class LogFileHandler(AsyncFileHandler):
+    """
+    This is the log handler of plain log files. The lines of a StructuredLogger are
+    written through it so the log file has a single writer, and they're written
+    before each record so the lines stay in the order they were logged.
+    """
+
+    def __init__(self, filename: str, request_logger: Any = None):
+        """
+        The constructor for LogFileHandler.
+
+        Args:
+            filename: The filename of the log file.
+            request_logger: The StructuredLogger writing through the handler.
+        """
+        super().__init__(filename)
+        self.request_logger = request_logger
+
+    async def emit(self, record: LogRecord):
+        if self.request_logger is not None:
+            await self.request_logger.flush()
+        await super().emit(record)
+
+    async def write(self, text: str):
+        """
+        This writes formatted lines to the log file e.g. from a StructuredLogger.
+
+        Args:
+            text: The lines to write.
+        """
+        if not self.initialized:
+            await self._init_writer()
+        await self.stream.write(text)
+        await self.stream.flush()
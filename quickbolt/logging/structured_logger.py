@@ -0,0 +1,207 @@
+import asyncio
+import time
+from datetime import datetime
+from math import ceil
+from typing import Any, Generator
+
+from aiofiles import open as aopen
+
+import quickbolt.utils.compression as cx
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+def iter_repr(value: Any, limit: int) -> Generator:
+    """
+    This formats a value like str does, in chunks, so the formatting can be stopped
+    once enough of it was made. Strings and bytes are cut to the limit first.
+
+    Args:
+        value: The value to format.
+        limit: The length after which the rest of the value won't be needed.
+
+    Returns:
+        chunks: The generator of the formatted chunks.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        yield "{"
+        for i, (k, v) in enumerate(value.items()):
+            if i:
+                yield ", "
+            yield from iter_repr(k, limit)
+            yield ": "
+            yield from iter_repr(v, limit)
+        yield "}"
+    elif value_type is list or value_type is tuple:
+        yield "[" if value_type is list else "("
+        for i, v in enumerate(value):
+            if i:
+                yield ", "
+            yield from iter_repr(v, limit)
+        if value_type is tuple and len(value) == 1:
+            yield ","
+        yield "]" if value_type is list else ")"
+    elif value_type is str or value_type is bytes:
+        yield repr(value[: limit + 1])
+    else:
+        yield repr(value)
+
+
+class StructuredLogger(object):
+    """
+    This is a buffered logger for the per request lines of the hot paths.
+    Messages are templates that are only formatted when the level is on and
+    the request is sampled, and lines are written to the log file in bulk,
+    through the handler of the log file if it has one.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        level: str = "INFO",
+        sample_rate: float = 1.0,
+        max_field_length: None | int = None,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        name: str = "aiologger",
+        handler: Any = None,
+    ):
+        """
+        The constructor for StructuredLogger.
+
+        Args:
+            filename: The filename of the log file.
+            level: The lowest level to log.
+            sample_rate: The share of requests per batch to log the lines of, 0 to 1.
+            max_field_length: The max length of a formatted field, longer ones are truncated.
+            buffer_size: How many characters to buffer before writing to the file.
+            flush_interval: How many seconds to buffer before writing to the file.
+            name: The logger name written in each line.
+            handler: The handler writing the log file e.g. a LogFileHandler, so the
+                file has a single writer. The file is appended to directly if None.
+        """
+        self.filename = filename
+        self.level = LEVELS[level.upper()]
+        self.sample_rate = sample_rate
+        self.max_field_length = max_field_length
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self.handler = handler
+
+        self.buffer: list[str] = []
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+
+    def is_enabled(self, level: str, index: None | int = None) -> bool:
+        """
+        This checks whether a line would be logged.
+
+        Args:
+            level: The level of the line.
+            index: The index of the request within its batch, used for sampling.
+
+        Returns:
+            enabled: Whether the line would be logged.
+        """
+        if LEVELS[level] < self.level:
+            return False
+        if index is None or self.sample_rate >= 1:
+            return True
+        if self.sample_rate <= 0:
+            return False
+        # an index is logged when it carries the running share of sampled requests
+        # over the next whole number, so every line of a request shares its sampling
+        return ceil((index + 1) * self.sample_rate) > ceil(index * self.sample_rate)
+
+    def truncate(self, value: Any) -> str:
+        """
+        This formats a field, truncating it to the max field length. Dicts, lists and
+        tuples are only formatted up to the max field length.
+
+        Args:
+            value: The field to format.
+
+        Returns:
+            text: The formatted field.
+        """
+        limit = self.max_field_length
+        if limit is None:
+            return str(value)
+
+        if type(value) not in (dict, list, tuple):
+            text = str(value)
+            if len(text) <= limit:
+                return text
+            return f"{text[:limit]}...<{len(text) - limit} more chars>"
+
+        chunks = []
+        size = 0
+        for chunk in iter_repr(value, limit):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                return f"{''.join(chunks)[:limit]}...<more chars>"
+        return "".join(chunks)
+
+    async def log(
+        self, level: str, message: str, index: None | int = None, **fields: Any
+    ):
+        """
+        This formats and buffers a line if it's enabled.
+
+        Args:
+            level: The level of the line.
+            message: The message template e.g. 'Made the request with {data}.'.
+            index: The index of the request within its batch, used for sampling.
+            **fields: The values of the template fields.
+        """
+        if not self.is_enabled(level, index):
+            return
+
+        now = datetime.now()
+        asctime = f"{now:%Y-%m-%d %H:%M:%S},{now.microsecond // 1000:03d}"
+        fields = {k: self.truncate(v) for k, v in fields.items()}
+        line = f"{asctime} | {level} | {self.name} | {message.format(**fields)}\n"
+
+        self.buffer.append(line)
+        self.buffered += len(line)
+
+        if (
+            self.buffered >= self.buffer_size
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def debug(self, message: str, index: None | int = None, **fields: Any):
+        await self.log("DEBUG", message, index, **fields)
+
+    async def info(self, message: str, index: None | int = None, **fields: Any):
+        await self.log("INFO", message, index, **fields)
+
+    async def error(self, message: str, index: None | int = None, **fields: Any):
+        await self.log("ERROR", message, index, **fields)
+
+    async def flush(self):
+        """
+        This writes the buffered lines to the log file.
+        """
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+
+        lines = "".join(self.buffer)
+        self.buffer = []
+        self.buffered = 0
+
+        if self.handler is not None:
+            await self.handler.write(lines)
+            return
+
+        if cx.get_compression(self.filename):
+            await asyncio.to_thread(cx.append, self.filename, lines)
+            return
+
+        async with aopen(self.filename, "a") as f:
+            await f.write(lines)
@@ -1,5 +1,4 @@
 import asyncio
-import re
 import sys
 import traceback
 from pathlib import Path
@@ -11,8 +10,8 @@ import pytest
 
 import quickbolt.reporting.response_csv as rc
 import quickbolt.utils.directory as dh
-import quickbolt.utils.json as jh
 from quickbolt.validations import Validations
+from quickbolt.validations.validations import get_error_file_path, get_error_rows
 
 
 class CorePytestBase(object):
@@ -42,20 +41,37 @@ class CorePytestBase(object):
 
         setattr(CorePytestBase, f"{dir_path}_data", data)
 
+    @staticmethod
+    async def move_report_to_fail(csv_path: str) -> str:
+        """
+        This moves a report from its pass folder to its fail folder, with all of its
+        segments and their manifest if it was rotated.
+
+        Args:
+            csv_path: The path of the csv report.
+
+        Returns:
+            new_csv_path: The path of the moved report.
+        """
+        fail_dir = Path(csv_path).parent.parent / "fail"
+        paths = await asyncio.to_thread(rc.get_report_segments, csv_path)
+        manifest_path = rc.get_manifest_path(csv_path)
+        if await aos.path.exists(manifest_path):
+            paths.append(manifest_path)
+
+        for path in paths:
+            await asyncio.to_thread(move, path, fail_dir / Path(path).name)
+
+        return str(fail_dir / Path(csv_path).name)
+
     async def move_pass_files_to_fail(self):
         log_file_path = Path(self.validations.logging.log_file_path)
         new_log_file_path = log_file_path.parent.parent / "fail" / log_file_path.name
         await asyncio.to_thread(move, log_file_path, new_log_file_path)
 
-        csv_path = Path(self.csv_path)
-        new_csv_path = csv_path.parent.parent / "fail" / csv_path.name
-        await asyncio.to_thread(move, csv_path, new_csv_path)
-
-        scrubbed_csv_path = csv_path.with_stem(csv_path.stem + "_scrubbed")
-        new_scrubbed_csv_path = new_csv_path.with_stem(new_csv_path.stem + "_scrubbed")
-        await asyncio.to_thread(move, scrubbed_csv_path, new_scrubbed_csv_path)
-
-        self.csv_path = str(new_csv_path)
+        scrubbed_csv_path = self.csv_path.replace(".csv", "_scrubbed.csv")
+        await self.move_report_to_fail(scrubbed_csv_path)
+        self.csv_path = await self.move_report_to_fail(self.csv_path)
 
     async def handle_errors(self):
         trace = [
@@ -73,32 +89,8 @@ class CorePytestBase(object):
             self.csv_path.replace(".csv", "_scrubbed.csv")
         )
         if mismatches:
-            rows: list = []
-            for m in mismatches:
-                header_set = set(m["actual_refs"].keys()) | set(
-                    m["expected_refs"].keys()
-                )
-                headers = [""] + list(header_set)
-                if not rows:
-                    rows.append(headers)
-
-                keys_set = {"expected_refs", "actual_refs", "unscrubbed_refs"} | set(
-                    m.keys()
-                )
-                for k in keys_set:
-                    if "skip" not in k:
-                        if isinstance(m[k], dict):
-                            rows.append([k] + [m[k].get(h, "") for h in headers[1:]])
-                        else:
-                            rows.append([f"error_{k}"] + [jh.serialize((m[k]))])
-                rows.append([""])
-
-            error_file_path = re.sub(
-                r"/run_logs/",
-                "/run_errors/",
-                self.csv_path.replace(".csv", "_errors.csv"),
-            )
-            self.error_file_path = re.sub(r"/pass/|/fail/", "/", error_file_path)
+            rows = get_error_rows(mismatches)
+            self.error_file_path = get_error_file_path(self.csv_path)
             error_dir = Path(self.error_file_path).parent
 
             await dh.safe_mkdirs(error_dir)
@@ -0,0 +1,165 @@
+import inspect
+
+import quickbolt.reporting.response_columnar as rcol
+import quickbolt.reporting.response_csv as rc
+import quickbolt.reporting.response_sqlite as rsql
+import quickbolt.utils.compression as cx
+from quickbolt.logging import AsyncLogger
+from quickbolt.reporting.report_pipeline import ReportPipeline
+from quickbolt.reporting.return_history import ReturnHistory
+
+
+class ClientReports(object):
+    """
+    This is the shared setup of the logs, _return history and reports of the clients.
+    """
+
+    def __init__(
+        self,
+        root_dir: None | str = None,
+        history: str = "full",
+        history_size: None | int = None,
+        request_log: None | dict = None,
+        event_log: bool = False,
+        scrub_cache_size: int = 1024,
+        background_reports: bool = False,
+        buffered_reports: bool = False,
+        report_segment_size: None | int = None,
+        report_segment_batches: None | int = None,
+        columnar_report: bool = False,
+        sqlite_report: bool = False,
+        compression: None | str = None,
+        compact_reports: bool = False,
+    ):
+        """
+        The constructor for ClientReports.
+
+        Args:
+            root_dir: A specified root directory.
+            history: How to keep the _return history, one of full, last, summary or spill.
+            history_size: The amount of batches kept by the last history policy.
+            request_log: The options of the per request log lines e.g. {'sample_rate': 0.1,
+                'max_field_length': 1000}. See StructuredLogger.
+            event_log: Whether to also keep a jsonl event log of each request.
+            scrub_cache_size: How many scrubbed values to reuse across batches, 0 for none.
+            background_reports: Whether to scrub and write the reports in the background,
+                see flush.
+            buffered_reports: Whether to buffer the report rows across batches instead of
+                writing them after each batch, see flush.
+            report_segment_size: The size in bytes to rotate the csv reports into a new
+                segment after, see response_csv.CsvReportWriter.
+            report_segment_batches: The amount of batches to rotate the csv reports into
+                a new segment after.
+            columnar_report: Whether to also keep a compact columnar report, see
+                response_columnar.load_columnar_report.
+            sqlite_report: Whether to also keep an indexed sqlite report, see
+                response_sqlite.query_sqlite_reports.
+            compression: The compression of the log and csv reports, gzip or zstd, see
+                utils.compression. The readers decompress them on the fly.
+            compact_reports: Whether to write the json cells of the csv reports without
+                indentation, which makes them smaller and quicker to write.
+        """
+        self.logging = AsyncLogger(
+            root_dir=root_dir,
+            request_log=request_log,
+            event_log=event_log,
+            compression=compression,
+        )
+        self.logger = self.logging.logger
+        self.request_logger = self.logging.request_logger
+        self.csv_path = self.logging.log_file_path.replace(".log", ".csv")
+        report_path = cx.strip_suffix(self.csv_path)
+
+        self.batch_number = 0
+        self._return_history = ReturnHistory(
+            history,
+            size=history_size,
+            spill_path=report_path.replace(".csv", "_history.jsonl"),
+        )
+        self.scrub_cache = rc.ScrubCache(scrub_cache_size) if scrub_cache_size else None
+        self.report_pipeline = ReportPipeline() if background_reports else None
+        report_writer_options = {
+            "max_segment_size": report_segment_size,
+            "max_segment_batches": report_segment_batches,
+            "compact": compact_reports,
+        }
+        if not buffered_reports:
+            report_writer_options["buffer_size"] = 0
+        self.report_writer = rc.CsvReportWriter(**report_writer_options)
+        self.columnar_path = None
+        if columnar_report:
+            self.columnar_path = report_path.replace(".csv", ".cols")
+        self.sqlite_path = None
+        if sqlite_report:
+            self.sqlite_path = report_path.replace(".csv", ".db")
+
+    async def flush(self):
+        """
+        This waits for the background and buffered reports to be written.
+        """
+        if self.report_pipeline is not None:
+            await self.report_pipeline.flush()
+        await self.report_writer.flush()
+
+    async def close_reports(self):
+        """
+        This writes the pending reports, stops the report pipeline and closes the
+        reports, logging the hits and misses of the scrub cache once for the run.
+        """
+        try:
+            if self.report_pipeline is not None:
+                await self.report_pipeline.close()
+        finally:
+            await self.report_writer.close()
+        await self.log_scrub_cache()
+
+    async def log_scrub_cache(self):
+        """
+        This logs the hits and misses of the scrub cache, if it was used.
+        """
+        if self.scrub_cache is not None and (
+            self.scrub_cache.hits or self.scrub_cache.misses
+        ):
+            await self.logger.info(
+                f"The scrub cache has {self.scrub_cache.hits} hits and "
+                f"{self.scrub_cache.misses} misses."
+            )
+
+    async def record_batch(
+        self, _return: dict, report: bool = True, full_scrub_fields: None | list = None
+    ):
+        """
+        This keeps the _return of a batch in the history and event log, and creates
+        or updates its reports.
+
+        Args:
+            _return: The global response object eg {'duration': ..., 'responses': ...}.
+            report: Whether to create or update a report with the current responses.
+            full_scrub_fields: The fields to do a full char scrub on.
+        """
+        await self._return_history.append(_return)
+        if self.logging.event_log:
+            await self.logging.event_log.write_batch(_return)
+
+        if not _return["responses"] or not report:
+            return
+
+        create_report = rc.create_csv_report
+        if self.report_pipeline is not None:
+            create_report = self.report_pipeline.submit
+        await create_report(
+            self.csv_path,
+            _return,
+            scrub=True,
+            full_scrub_fields=full_scrub_fields,
+            scrub_cache=self.scrub_cache,
+            report_writer=self.report_writer,
+        )
+        if self.columnar_path:
+            await rcol.create_columnar_report(self.columnar_path, _return)
+        if self.sqlite_path:
+            await rsql.create_sqlite_report(self.sqlite_path, _return)
+
+
+# the keywords the clients pass on to ClientReports, its parameters after root_dir
+REPORT_OPTIONS = list(inspect.signature(ClientReports.__init__).parameters)[2:]
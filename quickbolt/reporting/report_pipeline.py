@@ -0,0 +1,231 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import get_context
+
+import quickbolt.reporting.response_csv as rc
+import quickbolt.utils.json as jh
+
+
+class ReportPipeline(object):
+    """
+    This writes the csv reports of batches in the background. Scrubbing runs in a
+    process pool and a writer task appends the reports in batch order, so the next
+    batch can run while the previous one is scrubbed and written. The rows of a batch
+    are serialized when it's submitted, so later changes to its responses aren't
+    written.
+    """
+
+    def __init__(
+        self,
+        workers: None | int = None,
+        executor: None | Executor = None,
+        chunk_size: int = 64,
+        max_pending: int = 8,
+    ):
+        """
+        The constructor for ReportPipeline.
+
+        Args:
+            workers: The amount of scrubbing processes, defaults to the cpu count.
+            executor: An executor to scrub in instead of the default process pool.
+            chunk_size: How many values to send to a scrubbing process at a time.
+            max_pending: The max amount of batches waiting to be written, submit
+                waits for room once it's reached.
+        """
+        self.workers = workers
+        self.executor = executor
+        self.owns_executor = executor is None
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+
+        self.loop: None | asyncio.AbstractEventLoop = None
+        self.queue: None | asyncio.Queue = None
+        self.writer: None | asyncio.Task = None
+        self.errors: list[Exception] = []
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn")
+            )
+        return self.executor
+
+    def start(self):
+        """
+        This starts the writer task on the running loop, e.g. again for each
+        loop of the sync request wrappers.
+        """
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.queue = asyncio.Queue(maxsize=self.max_pending)
+            self.writer = loop.create_task(self.write_jobs())
+
+    async def submit(
+        self,
+        csv_path: str,
+        _return: dict,
+        scrub: bool = False,
+        full_scrub_fields: None | list = None,
+        scrub_cache: None | rc.ScrubCache = None,
+        report_writer: None | rc.CsvReportWriter = None,
+    ):
+        """
+        This queues the csv report of a batch, starting its scrubbing right away.
+
+        Args:
+            csv_path: The path to store the csv report.
+            _return: The _return from a batch request.
+            scrub: Whether to remove sensitive info from the data.
+            full_scrub_fields: The fields to do a full char scrub on.
+            scrub_cache: A cache to reuse the scrubbed values of repeated fields from.
+            report_writer: The writer to append with, a one off one is used if None.
+        """
+        self.start()
+
+        responses = _return["responses"]
+        rc.prepare_responses(responses)
+        compact = report_writer is not None and report_writer.compact
+        header, rows = rc.get_report_rows(responses, compact)
+        job = {
+            "csv_path": csv_path,
+            "header": header,
+            "rows": rows,
+            "batch_number": responses[0].get("batch_number"),
+            "report_writer": report_writer,
+            "compact": compact,
+        }
+
+        if scrub:
+            scrubbed_responses = rc.scrub_responses(responses)
+            texts: dict = {}
+            fills = []
+            for i, r in enumerate(scrubbed_responses):
+                for key, full in rc.get_scrub_fields(r, full_scrub_fields):
+                    text = jh.serialize_bytes(r[key])
+                    cache_key = rc.ScrubCache.key(text, full)
+                    if cache_key in texts:
+                        fills.append((i, key, cache_key))
+                        if scrub_cache is not None:
+                            scrub_cache.hits += 1
+                        continue
+
+                    if scrub_cache is not None:
+                        found, value = scrub_cache.get(cache_key)
+                        if found:
+                            r[key] = value
+                            continue
+
+                    texts[cache_key] = (text, full)
+                    fills.append((i, key, cache_key))
+
+            # the cells still to be scrubbed are filled in once their scrubbing is done
+            for i, key, _ in fills:
+                scrubbed_responses[i][key] = None
+            scrubbed_header, scrubbed_rows = rc.get_report_rows(
+                scrubbed_responses, compact
+            )
+            columns = {title: c for c, title in enumerate(scrubbed_header)}
+
+            items = list(texts.items())
+            chunks = [
+                items[i : i + self.chunk_size]
+                for i in range(0, len(items), self.chunk_size)
+            ]
+            job.update(
+                scrubbed_csv_path=csv_path.replace(".csv", "_scrubbed.csv"),
+                scrubbed_header=scrubbed_header,
+                scrubbed_rows=scrubbed_rows,
+                scrub_cache=scrub_cache,
+                fills=[
+                    (i, columns[key.upper()], cache_key)
+                    for i, key, cache_key in fills
+                    if key.upper() in columns
+                ],
+                chunks=[
+                    (
+                        [k for k, _ in chunk],
+                        self.loop.run_in_executor(
+                            self.get_executor(), rc.scrub_texts, [t for _, t in chunk]
+                        ),
+                    )
+                    for chunk in chunks
+                ],
+            )
+
+        await self.queue.put(job)
+
+    async def write_job(self, job: dict):
+        """
+        This writes the csv reports of a batch once its scrubbing is done.
+
+        Args:
+            job: The queued report of a batch.
+        """
+        report_writer = job["report_writer"]
+        batch_number = job["batch_number"]
+        await rc.write_report_rows(
+            job["csv_path"], job["header"], job["rows"], batch_number, report_writer
+        )
+
+        if "scrubbed_rows" not in job:
+            return
+
+        values = {}
+        for keys, future in job["chunks"]:
+            values.update(zip(keys, await future, strict=True))
+
+        scrub_cache = job["scrub_cache"]
+        if scrub_cache is not None:
+            for key, value in values.items():
+                scrub_cache.put(key, value)
+
+        rows = job["scrubbed_rows"]
+        for i, column, cache_key in job["fills"]:
+            rows[i][column] = rc.get_report_cell(values[cache_key], job["compact"])
+
+        await rc.write_report_rows(
+            job["scrubbed_csv_path"],
+            job["scrubbed_header"],
+            rows,
+            batch_number,
+            report_writer,
+        )
+
+    async def write_jobs(self):
+        queue = self.queue
+        while True:
+            job = await queue.get()
+            try:
+                await self.write_job(job)
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                queue.task_done()
+
+    async def flush(self):
+        """
+        This waits for the queued reports to be written, raising the first error
+        a report ran into.
+        """
+        if self.queue is not None and self.loop is asyncio.get_running_loop():
+            await self.queue.join()
+
+        if self.errors:
+            error, self.errors = self.errors[0], []
+            raise error
+
+    async def close(self):
+        """
+        This writes the queued reports and stops the writer and scrubbing processes.
+        """
+        try:
+            await self.flush()
+        finally:
+            if self.writer is not None and not self.writer.done():
+                self.writer.cancel()
+            self.loop = self.queue = self.writer = None
+
+            if self.owns_executor and self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
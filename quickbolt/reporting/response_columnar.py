@@ -0,0 +1,196 @@
+import asyncio
+import mmap
+import struct
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+from quickbolt.reporting.return_history import default
+
+FRAME_HEADER = struct.Struct("<QQ")
+INT_COLUMNS = ["batch_number", "index"]
+FLOAT_COLUMNS = ["response_seconds", "delay_seconds"]
+STR_COLUMNS = [
+    "description",
+    "code_mismatch",
+    "method",
+    "expected_code",
+    "actual_code",
+    "url",
+    "address",
+]
+TIME_COLUMNS = ["utc_time"]
+SCALAR_COLUMNS = INT_COLUMNS + FLOAT_COLUMNS + STR_COLUMNS + TIME_COLUMNS
+NOT_A_TIME = np.iinfo(np.int64).min
+
+
+def get_bodies_path(path: str) -> str:
+    return str(Path(path).with_suffix("")) + "_bodies.jsonl"
+
+
+def encode_batch(responses: list[dict], body_offset: int) -> tuple[bytes, bytes]:
+    """
+    This encodes the responses of a batch into a frame of columns and their bodies.
+
+    Args:
+        responses: The report form responses from a batch request.
+        body_offset: The size of the bodies file the bodies are appended to.
+
+    Returns:
+        encoded: The frame and the jsonl bodies.
+    """
+    columns = {}
+    for name in INT_COLUMNS:
+        columns[name] = np.array([r.get(name, -1) for r in responses], dtype=np.int32)
+    for name in FLOAT_COLUMNS:
+        values = [r.get(name) for r in responses]
+        columns[name] = np.array(
+            [np.nan if v is None else v for v in values], dtype=np.float64
+        )
+    for name in STR_COLUMNS:
+        values = ["" if r.get(name) is None else str(r[name]) for r in responses]
+        # strings repeat a lot across a batch, so they are stored as codes into their
+        # unique values
+        unique_values, codes = np.unique(
+            np.array(values, dtype=np.str_), return_inverse=True
+        )
+        columns[f"{name}.values"] = unique_values
+        columns[f"{name}.codes"] = codes.astype(np.int32)
+    for name in TIME_COLUMNS:
+        # iso times are stored as utc microseconds since the epoch
+        columns[name] = np.array(
+            [
+                NOT_A_TIME
+                if not r.get(name)
+                else round(datetime.fromisoformat(r[name]).timestamp() * 1_000_000)
+                for r in responses
+            ],
+            dtype=np.int64,
+        )
+
+    bodies = [
+        orjson.dumps(
+            {k: v for k, v in r.items() if k not in SCALAR_COLUMNS},
+            default=default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+        + b"\n"
+        for r in responses
+    ]
+    lengths = np.array([len(b) for b in bodies], dtype=np.int64)
+    columns["body_length"] = lengths.astype(np.int32)
+    columns["body_offset"] = body_offset + np.cumsum(lengths) - lengths
+
+    # a frame is its sizes, a json header of the arrays and the raw bytes of the arrays
+    header = []
+    arrays = []
+    for name, array in columns.items():
+        header.append([name, array.dtype.str, len(array)])
+        arrays.append(np.ascontiguousarray(array).tobytes())
+    header = orjson.dumps(header)
+    payload = b"".join(arrays)
+
+    frame = FRAME_HEADER.pack(len(header), len(payload)) + header + payload
+    return frame, b"".join(bodies)
+
+
+def write_columnar_report(path: str, responses: list[dict]):
+    bodies_path = get_bodies_path(path)
+    with open(bodies_path, "ab") as bodies_file:
+        frame, bodies = encode_batch(responses, bodies_file.tell())
+        bodies_file.write(bodies)
+    with open(path, "ab") as f:
+        f.write(frame)
+
+
+async def create_columnar_report(path: str, _return: dict):
+    """
+    This appends the results of a batch of requests to a columnar report. The scalar
+    columns are framed per batch in a binary file and the remaining fields of each
+    response are written as a json line to a bodies file next to it.
+
+    Args:
+        path: The path to store the columnar report e.g. .../test.cols.
+        _return: The _return from a batch request, in report form see
+            response_csv.prepare_responses.
+    """
+    if _return["responses"]:
+        await asyncio.to_thread(write_columnar_report, path, _return["responses"])
+
+
+def load_columnar_report(path: str) -> dict[str, np.ndarray]:
+    """
+    This loads the columns of a columnar report.
+
+    Args:
+        path: The path of the columnar report.
+
+    Returns:
+        columns: A numpy array per column e.g. {'actual_code': array(['200', ...]), ...}.
+            Times are utc datetime64 arrays and the body_offset and body_length
+            columns locate each row in the bodies file.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    frames = []
+    position = 0
+    while position < len(data):
+        header_length, payload_length = FRAME_HEADER.unpack_from(data, position)
+        position += FRAME_HEADER.size
+        header = orjson.loads(data[position : position + header_length])
+        position += header_length
+
+        frame = {}
+        offset = position
+        for name, dtype, count in header:
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            frame[name] = array
+            offset += array.nbytes
+        frames.append(frame)
+        position += payload_length
+
+    columns = {}
+    numeric_columns = INT_COLUMNS + FLOAT_COLUMNS + ["body_offset", "body_length"]
+    for name in numeric_columns:
+        columns[name] = np.concatenate([f[name] for f in frames] or [np.array([])])
+    for name in TIME_COLUMNS:
+        times = [f[name] for f in frames] or [np.array([], dtype=np.int64)]
+        columns[name] = np.concatenate(times).view("datetime64[us]")
+    for name in STR_COLUMNS:
+        columns[name] = np.concatenate(
+            [f[f"{name}.values"][f[f"{name}.codes"]] for f in frames]
+            or [np.array([], dtype=np.str_)]
+        )
+    return columns
+
+
+def read_bodies(path: str, columns: dict, rows: None | np.ndarray = None) -> list[dict]:
+    """
+    This reads the out of line fields of rows of a columnar report.
+
+    Args:
+        path: The path of the columnar report.
+        columns: The loaded columns of the report.
+        rows: The row numbers or a boolean mask of the rows to read, all if None.
+
+    Returns:
+        bodies: The remaining fields of each row e.g. message, headers and kwargs.
+    """
+    offsets = columns["body_offset"]
+    lengths = columns["body_length"]
+    if rows is not None:
+        offsets, lengths = offsets[rows], lengths[rows]
+    if not len(offsets):
+        return []
+
+    with open(get_bodies_path(path), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as bodies:
+            return [
+                orjson.loads(bodies[offset : offset + length])
+                for offset, length in zip(
+                    offsets.tolist(), lengths.tolist(), strict=True
+                )
+            ]
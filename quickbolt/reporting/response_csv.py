@@ -1,20 +1,85 @@
 import ast
+import asyncio
 import csv
+import os
 import re
-from copy import deepcopy
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import copy
+from hashlib import blake2b
+from io import StringIO
+from itertools import chain, islice, repeat
+from pathlib import Path
+from typing import Any, AsyncGenerator, Generator
 
 import aiofiles.os as aos
-import numpy as np
-from aiocsv import AsyncDictReader, AsyncReader, AsyncWriter
+import orjson
+from aiocsv import AsyncReader, AsyncWriter
 from aiofiles import open as aopen
 
+import quickbolt.utils.compression as cx
 import quickbolt.utils.dictionary as dh
 import quickbolt.utils.json as jh
+import quickbolt.validations.schema as sch
+
+
+def get_manifest_path(csv_path: str) -> str:
+    return f"{csv_path}.segments.json"
+
+
+def get_segment_path(csv_path: str, number: int) -> str:
+    if number == 1:
+        return csv_path
+    suffix = cx.get_suffix(cx.get_compression(csv_path))
+    path = Path(cx.strip_suffix(csv_path))
+    return str(path.with_name(f"{path.stem}-{number}{path.suffix}{suffix}"))
+
+
+def load_manifest(csv_path: str) -> dict:
+    """
+    This loads the manifest of the segments of a rotated report.
+
+    Args:
+        csv_path: The path of the csv report.
+
+    Returns:
+        manifest: The segments of the report e.g. {'segments': [{'path': 'test.csv',
+            'first_batch': 1, 'last_batch': 10, 'batches': 10, 'size': 1048576}, ...]},
+            without segments if the report was never rotated.
+    """
+    manifest_path = Path(get_manifest_path(csv_path))
+    if manifest_path.exists():
+        return orjson.loads(manifest_path.read_bytes())
+    return {"segments": []}
+
+
+def get_report_segments(csv_path: str) -> list[str]:
+    """
+    This finds the segments of a report in order, the report itself if it wasn't rotated.
+
+    Args:
+        csv_path: The path of the csv report.
+
+    Returns:
+        segment_paths: The paths of the segments.
+    """
+    segments = load_manifest(csv_path)["segments"]
+    if not segments:
+        return [csv_path]
+    return [str(Path(csv_path).with_name(s["path"])) for s in segments]
+
+
+def read_rows(csv_path: str) -> list[list]:
+    with cx.open_file(csv_path, "rt", encoding="ascii", newline="") as csv_file:
+        return list(csv.reader(csv_file))
 
 
 async def read_csv(csv_path: None | str) -> list[list]:
     """
-    This reads a csv.
+    This reads a csv, across its segments if it was rotated.
 
     Args:
         csv_path: The path to the csv file. If path is None the default one is found and used.
@@ -22,102 +87,375 @@ async def read_csv(csv_path: None | str) -> list[list]:
         data: The rows of a csv file.
     """
 
-    def try_ast_eval(item):
-        try:
-            return ast.literal_eval(item)
-        except:
-            return item
+    data = []
+    for segment_path in await asyncio.to_thread(get_report_segments, csv_path):
+        if cx.get_compression(segment_path):
+            rows = await asyncio.to_thread(read_rows, segment_path)
+        else:
+            async with aopen(segment_path, encoding="ascii", newline="") as csv_file:
+                rows = [row async for row in AsyncReader(csv_file)]
+        # the segments of a rotated report after the first repeat its column titles
+        data.extend(rows[1:] if data else rows)
 
-    async with aopen(csv_path, encoding="ascii", newline="") as csv_file:
-        data = [row async for row in AsyncReader(csv_file)]
+    return [[read_cell(item) for item in row] for row in data if row]
 
-    return [
-        [
-            try_ast_eval(item)
-            if (
-                not ("MultiDict" in item or "BufferedReader" in item)
-                and ("[" in item or "{" in item)
-            )
-            else item
-            for item in row
-        ]
-        for row in data
-        if row
-    ]
 
+def read_cell(item: str) -> Any:
+    """
+    This converts a cell of read_csv holding a list or dict. It's loaded as json,
+    see parse_cell, and only literal evaluated if it isn't json e.g. a python repr.
+
+    Args:
+        item: The cell to convert.
 
-def scrub(text: str, full: bool = False) -> str:
+    Returns:
+        value: The converted cell or the original cell.
+    """
+    if "MultiDict" in item or "BufferedReader" in item:
+        return item
+    if "[" not in item and "{" not in item:
+        return item
+
+    value = parse_cell(item, json_column=True)
+    # parse_cell hands back the cell itself when it isn't json
+    if value is not item:
+        return value
+    try:
+        return ast.literal_eval(item)
+    except Exception:
+        return item
+
+
+SCRUB_FIELDS = ["message", "url", "server_headers", "headers", "kwargs", "body"]
+TOKEN_PATTERN = re.compile(r"([A-Za-z]+[\d@]+[\w@]*|[\d@]+[A-Za-z]+[\w@]*|\d+)")
+RUN_PATTERN = re.compile(r"[\w@]+")
+TOKEN_CHAR_PATTERN = re.compile(r"[\d@]")
+
+
+def scrub(text: str | bytes, full: bool = False, compact: bool = False) -> str:
     """
     This scrubs text of alphanumerical information.
 
     Args:
         text: The text to scrub.
         full: Full char conversion to 0's.
+        compact: Whether to give back compact json, e.g. when it's deserialized next.
 
     Returns:
         scrubbed_text: The scrubbed text.
     """
-    # need to do better here
-    text_dict = jh.deserialize(text)
-    flat_scrubbed_text = dh.flatten(text_dict)
+    targets: dict = {}
+    round_trip = False
+
+    def annotate(value):
+        nonlocal round_trip
+
+        if isinstance(value, dict) and value:
+            for k in value:
+                # keys flatten and unflatten wouldn't give back as they were
+                if not isinstance(k, str) or not k or "." in k or k.isdigit():
+                    round_trip = True
+            return {k: annotate(v) for k, v in value.items()}
+        if isinstance(value, list) and value:
+            return [annotate(v) for v in value]
 
-    targets = []
-    for key, value in flat_scrubbed_text.items():
         if isinstance(value, (int, float)):
-            val_type = type(value).__name__
-            flat_scrubbed_text[key] = f"{value} <{val_type}>"
-
-        target_str = str(flat_scrubbed_text[key])
-        target = [target_str]
-        if not full:
-            target = re.findall(
-                r"([A-Za-z]+[\d@]+[\w@]*|[\d@]+[A-Za-z]+[\w@]*|\d+)",
-                target_str,
-            )
-        targets.extend(target)
-    targets.sort(key=len, reverse=True)
+            value = f"{value} <{type(value).__name__}>"
+        add_targets(value)
+        return value
+
+    def add_targets(value):
+        target_str = str(value)
+        if full:
+            targets[target_str] = None
+        else:
+            targets.update(dict.fromkeys(TOKEN_PATTERN.findall(target_str)))
+
+    annotated = annotate(jh.deserialize(text))
+    if round_trip:
+        flat = dh.flatten(annotated)
+        # the leaves of keys that collide once flattened are dropped, so the
+        # targets are taken from the flat leaves that are kept instead
+        targets.clear()
+        for value in flat.values():
+            add_targets(value)
+        annotated = dh.unflatten(flat)
+    scrubbed_text = jh.serialize(annotated, compact=compact)
+
+    # like the original scrub the targets are replaced longest first throughout the
+    # text, keys included, which rewriting only the leaves wouldn't give back
+    ordered_targets = sorted(targets, key=len, reverse=True)
+    if full:
+        for t in ordered_targets:
+            scrubbed_text = scrubbed_text.replace(t, "0" * len(t))
+        return scrubbed_text
+
+    # every token is a run of [\w@] chars holding a digit or @, so replacing them
+    # run by run in one pass gives the same text as replacing them one by one
+    scrubbed_runs: dict = {}
 
-    unflat_scrubbed_text = dh.unflatten(flat_scrubbed_text)
-    scrubbed_text = jh.serialize(unflat_scrubbed_text)
+    def scrub_run(match):
+        run = match.group()
+        if run in targets:
+            return "0" * len(run)
+        if not TOKEN_CHAR_PATTERN.search(run):
+            return run
 
-    for t in targets:
-        scrubbed_text = scrubbed_text.replace(t, "0" * len(t))
+        if run not in scrubbed_runs:
+            scrubbed_run = run
+            for t in ordered_targets:
+                if t in scrubbed_run:
+                    scrubbed_run = scrubbed_run.replace(t, "0" * len(t))
+            scrubbed_runs[run] = scrubbed_run
+        return scrubbed_runs[run]
 
-    return scrubbed_text
+    return RUN_PATTERN.sub(scrub_run, scrubbed_text)
 
 
-def scrub_data(data: dict, full_scrub_fields: None | list = None) -> dict:
+class ScrubCache(object):
     """
-    This scrubs a dict against pre-defined fields.
+    This is a bounded LRU cache of scrubbed values keyed on a hash of their serialized
+    text and the full flag. The cached values are shared, so they mustn't be mutated.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        The constructor for ScrubCache.
+
+        Args:
+            maxsize: The max amount of scrubbed values to keep.
+        """
+        self.maxsize = maxsize
+        self.values: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def scrub(self, text: str | bytes, full: bool = False) -> Any:
+        """
+        This scrubs serialized text, reusing the result for repeated text.
+
+        Args:
+            text: The serialized text to scrub.
+            full: Full char conversion to 0's.
+
+        Returns:
+            scrubbed_value: The deserialized scrubbed text.
+        """
+        key = self.key(text, full)
+        found, value = self.get(key)
+        if not found:
+            value = jh.deserialize(scrub(text, full, compact=True))
+            self.put(key, value)
+        return value
+
+    @staticmethod
+    def key(text: str | bytes, full: bool = False) -> tuple[bytes, bool]:
+        """
+        This makes the cache key of serialized text.
+
+        Args:
+            text: The serialized text to scrub.
+            full: Full char conversion to 0's.
+
+        Returns:
+            key: The hash of the text and the full flag.
+        """
+        if isinstance(text, str):
+            text = text.encode()
+        return blake2b(text, digest_size=16).digest(), full
+
+    def get(self, key: tuple[bytes, bool]) -> tuple[bool, Any]:
+        """
+        This looks up a scrubbed value, counting the hit or miss.
+
+        Args:
+            key: The cache key of the serialized text.
+
+        Returns:
+            found: Whether the value was cached and the value if so.
+        """
+        if key not in self.values:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        self.values.move_to_end(key)
+        return True, self.values[key]
+
+    def put(self, key: tuple[bytes, bool], value: Any):
+        """
+        This caches a scrubbed value, evicting the least recently used one if full.
+
+        Args:
+            key: The cache key of the serialized text.
+            value: The deserialized scrubbed text.
+        """
+        self.values[key] = value
+        if len(self.values) > self.maxsize:
+            self.values.popitem(last=False)
+
+
+def get_scrub_fields(data: dict, full_scrub_fields: None | list = None) -> list:
+    """
+    This finds the fields of a dict to scrub against pre-defined fields.
 
     Args:
         data: A response report object.
         full_scrub_fields: The fields to do a full char scrub on.
 
     Returns:
-        scrubbed_data: A scrubbed response report object.
+        fields: The keys to scrub and whether to do a full char scrub e.g. [(key, full)].
     """
     if not isinstance(full_scrub_fields, list):
         full_scrub_fields = ["headers"]
     full_scrub_fields = [f.lower() for f in full_scrub_fields]
 
-    scrub_fields = ["message", "url", "server_headers", "headers", "kwargs", "body"]
+    return [
+        (key, key.lower() in full_scrub_fields)
+        for key, value in data.items()
+        if key.lower() in SCRUB_FIELDS and value
+    ]
+
+
+def scrub_texts(texts: list[tuple[str | bytes, bool]]) -> list:
+    """
+    This scrubs serialized texts e.g. in a worker process.
+
+    Args:
+        texts: The serialized texts and whether to do a full char scrub e.g. [(text, full)].
+
+    Returns:
+        scrubbed_values: The deserialized scrubbed texts.
+    """
+    return [jh.deserialize(scrub(text, full, compact=True)) for text, full in texts]
+
+
+def scrub_data(
+    data: dict,
+    full_scrub_fields: None | list = None,
+    scrub_cache: None | ScrubCache = None,
+) -> dict:
+    """
+    This scrubs a dict against pre-defined fields.
 
-    data_copy = deepcopy(data)
-    for key, value in data_copy.items():
-        key_lower = key.lower()
-        if key_lower in scrub_fields and value:
-            full = False
-            if key_lower in full_scrub_fields:
-                full = True
+    Args:
+        data: A response report object.
+        full_scrub_fields: The fields to do a full char scrub on.
+        scrub_cache: A cache to reuse the scrubbed values of repeated fields from.
 
-            data_ser = jh.serialize(value)
-            data_scr = scrub(data_ser, full)
-            data_copy[key] = jh.deserialize(data_scr)
+    Returns:
+        scrubbed_data: A scrubbed response report object.
+    """
+    data_copy = copy(data)
+    for key, full in get_scrub_fields(data_copy, full_scrub_fields):
+        data_ser = jh.serialize_bytes(data_copy[key])
+        if scrub_cache is not None:
+            data_copy[key] = scrub_cache.scrub(data_ser, full)
+        else:
+            data_copy[key] = jh.deserialize(scrub(data_ser, full, compact=True))
 
     return data_copy
 
 
+JSON_COLUMNS = ["MESSAGE", "SERVER_HEADERS", "HEADERS", "KWARGS", "BODY"]
+JSON_START_CHARS = frozenset('-0123456789tfn"[{ \t\r\n')
+
+
+def parse_cell(value: Any, json_column: bool = False) -> Any:
+    """
+    This converts a csv cell to its pythonic object with jh.deserialize(safe=True),
+    skipping the cells that can't be json.
+
+    Args:
+        value: The cell to convert.
+        json_column: Whether the cell is from a column known to hold json.
+
+    Returns:
+        value: The converted cell or the original cell.
+    """
+    if not value or not isinstance(value, str):
+        return value
+    # a cell can only be json (leading zeros or not) if it starts like json
+    if not json_column and value[0] not in JSON_START_CHARS:
+        return value
+
+    return jh.deserialize(value, safe=True)
+
+
+def parse_row(header: list, row: list, typed: bool = True) -> dict:
+    """
+    This converts a csv row to a dict, like csv.DictReader missing cells are None
+    and extra cells are kept under None.
+
+    Args:
+        header: The column titles.
+        row: The cells of the row.
+        typed: Whether to convert the cells, see parse_cell, or keep the raw strings.
+
+    Returns:
+        data: The row as a dictionary.
+    """
+    if typed:
+        data = {
+            k: parse_cell(v, k in JSON_COLUMNS)
+            for k, v in zip(header, row, strict=False)
+        }
+    else:
+        data = dict(zip(header, row, strict=False))
+
+    if len(row) < len(header):
+        data.update(dict.fromkeys(header[len(row) :]))
+    elif len(row) > len(header):
+        data[None] = row[len(header) :]
+    return data
+
+
+def parse_cells(data: dict) -> dict:
+    """
+    This converts the raw cells of a row e.g. from iter_csv_rows(typed=False).
+
+    Args:
+        data: The row as a dictionary of raw strings.
+
+    Returns:
+        data: The row with its cells converted, see parse_cell.
+    """
+    return {k: parse_cell(v, k in JSON_COLUMNS) for k, v in data.items()}
+
+
+async def iter_csv_rows(
+    csv_path: str, typed: bool = True, chunk_size: int = 1000
+) -> AsyncGenerator[dict, None]:
+    """
+    This streams the rows of a csv report as dicts, skipping blank rows. The file,
+    or each segment of a rotated report, is read and parsed in chunks off the loop.
+
+    Args:
+        csv_path: The path to the csv file.
+        typed: Whether to convert the cells, see parse_cell, or keep the raw strings.
+        chunk_size: How many rows to read at a time.
+
+    Returns:
+        rows: The rows of the csv file.
+    """
+
+    def read_chunk(reader, header):
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return None
+        return [parse_row(header, r, typed) for r in rows if r]
+
+    for segment_path in await asyncio.to_thread(get_report_segments, csv_path):
+        with cx.open_file(segment_path, "rt", encoding="ascii", newline="") as csv_file:
+            reader = csv.reader(csv_file)
+            header = await asyncio.to_thread(next, reader, [])
+            while (
+                chunk := await asyncio.to_thread(read_chunk, reader, header)
+            ) is not None:
+                for row in chunk:
+                    yield row
+
+
 async def csv_to_dict(
     csv_data: str | list, scrub: bool = False, full_scrub_fields: None | list = None
 ) -> list[dict]:
@@ -132,39 +470,25 @@ async def csv_to_dict(
         data: The csv file represented as a dictionary.
     """
     if isinstance(csv_data, str):
-        async with aopen(csv_data, encoding="ascii", newline="") as csv_file:
-            data = [row async for row in AsyncDictReader(csv_file)]
+        data = [row async for row in iter_csv_rows(csv_data, typed=not scrub)]
+        if not scrub:
+            return data
     elif isinstance(csv_data, list):
         data = [dict(zip(csv_data[0], r)) for r in csv_data[1:] if r]
 
     if scrub:
         data = [scrub_data(d, full_scrub_fields=full_scrub_fields) for d in data]
 
-    for row in data:
-        for k, v in row.items():
-            if v:
-                row[k] = jh.deserialize(v, safe=True)
+    return [parse_cells(d) for d in data]
 
-    return data
 
-
-async def create_csv_report(
-    csv_path: str,
-    _return: dict,
-    scrub: bool = False,
-    full_scrub_fields: None | list = None,
-):
+def prepare_responses(responses: list[dict]):
     """
-    This writes the results of each batch of requests to a csv report file.
+    This converts the responses of a batch in place into their report form.
 
     Args:
-        csv_path: The path to store the csv report.
-        _return: The _return from a batch request.
-        scrub: Whether to remove sensitive info from the data.
-        full_scrub_fields: The fields to do a full char scrub on.
+        responses: The responses from a batch request.
     """
-    responses = _return["responses"]
-
     for r in responses:
         r["server_headers"] = dict(r["server_headers"])
 
@@ -187,31 +511,347 @@ async def create_csv_report(
             if not isinstance(value, (str, int, float, list, dict)):
                 kwargs[key] = str(value)
 
-    col_titles = [""]
-    if not await aos.path.exists(csv_path):
-        col_titles = [[key.upper() for key in responses[0].keys()]]
 
-    csv_data = col_titles + [list(r.values()) for r in responses]
-    await add_rows_to_csv_report(csv_path, csv_data)
+def scrub_responses(responses: list[dict]) -> list[dict]:
+    """
+    This copies the responses of a batch for scrubbing, blanking the curl.
+
+    Args:
+        responses: The report form responses from a batch request.
+
+    Returns:
+        scrubbed_responses: The copies to scrub.
+    """
+    return [{k: v if k != "curl" else "" for k, v in r.items()} for r in responses]
+
+
+class CsvReportWriter(object):
+    """
+    This keeps csv reports open and appends their rows in bulk. Rows are encoded
+    into a buffer per file and written once the buffer size or interval is hit.
+    Reports can be rotated into numbered segments e.g. test.csv, test-2.csv, ...
+    which a test.csv.segments.json manifest records the batches of.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        max_segment_size: None | int = None,
+        max_segment_batches: None | int = None,
+        compact: bool = False,
+    ):
+        """
+        The constructor for CsvReportWriter.
+
+        Args:
+            buffer_size: How many characters to buffer before writing, 0 to write each time.
+            flush_interval: How many seconds to buffer before writing.
+            max_segment_size: The size in bytes to start a new segment of a report after.
+            max_segment_batches: The amount of batches to start a new segment of a report after.
+            compact: Whether to write the json cells without indentation.
+        """
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_segment_size = max_segment_size
+        self.max_segment_batches = max_segment_batches
+        self.compact = compact
+
+        self.files: dict = {}
+        self.buffers: dict[str, StringIO] = {}
+        self.exists: dict[str, bool] = {}
+        self.manifests: dict[str, dict] = {}
+        self.changed_manifests: set[str] = set()
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+
+    @property
+    def rotates(self) -> bool:
+        return bool(self.max_segment_size or self.max_segment_batches)
+
+    async def get_segment(self, csv_path: str, batch_number: None | int) -> dict:
+        """
+        This finds the segment of a report to append a batch to, starting a new one
+        when the last one is full.
+
+        Args:
+            csv_path: The path of the csv report.
+            batch_number: The batch number of the batch.
+
+        Returns:
+            segment: The manifest entry of the segment.
+        """
+        manifest = self.manifests.get(csv_path)
+        if manifest is None:
+            manifest = await asyncio.to_thread(load_manifest, csv_path)
+            self.manifests[csv_path] = manifest
+
+        segments = manifest["segments"]
+        if not segments:
+            size = 0
+            if await aos.path.exists(csv_path):
+                size = await aos.path.getsize(csv_path)
+            segment = {"path": Path(csv_path).name, "batches": 0, "size": size}
+            if size:
+                # the batches written before rotating was turned on are unknown
+                segment["first_batch"] = None
+            segments.append(segment)
+
+        segment = segments[-1]
+        is_full = (
+            self.max_segment_size and segment["size"] >= self.max_segment_size
+        ) or (
+            self.max_segment_batches and segment["batches"] >= self.max_segment_batches
+        )
+        if is_full and (segment["size"] or segment["batches"]):
+            segment_path = get_segment_path(csv_path, len(segments) + 1)
+            segment = {"path": Path(segment_path).name, "batches": 0, "size": 0}
+            segments.append(segment)
+
+        segment.setdefault("first_batch", batch_number)
+        segment["last_batch"] = batch_number
+        segment["batches"] += 1
+        self.changed_manifests.add(csv_path)
+        return segment
+
+    async def write_batch(
+        self, csv_path: str, header: list, rows: list, batch_number: None | int = None
+    ):
+        """
+        This buffers the rows of a batch for a report, after its header if the report
+        or segment is new and otherwise after a blank row.
+
+        Args:
+            csv_path: The path of the csv report.
+            header: The column titles.
+            rows: The rows of the batch.
+            batch_number: The batch number of the batch, recorded when rotating.
+        """
+        segment = None
+        if self.rotates:
+            segment = await self.get_segment(csv_path, batch_number)
+            csv_path = str(Path(csv_path).with_name(segment["path"]))
+
+        col_titles = [""] if await self.has_rows(csv_path) else [header]
+        size = await self.write_rows(csv_path, col_titles + rows)
+        if segment is not None:
+            segment["size"] += size
+
+    async def has_rows(self, csv_path: str) -> bool:
+        """
+        This checks whether a report was started, only looking on disk the first time.
+
+        Args:
+            csv_path: The path of the csv report.
+
+        Returns:
+            exists: Whether the report exists.
+        """
+        if csv_path not in self.exists:
+            self.exists[csv_path] = await aos.path.exists(csv_path)
+        return self.exists[csv_path]
+
+    async def write_rows(self, csv_path: str, rows: list) -> int:
+        """
+        This buffers rows for a report.
+
+        Args:
+            csv_path: The path of the csv report.
+            rows: The rows to append.
+
+        Returns:
+            size: The size of the encoded rows.
+        """
+        buffer = self.buffers.get(csv_path)
+        if buffer is None:
+            buffer = self.buffers[csv_path] = StringIO(newline="")
+
+        start = buffer.tell()
+        csv.writer(buffer).writerows(rows)
+        size = buffer.tell() - start
+        self.buffered += size
+        self.exists[csv_path] = True
+
+        if (
+            self.buffered >= self.buffer_size
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            await self.flush()
+        return size
+
+    @staticmethod
+    def is_current(csv_path: str, csv_file: Any) -> bool:
+        """
+        This checks whether an open report is still the one at its path e.g. after
+        add_column_to_csv_report replaced it.
+
+        Args:
+            csv_path: The path of the csv report.
+            csv_file: The open report.
+
+        Returns:
+            current: Whether the open report is the one at the path.
+        """
+        try:
+            return os.stat(csv_path).st_ino == os.fstat(csv_file.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    async def flush(self):
+        """
+        This writes the buffered rows to their reports.
+        """
+        self.last_flush = time.monotonic()
+        self.buffered = 0
+        for csv_path, buffer in self.buffers.items():
+            text = buffer.getvalue()
+            if not text:
+                continue
+            buffer.seek(0)
+            buffer.truncate()
+
+            if cx.get_compression(csv_path):
+                # compressed reports are appended in whole members so they stay readable
+                await asyncio.to_thread(
+                    cx.append, csv_path, text, encoding="ascii", newline=""
+                )
+                continue
+
+            csv_file = self.files.get(csv_path)
+            if csv_file is not None and not self.is_current(csv_path, csv_file):
+                await csv_file.close()
+                csv_file = None
+            if csv_file is None:
+                csv_file = await aopen(csv_path, "a", encoding="ascii", newline="")
+                self.files[csv_path] = csv_file
+            await csv_file.write(text)
+            await csv_file.flush()
+
+        for csv_path in self.changed_manifests:
+            manifest = orjson.dumps(
+                self.manifests[csv_path], option=orjson.OPT_INDENT_2
+            )
+            async with aopen(get_manifest_path(csv_path), "wb") as manifest_file:
+                await manifest_file.write(manifest)
+        self.changed_manifests = set()
+
+    async def close(self):
+        """
+        This writes the buffered rows and closes the reports.
+        """
+        try:
+            await self.flush()
+        finally:
+            for csv_file in self.files.values():
+                await csv_file.close()
+            self.files = {}
+            self.buffers = {}
+            self.exists = {}
+            self.manifests = {}
+
+
+def get_report_cell(value: Any, compact: bool = False) -> Any:
+    if isinstance(value, (dict, list)):
+        return jh.serialize(value, compact=compact)
+    return value
+
+
+def get_report_rows(responses: list[dict], compact: bool = False) -> tuple[list, list]:
+    """
+    This converts the report form responses of a batch into csv rows.
+
+    Args:
+        responses: The report form responses from a batch request.
+        compact: Whether to serialize the json cells without indentation.
+
+    Returns:
+        header: The column titles.
+        rows: The rows of the batch, in the order of the column titles.
+    """
+    # the schema results vary per request so they're kept out of the report columns
+    keys = [k for k in responses[0] if k not in sch.SCHEMA_FIELDS]
+    header = [key.upper() for key in keys]
+    rows = [[get_report_cell(r.get(k), compact) for k in keys] for r in responses]
+    return header, rows
+
+
+async def write_report_rows(
+    csv_path: str,
+    header: list,
+    rows: list,
+    batch_number: None | int = None,
+    report_writer: None | CsvReportWriter = None,
+):
+    """
+    This adds the csv rows of a batch to a csv report file.
+
+    Args:
+        csv_path: The path to store the csv report.
+        header: The column titles.
+        rows: The rows of the batch.
+        batch_number: The batch number of the batch.
+        report_writer: The writer to append with, a one off one is used if None.
+    """
+    writer = report_writer or CsvReportWriter(buffer_size=0)
+    try:
+        await writer.write_batch(csv_path, header, rows, batch_number)
+    finally:
+        report_writer is not None or await writer.close()
+
+
+async def write_responses(
+    csv_path: str, responses: list[dict], report_writer: None | CsvReportWriter = None
+):
+    """
+    This adds the report form responses of a batch to a csv report file.
+
+    Args:
+        csv_path: The path to store the csv report.
+        responses: The report form responses from a batch request.
+        report_writer: The writer to append with, a one off one is used if None.
+    """
+    compact = report_writer is not None and report_writer.compact
+    header, rows = get_report_rows(responses, compact)
+    batch_number = responses[0].get("batch_number")
+    await write_report_rows(csv_path, header, rows, batch_number, report_writer)
+
+
+async def create_csv_report(
+    csv_path: str,
+    _return: dict,
+    scrub: bool = False,
+    full_scrub_fields: None | list = None,
+    scrub_cache: None | ScrubCache = None,
+    report_writer: None | CsvReportWriter = None,
+):
+    """
+    This writes the results of each batch of requests to a csv report file.
+
+    Args:
+        csv_path: The path to store the csv report.
+        _return: The _return from a batch request.
+        scrub: Whether to remove sensitive info from the data.
+        full_scrub_fields: The fields to do a full char scrub on.
+        scrub_cache: A cache to reuse the scrubbed values of repeated fields from.
+        report_writer: The writer to append with, a one off one is used if None.
+    """
+    responses = _return["responses"]
+    prepare_responses(responses)
+    await write_responses(csv_path, responses, report_writer)
 
     if scrub:
         scrubbed_csv_path = csv_path.replace(".csv", "_scrubbed.csv")
-
         scrubbed_responses = [
-            {k: v if k != "curl" else "" for k, v in r.copy().items()}
-            for r in responses
-        ]
-        scrubbed_responses = [
-            scrub_data(r, full_scrub_fields=full_scrub_fields)
-            for r in scrubbed_responses
+            scrub_data(r, full_scrub_fields=full_scrub_fields, scrub_cache=scrub_cache)
+            for r in scrub_responses(responses)
         ]
+        await write_responses(scrubbed_csv_path, scrubbed_responses, report_writer)
 
-        col_titles = [""]
-        if not await aos.path.exists(scrubbed_csv_path):
-            col_titles = [[key.upper() for key in responses[0].keys()]]
 
-        csv_data = col_titles + [list(r.values()) for r in scrubbed_responses]
-        await add_rows_to_csv_report(scrubbed_csv_path, csv_data)
+def write_rows(csv_path: str, csv_data: list[list], mode: str = "a+"):
+    mode = "wt" if mode.startswith("w") else "at"
+    with cx.open_file(csv_path, mode, encoding="ascii", newline="") as csv_file:
+        csv.writer(csv_file).writerows(csv_data)
 
 
 async def add_rows_to_csv_report(csv_path: None | str, csv_data: list[list], mode="a+"):
@@ -225,51 +865,224 @@ async def add_rows_to_csv_report(csv_path: None | str, csv_data: list[list], mod
     """
     if not isinstance(csv_data, list):
         csv_data = [[csv_data]]
+    if not mode.startswith("w"):
+        # the rows of a rotated report are appended to its last segment
+        segment_path = (await asyncio.to_thread(get_report_segments, csv_path))[-1]
+    else:
+        segment_path = csv_path
 
     for data in csv_data[1:]:
         for i, cell in enumerate(data):
             if isinstance(cell, (dict, list)):
                 data[i] = jh.serialize(cell)
 
-    async with aopen(csv_path, mode=mode, encoding="ascii", newline="") as csv_file:
-        writer = AsyncWriter(csv_file)
-        await writer.writerows(csv_data)
+    if cx.get_compression(segment_path):
+        await asyncio.to_thread(write_rows, segment_path, csv_data, mode)
+    else:
+        async with aopen(
+            segment_path, mode=mode, encoding="ascii", newline=""
+        ) as csv_file:
+            writer = AsyncWriter(csv_file)
+            await writer.writerows(csv_data)
+    await asyncio.to_thread(update_manifest, csv_path)
+
+
+def find_last_n_rows(csv_file: Any, rows: int, block_size: int = 64 * 1024) -> int:
+    """
+    This scans a csv file backwards for the offset its last n rows start at. A
+    newline ends a row when the quotes after it are even, as quotes are either
+    around a cell or escaped in pairs, so newlines in quoted cells are skipped.
+
+    Args:
+        csv_file: The csv file opened in binary mode.
+        rows: The amount of last rows, blank rows count as rows.
+        block_size: How many bytes to read at a time.
+
+    Returns:
+        offset: The offset of the first of the last n rows, 0 if there are fewer rows.
+    """
+    end = csv_file.seek(0, os.SEEK_END)
+    position = end
+    quotes = 0
+    found = 0
+    while position > 0:
+        start = max(0, position - block_size)
+        csv_file.seek(start)
+        block = csv_file.read(position - start)
+
+        i = len(block)
+        while (newline := block.rfind(b"\n", 0, i)) != -1:
+            quotes += block.count(b'"', newline + 1, i)
+            i = newline
+            # skip newlines in quoted cells and the one ending the last row
+            if quotes % 2 or start + newline == end - 1:
+                continue
+            found += 1
+            if found == rows:
+                return start + newline + 1
+        quotes += block.count(b'"', 0, i)
+        position = start
+    return 0
+
+
+def count_rows(csv_path: str, blank: bool = True) -> int:
+    with cx.open_file(csv_path, "rt", encoding="ascii", newline="") as csv_file:
+        return sum(1 for row in csv.reader(csv_file) if blank or row)
+
+
+def get_batch_numbers(csv_path: str) -> list:
+    with cx.open_file(csv_path, "rt", encoding="ascii", newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, [])
+        if "BATCH_NUMBER" not in header:
+            return []
+        i = header.index("BATCH_NUMBER")
+        numbers = {int(row[i]) for row in reader if len(row) > i and row[i].isdigit()}
+    return sorted(numbers)
+
+
+def update_manifest(csv_path: str, batches: bool = False):
+    """
+    This updates the manifest of a rotated report after its segments were edited,
+    dropping the removed segments and updating the size of the rest.
+
+    Args:
+        csv_path: The path of the csv report.
+        batches: Whether to also update the batches of the last segment from its rows
+            e.g. after rows were deleted from it.
+    """
+    manifest = load_manifest(csv_path)
+    if not manifest["segments"]:
+        return
+
+    path = Path(csv_path)
+    segments = [s for s in manifest["segments"] if path.with_name(s["path"]).exists()]
+    for segment in segments:
+        segment["size"] = path.with_name(segment["path"]).stat().st_size
+
+    if batches and segments:
+        segment = segments[-1]
+        numbers = get_batch_numbers(str(path.with_name(segment["path"])))
+        segment["batches"] = len(numbers)
+        if numbers:
+            segment["first_batch"], segment["last_batch"] = numbers[0], numbers[-1]
+        else:
+            # the next batch written to the segment starts its batches again
+            segment.pop("first_batch", None)
+            segment.pop("last_batch", None)
+
+    manifest["segments"] = segments
+    with open(get_manifest_path(csv_path), "wb") as manifest_file:
+        manifest_file.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+
+def truncate_last_n_rows(csv_path: str, rows: int):
+    if not cx.get_compression(csv_path):
+        with open(csv_path, "rb+") as csv_file:
+            csv_file.truncate(find_last_n_rows(csv_file, rows))
+        return
+
+    # compressed reports can't be cut in place so the kept rows are rewritten
+    keep = max(count_rows(csv_path) - rows, 0)
+    with replace_file(csv_path) as temp_file:
+        with cx.open_file(csv_path, "rt", encoding="ascii", newline="") as csv_file:
+            csv.writer(temp_file).writerows(islice(csv.reader(csv_file), keep))
+
+
+def truncate_report(csv_path: str, rows: int):
+    segment_paths = get_report_segments(csv_path)
+    for segment_path in reversed(segment_paths[1:]):
+        # the column titles repeated by a segment aren't rows of the report
+        segment_rows = count_rows(segment_path) - 1
+        if rows < segment_rows:
+            break
+        os.remove(segment_path)
+        segment_paths.pop()
+        rows -= segment_rows
+
+    if rows > 0:
+        truncate_last_n_rows(segment_paths[-1], rows)
+    update_manifest(csv_path, batches=True)
 
 
 async def delete_last_n_rows_from_csv_report(csv_path: None | str, rows: int = 1):
     """
-    This removes the last n row(s) from an existing csv report.
+    This removes the last n row(s) from an existing csv report by truncating it in
+    place, only the tail of the report is read. The last segments of a rotated
+    report are removed as they're emptied and its manifest is updated. A
+    CsvReportWriter still writing the report should be closed first.
 
     Args:
         csv_path: The path to the csv file. If path is None the default one is found and used.
         rows: The last n rows to remove.
     """
-    async with aopen(csv_path, encoding="ascii", newline="") as csv_file:
-        content = await csv_file.read()
-    reader = csv.reader(content.splitlines())
-    data = list(reader)
+    if rows > 0:
+        await asyncio.to_thread(truncate_report, csv_path, rows)
 
-    await add_rows_to_csv_report(csv_path, data[:-rows], mode="w")
 
-
-async def add_column_to_csv_report(csv_path: str, column: list):
+@contextmanager
+def replace_file(csv_path: str) -> Generator:
     """
-    This adds a column to an existing csv report
+    This writes a replacement of a csv file to a temp file next to it, which
+    replaces the file once it's written. The temp file keeps the compression of
+    the file.
 
     Args:
         csv_path: The path to the csv file.
-        column: The column to add to the report.
-    """
-    rows = await read_csv(csv_path)
 
-    rows_no_newlines = np.array([r for r in rows if r])
-    normalized_column = np.array(
-        [column[0]] + [""] * (len(rows_no_newlines) - len(column)) + column[1:]
+    Returns:
+        temp_file: The open temp file to write the rows to.
+    """
+    path = Path(csv_path)
+    fd, temp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=path.suffix
     )
-    new_rows = np.column_stack([rows_no_newlines, normalized_column]).tolist()
+    os.close(fd)
+    try:
+        with cx.open_file(temp_path, "wt", encoding="ascii", newline="") as temp_file:
+            yield temp_file
+        shutil.copymode(csv_path, temp_path)
+        os.replace(temp_path, csv_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_column(csv_path: str, column: list):
+    segment_paths = get_report_segments(csv_path)
+    # each segment starts with the column titles, the rest are rows of the report
+    row_count = sum(max(count_rows(p, blank=False) - 1, 0) for p in segment_paths)
+    if not column or len(column) - 1 > row_count:
+        raise ValueError(
+            f"The column must have a title and at most {row_count} values."
+        )
+
+    column = [jh.serialize(c) if isinstance(c, (dict, list)) else c for c in column]
+    values = chain(repeat("", row_count - len(column) + 1), column[1:])
 
-    newline_indices = [i for i, row in enumerate(rows) if not row]
-    for ni in newline_indices:
-        new_rows.insert(ni, [])
+    for segment_path in segment_paths:
+        with replace_file(segment_path) as temp_file:
+            with cx.open_file(
+                segment_path, "rt", encoding="ascii", newline=""
+            ) as csv_file:
+                writer = csv.writer(temp_file)
+                title = column[:1]
+                for row in csv.reader(csv_file):
+                    if row:
+                        row.append(title.pop() if title else next(values))
+                    writer.writerow(row)
+    update_manifest(csv_path)
 
-    await add_rows_to_csv_report(csv_path, new_rows, mode="w")
+
+async def add_column_to_csv_report(csv_path: str, column: list):
+    """
+    This adds a column to an existing csv report. The first value is the title and
+    the rest are aligned with the last rows. The report is streamed row by row into
+    a temp file that then replaces it, so cells are copied as is without parsing.
+    Each segment of a rotated report gets the column and its manifest is updated.
+
+    Args:
+        csv_path: The path to the csv file.
+        column: The column to add to the report.
+    """
+    await asyncio.to_thread(write_column, csv_path, column)
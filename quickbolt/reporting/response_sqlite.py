@@ -0,0 +1,166 @@
+import asyncio
+import sqlite3
+from typing import Any
+
+import orjson
+
+from quickbolt.reporting.return_history import default
+
+SCALAR_COLUMNS = {
+    "batch_number": "INTEGER",
+    "index": "INTEGER",
+    "description": "TEXT",
+    "code_mismatch": "TEXT",
+    "method": "TEXT",
+    "expected_code": "TEXT",
+    "actual_code": "TEXT",
+    "url": "TEXT",
+    "address": "TEXT",
+    "utc_time": "TEXT",
+    "response_seconds": "REAL",
+    "delay_seconds": "REAL",
+}
+JSON_COLUMNS = ["message", "server_headers", "headers", "kwargs", "body", "extra"]
+INDEXED_COLUMNS = ["batch_number", "description", "actual_code", "code_mismatch"]
+
+COLUMNS = list(SCALAR_COLUMNS) + JSON_COLUMNS
+CREATE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS responses (id INTEGER PRIMARY KEY, {})".format(
+        ", ".join(
+            [f'"{c}" {t}' for c, t in SCALAR_COLUMNS.items()]
+            + [f'"{c}" TEXT' for c in JSON_COLUMNS]
+        )
+    )
+)
+CREATE_INDEXES = [
+    f'CREATE INDEX IF NOT EXISTS responses_{c} ON responses ("{c}")'
+    for c in INDEXED_COLUMNS
+]
+INSERT = "INSERT INTO responses ({}) VALUES ({})".format(
+    ", ".join(f'"{c}"' for c in COLUMNS), ", ".join("?" * len(COLUMNS))
+)
+
+
+def dumps(value: Any) -> str:
+    return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def to_row(response: dict) -> tuple:
+    """
+    This converts a response into a row of the responses table. Fields without a
+    column of their own e.g. curl are kept in the extra json column.
+
+    Args:
+        response: A report form response.
+
+    Returns:
+        row: The values of the row in column order.
+    """
+    row = []
+    for column in SCALAR_COLUMNS:
+        value = response.get(column)
+        if value is not None and SCALAR_COLUMNS[column] == "TEXT":
+            value = str(value)
+        row.append(value)
+
+    for column in JSON_COLUMNS[:-1]:
+        row.append(dumps(response.get(column)))
+
+    extra = {k: v for k, v in response.items() if k not in COLUMNS}
+    row.append(dumps(extra))
+    return tuple(row)
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """
+    This opens a report database, creating its table and indexes if needed.
+
+    Args:
+        db_path: The path of the database.
+
+    Returns:
+        connection: The connection to the database.
+    """
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(CREATE_TABLE)
+    for create_index in CREATE_INDEXES:
+        connection.execute(create_index)
+    return connection
+
+
+def write_sqlite_report(db_path: str, responses: list[dict]):
+    connection = connect(db_path)
+    try:
+        with connection:
+            connection.executemany(INSERT, [to_row(r) for r in responses])
+    finally:
+        connection.close()
+
+
+async def create_sqlite_report(db_path: str, _return: dict):
+    """
+    This writes the results of each batch of requests to a sqlite report, in one
+    transaction per batch.
+
+    Args:
+        db_path: The path to store the sqlite report e.g. .../test.db.
+        _return: The _return from a batch request, in report form see
+            response_csv.prepare_responses.
+    """
+    if _return["responses"]:
+        await asyncio.to_thread(write_sqlite_report, db_path, _return["responses"])
+
+
+def query_sqlite_report(db_path: str, sql: str, params: tuple | dict = ()) -> list:
+    """
+    This queries a sqlite report.
+
+    Args:
+        db_path: The path of the sqlite report.
+        sql: The query e.g. 'SELECT * FROM responses WHERE actual_code LIKE ?'.
+        params: The parameters of the query e.g. ('5%',).
+
+    Returns:
+        rows: The rows as dicts with their json columns loaded.
+    """
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        rows = [dict(r) for r in connection.execute(sql, params)]
+    finally:
+        connection.close()
+
+    for row in rows:
+        for column in JSON_COLUMNS:
+            if isinstance(row.get(column), str):
+                row[column] = orjson.loads(row[column])
+    return rows
+
+
+async def query_sqlite_reports(
+    db_paths: str | list[str], sql: str, params: tuple | dict = ()
+) -> list[dict]:
+    """
+    This runs a query against one or more sqlite reports e.g. of many runs.
+
+    Args:
+        db_paths: The path(s) of the sqlite reports.
+        sql: The query e.g. 'SELECT * FROM responses WHERE actual_code LIKE ?'.
+        params: The parameters of the query e.g. ('5%',).
+
+    Returns:
+        rows: The rows of every report as dicts, with the path of their report.
+    """
+    if not isinstance(db_paths, list):
+        db_paths = [db_paths]
+
+    results = await asyncio.gather(
+        *[asyncio.to_thread(query_sqlite_report, p, sql, params) for p in db_paths]
+    )
+    return [
+        {"report": db_path, **row}
+        for db_path, rows in zip(db_paths, results, strict=True)
+        for row in rows
+    ]
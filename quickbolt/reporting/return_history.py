@@ -0,0 +1,167 @@
+import asyncio
+from collections import Counter, deque
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, AsyncGenerator, Generator
+
+import orjson
+from aiofiles import open as aopen
+
+import quickbolt.utils.directory as dh
+
+POLICIES = ["full", "last", "summary", "spill"]
+
+
+def summarize(_return: dict) -> dict:
+    """
+    This summarizes the _return of a batch.
+
+    Args:
+        _return: The _return from a batch request.
+
+    Returns:
+        summary: The duration, size, status code and mismatch counts of the batch.
+    """
+    responses = _return.get("responses", [])
+    return {
+        "duration": _return.get("duration"),
+        "batch_number": responses[0].get("batch_number") if responses else None,
+        "responses": len(responses),
+        "codes": dict(Counter(str(r.get("actual_code")) for r in responses)),
+        "code_mismatches": sum(1 for r in responses if r.get("code_mismatch")),
+        "schema_mismatches": sum(1 for r in responses if r.get("schema_mismatch")),
+    }
+
+
+def default(obj: Any) -> Any:
+    """
+    This converts the non json types found in responses e.g. header multidicts.
+
+    Args:
+        obj: The object orjson couldn't serialize.
+
+    Returns:
+        obj: A serializable version of the object.
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+class ReturnHistory(object):
+    """
+    This is the history of the _return of each batch, bounded by a policy. The
+    spilled batches are read back with await get(index) or async for, the in memory
+    ones can also be indexed and iterated directly.
+    """
+
+    def __init__(
+        self,
+        policy: str = "full",
+        size: None | int = None,
+        spill_path: None | str = None,
+    ):
+        """
+        The constructor for ReturnHistory.
+
+        Args:
+            policy: How to keep the history, one of
+                full: keep every batch in memory.
+                last: keep the last size batches in memory.
+                summary: keep only a summary of each batch in memory.
+                spill: append every batch to spill_path and read them back lazily.
+            size: The amount of batches kept by the last policy.
+            spill_path: The path of the jsonl file used by the spill policy.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"The history policy must be one of {POLICIES}.")
+        if policy == "last" and not size:
+            raise ValueError("The last history policy needs a size.")
+        if policy == "spill" and not spill_path:
+            raise ValueError("The spill history policy needs a spill_path.")
+
+        self.policy = policy
+        self.size = size
+        self.spill_path = spill_path
+
+        self.batches: list | deque = deque(maxlen=size) if policy == "last" else []
+        self.offsets: list[int] = []
+        self.lock = asyncio.Lock()
+
+        if policy == "spill":
+            dh.safe_mkdirs_sync(str(Path(spill_path).parent))
+            Path(spill_path).write_bytes(b"")
+
+    async def append(self, _return: dict):
+        """
+        This adds the _return of a batch to the history.
+
+        Args:
+            _return: The _return from a batch request.
+        """
+        if self.policy == "summary":
+            self.batches.append(summarize(_return))
+        elif self.policy == "spill":
+            line = orjson.dumps(
+                _return, default=default, option=orjson.OPT_NON_STR_KEYS
+            )
+            async with self.lock, aopen(self.spill_path, "ab") as f:
+                self.offsets.append(await f.tell())
+                await f.write(line + b"\n")
+        else:
+            self.batches.append(_return)
+
+    async def read(self, offset: int) -> dict:
+        """
+        This reads a spilled batch.
+
+        Args:
+            offset: The byte offset of the batch in the spill file.
+
+        Returns:
+            _return: The spilled _return of the batch.
+        """
+        async with aopen(self.spill_path, "rb") as f:
+            await f.seek(offset)
+            return orjson.loads(await f.readline())
+
+    async def get(self, index: int) -> dict:
+        """
+        This gets the _return of a batch, reading it back if it was spilled.
+
+        Args:
+            index: The index of the batch in the history.
+
+        Returns:
+            _return: The _return of the batch.
+        """
+        if self.policy == "spill":
+            return await self.read(self.offsets[index])
+        return self.batches[index]
+
+    def __len__(self) -> int:
+        return len(self.offsets) if self.policy == "spill" else len(self.batches)
+
+    def check_in_memory(self):
+        if self.policy == "spill":
+            raise TypeError(
+                "The spilled history is read with await get(index) or async for."
+            )
+
+    def __getitem__(self, index: int) -> dict:
+        self.check_in_memory()
+        return self.batches[index]
+
+    def __iter__(self) -> Generator:
+        self.check_in_memory()
+        yield from self.batches
+
+    async def __aiter__(self) -> AsyncGenerator:
+        if self.policy != "spill":
+            for batch in self.batches:
+                yield batch
+            return
+
+        async with aopen(self.spill_path, "rb") as f:
+            for _ in range(len(self.offsets)):
+                yield orjson.loads(await f.readline())
@@ -0,0 +1,98 @@
+import gzip
+from pathlib import Path
+from typing import IO, Any
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        from backports import zstd
+    except ImportError:
+        zstd = None
+
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def get_suffix(compression: None | str) -> str:
+    """
+    This gets the file suffix of a compression.
+
+    Args:
+        compression: The compression, one of None, gzip or zstd.
+
+    Returns:
+        suffix: The suffix e.g. '.gz', '' for no compression.
+    """
+    if compression is None:
+        return ""
+    if compression not in SUFFIXES:
+        raise ValueError(f"The compression must be one of {list(SUFFIXES)} or None.")
+    if compression == "zstd" and zstd is None:
+        raise ValueError(
+            "The zstd compression needs python 3.14+ or the backports.zstd package."
+        )
+    return SUFFIXES[compression]
+
+
+def get_compression(path: str | Path) -> None | str:
+    """
+    This gets the compression of a file from its suffix.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        compression: The compression e.g. gzip, None if it isn't compressed.
+    """
+    suffix = Path(path).suffix
+    return next((c for c, s in SUFFIXES.items() if s == suffix), None)
+
+
+def strip_suffix(path: str) -> str:
+    """
+    This removes the compression suffix of a path e.g. test.csv.gz -> test.csv.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        path: The path without its compression suffix.
+    """
+    compression = get_compression(path)
+    return path[: -len(SUFFIXES[compression])] if compression else path
+
+
+def open_file(path: str | Path, mode: str = "rt", **kwargs: Any) -> IO:
+    """
+    This opens a file, (de)compressing it on the fly based on its suffix.
+    Each append opens a new compressed member/frame which the readers join.
+
+    Args:
+        path: The path of the file.
+        mode: The mode to open the file in e.g. 'rt', 'at' or 'wb'.
+        **kwargs: The text options e.g. encoding and newline.
+
+    Returns:
+        file: The file object.
+    """
+    compression = get_compression(path)
+    if compression is None:
+        return open(path, mode, **kwargs)
+    if compression == "zstd":
+        get_suffix(compression)
+        return zstd.open(path, mode, **kwargs)
+    return gzip.open(path, mode, **kwargs)
+
+
+def append(path: str | Path, text: str, **kwargs: Any):
+    """
+    This appends text to a file as a complete compressed member, so the file can be
+    read while it's still being written.
+
+    Args:
+        path: The path of the file.
+        text: The text to append.
+        **kwargs: The text options e.g. encoding and newline.
+    """
+    with open_file(path, "at", **kwargs) as f:
+        f.write(text)
@@ -1,4 +1,45 @@
 import re
+from typing import Any
+
+CONTAINERS = (list, dict)
+
+
+def flatten_into(value: Any, parent_key: Any, obj: dict):
+    """
+    This flattens a value into a flat dictionary under a parent key, walking it with
+    a stack of the partly walked lists and dicts instead of recursing.
+
+    Args:
+        value: The object to flatten.
+        parent_key: The flat key of the object, '' for the root.
+        obj: The flat dictionary to add the flat keys to.
+    """
+    if not isinstance(value, CONTAINERS) or not value:
+        obj[parent_key] = value
+        return
+
+    stack = []
+    prefix, items = get_items(value, parent_key)
+    while True:
+        for key, v in items:
+            # the keys of a root dict are kept as they are, the rest are joined as text
+            if prefix is not None:
+                key = f"{prefix}{key}"
+            if isinstance(v, CONTAINERS) and v:
+                stack.append((prefix, items))
+                prefix, items = get_items(v, key)
+                break
+            obj[key] = v
+        else:
+            if not stack:
+                return
+            prefix, items = stack.pop()
+
+
+def get_items(value: list | dict, parent_key: Any) -> tuple:
+    if isinstance(value, list):
+        return f"{parent_key}." if parent_key else "", enumerate(value)
+    return f"{parent_key}." if parent_key else None, iter(value.items())
 
 
 def flatten(d: dict | list) -> dict:
@@ -11,31 +52,42 @@ def flatten(d: dict | list) -> dict:
     Returns:
         flat_d: The flattened object.
     """
-
-    def recurse(value, parent_key=""):
-        if isinstance(value, list):
-            if not value:
-                obj[parent_key] = value
-            else:
-                for i, v in enumerate(value):
-                    recurse(v, f"{parent_key}.{i}" if parent_key else str(i))
-        elif isinstance(value, dict):
-            if not value:
-                obj[parent_key] = value
-            else:
-                for k, v in value.items():
-                    recurse(v, f"{parent_key}.{k}" if parent_key else k)
-        else:
-            obj[parent_key] = value
-
     obj = {}
-    recurse(d)
+    flatten_into(d, "", obj)
     return obj
 
 
+SPLIT_KEYS_SIZE = 100_000
+split_keys: dict = {}
+
+
+def split_key(flat_key: str) -> tuple:
+    """
+    This splits a flat key into its keys, the list indexes as ints. The splits are
+    cached as the same flat keys are unflattened again and again e.g. for each
+    response or bad data combination.
+
+    Args:
+        flat_key: The flat key e.g. 'list.0.key'.
+
+    Returns:
+        keys: The keys e.g. ('list', 0, 'key').
+    """
+    keys = split_keys.get(flat_key)
+    if keys is None:
+        if len(split_keys) >= SPLIT_KEYS_SIZE:
+            split_keys.clear()
+        keys = split_keys[flat_key] = tuple(
+            int(k) if k.isdigit() else k for k in flat_key.split(".")
+        )
+    return keys
+
+
 def unflatten(flat_dict: dict) -> dict | list:
     """
-    This unflattens a flattened dictionary.
+    This unflattens a flattened dictionary. The flat keys are usually in the order
+    flatten makes them, so the containers of the keys shared with the previous flat
+    key are reused instead of walked again.
 
     Args:
         flat_dict: The flat dictionary to unflatten.
@@ -43,43 +95,227 @@ def unflatten(flat_dict: dict) -> dict | list:
     Returns:
         unflattened_dict: The unflattened dict.
     """
+    if len(flat_dict) == 1 and "" in flat_dict:
+        return flat_dict[""]
+
+    unflattened = {}
+    previous_keys: tuple = ()
+    # the container each of the previous keys is set in
+    path: list = []
+    for flat_key, value in flat_dict.items():
+        keys = split_key(flat_key)
+        last = len(keys) - 1
 
-    def assign(keys, value, d):
-        key = keys.pop(0)
+        depth = 0
+        shared = min(last, len(previous_keys) - 1)
+        while depth < shared and keys[depth] == previous_keys[depth]:
+            depth += 1
+        del path[depth:]
+        d = path[-1][keys[depth - 1]] if depth else unflattened
 
-        if key.isdigit():
-            key = int(key)
-            if isinstance(d, dict):
-                d = [d]
-            while len(d) <= key:
-                d.append(None)
-        else:
-            if isinstance(d, list):
+        while True:
+            key = keys[depth]
+            if type(key) is int:
+                if isinstance(d, dict):
+                    # a dict found where a list is expected is wrapped as its first item
+                    d = [d]
+                    if depth:
+                        path[-1][keys[depth - 1]] = d
+                    else:
+                        unflattened = d
+                if len(d) <= key:
+                    d.extend([None] * (key + 1 - len(d)))
+            elif isinstance(d, list):
                 d[-1] = {}
+            path.append(d)
+
+            if depth == last:
+                d[key] = value
+                break
 
-        if len(keys) == 0:
-            d[key] = value
-        else:
             if isinstance(d, list):
-                d[key] = assign(
-                    keys, value, d[key] if key < len(d) and d[key] is not None else {}
-                )
+                child = d[key] if d[key] is not None else {}
             else:
-                d[key] = assign(
-                    keys, value, d.get(key, [{}] if keys[0].isdigit() else {})
-                )
+                child = d.get(key, [{}] if type(keys[depth + 1]) is int else {})
+            d[key] = child
+            d = child
+            depth += 1
 
-        return d
+        previous_keys = keys
 
-    if len(flat_dict) == 1 and "" in flat_dict:
-        return flat_dict[""]
+    return unflattened
 
-    unflattened = {}
-    for flat_key, value in flat_dict.items():
-        keys = flat_key.split(".")
-        unflattened = assign(keys, value, unflattened)
 
-    return unflattened
+class DictionaryComparator(object):
+    """
+    This compares many pairs of dictionaries with the same skipped and exclusive keys,
+    e.g. the rows of two reports. The key filters are built once and the matching of
+    each flat key is cached, and only the subtrees that differ are flattened.
+    """
+
+    def __init__(
+        self,
+        skipped_keys: None | list = None,
+        exclusive_keys: None | list = None,
+        normalize: bool = False,
+        list_skipped_keys: bool = True,
+        cache_size: int = 100_000,
+    ):
+        """
+        The constructor for DictionaryComparator.
+
+        Args:
+            skipped_keys: The keys to skip in the comparison.
+            exclusive_keys: The keys to exclusively check ignoring any skipped keys passed.
+            normalize: Whether to convert each of the comparable values in the same casing.
+            list_skipped_keys: Whether to list the skipped keys when there are no
+                mismatches, which walks both dictionaries in full.
+            cache_size: How many flat keys to cache the matching of.
+        """
+        self.skipped_keys = list(skipped_keys or [])
+        self.exclusive_pattern = None
+        if exclusive_keys:
+            self.exclusive_pattern = re.compile("|".join(exclusive_keys))
+        self.normalize = normalize
+        self.list_skipped_keys = list_skipped_keys
+        self.cache_size = cache_size
+        self.matches: dict = {}
+
+    def match(self, key: str) -> tuple[bool, bool]:
+        """
+        This matches a flat key against the skipped and exclusive keys.
+
+        Args:
+            key: The flat key e.g. 'MESSAGE.args.id'.
+
+        Returns:
+            matches: Whether it contains a skipped key and whether it's outside the
+                exclusive keys.
+        """
+        matches = self.matches.get(key)
+        if matches is None:
+            if len(self.matches) >= self.cache_size:
+                self.matches = {}
+            matches = self.matches[key] = (
+                any(sk in key for sk in self.skipped_keys),
+                self.exclusive_pattern is not None
+                and not self.exclusive_pattern.search(key),
+            )
+        return matches
+
+    def is_skipped(self, key: str) -> bool:
+        return any(self.match(key))
+
+    def walk(self, v1: Any, v2: Any, parent_key: Any, flat_d1: dict, flat_d2: dict):
+        """
+        This flattens the parts of two values that differ, like flatten does.
+
+        Args:
+            v1: The first value.
+            v2: The second value.
+            parent_key: The flat key of the values.
+            flat_d1: The flat differing parts of the first value.
+            flat_d2: The flat differing parts of the second value.
+        """
+        if v1 == v2:
+            return
+
+        if isinstance(v1, dict) and isinstance(v2, dict) and v1 and v2:
+            for k, v in v1.items():
+                key = f"{parent_key}.{k}" if parent_key else k
+                if k in v2:
+                    self.walk(v, v2[k], key, flat_d1, flat_d2)
+                else:
+                    flatten_into(v, key, flat_d1)
+            for k, v in v2.items():
+                if k not in v1:
+                    flatten_into(v, f"{parent_key}.{k}" if parent_key else k, flat_d2)
+        elif isinstance(v1, list) and isinstance(v2, list) and v1 and v2:
+            for i in range(max(len(v1), len(v2))):
+                key = f"{parent_key}.{i}" if parent_key else str(i)
+                if i >= len(v2):
+                    flatten_into(v1[i], key, flat_d1)
+                elif i >= len(v1):
+                    flatten_into(v2[i], key, flat_d2)
+                else:
+                    self.walk(v1[i], v2[i], key, flat_d1, flat_d2)
+        else:
+            flatten_into(v1, parent_key, flat_d1)
+            flatten_into(v2, parent_key, flat_d2)
+
+    def get_skipped_keys(self, d1: dict, flat_d2: dict) -> list:
+        """
+        This lists the skipped keys of two dictionaries like compare_dictionaries does.
+
+        Args:
+            d1: The first dictionary.
+            flat_d2: The flat differing parts of the second dictionary, which hold
+                all of its keys that the first doesn't have.
+
+        Returns:
+            skipped_keys: The skipped keys passed then the matching flat keys.
+        """
+        thin_keys = list(dict.fromkeys([*flatten(d1), *flat_d2]))
+        matches = [self.match(k) for k in thin_keys]
+
+        skipped_keys = self.skipped_keys[:]
+        if self.skipped_keys:
+            skipped_keys.extend(
+                k for k, m in zip(thin_keys, matches, strict=True) if m[0]
+            )
+        if self.exclusive_pattern is not None:
+            skipped_keys.extend(
+                k for k, m in zip(thin_keys, matches, strict=True) if m[1]
+            )
+        return skipped_keys
+
+    def compare(self, d1: dict, d2: dict) -> dict:
+        """
+        This does a general key then value mismatch comparison of two dictionaries,
+        see compare_dictionaries.
+
+        Args:
+            d1: The first dictionary to compare.
+            d2: The second dictionary to compare.
+
+        Returns:
+            mismatches: The record of any key and value mismatches.
+        """
+        flat_d1: dict = {}
+        flat_d2: dict = {}
+        self.walk(d1, d2, "", flat_d1, flat_d2)
+
+        f1_not_in_f2 = [
+            k for k in flat_d1 if k not in flat_d2 and not self.is_skipped(k)
+        ]
+        f2_not_in_f1 = [
+            k for k in flat_d2 if k not in flat_d1 and not self.is_skipped(k)
+        ]
+        mismatched_keys = set(f1_not_in_f2 + f2_not_in_f1)
+
+        mismatched_values = []
+        for k, v in flat_d1.items():
+            if k in mismatched_keys or self.is_skipped(k):
+                continue
+            v2 = flat_d2.get(k)
+            if self.normalize:
+                v = v.lower() if isinstance(v, str) else v
+                v2 = v2.lower() if isinstance(v2, str) else v2
+            if v != v2:
+                mismatched_values.append({"key": k, "d1": v, "d2": v2})
+
+        mismatches = {}
+        if mismatched_keys:
+            keys = {"f1_not_in_f2": f1_not_in_f2, "f2_not_in_f1": f2_not_in_f1}
+            mismatches["keys"] = [{k: v for k, v in keys.items() if v}]
+        if mismatched_values:
+            mismatches["values"] = mismatched_values
+
+        if mismatches or self.list_skipped_keys:
+            skipped_keys = self.get_skipped_keys(d1, flat_d2)
+            if skipped_keys:
+                mismatches["skipped_keys"] = skipped_keys
+        return mismatches
 
 
 def compare_dictionaries(
@@ -91,6 +327,7 @@ def compare_dictionaries(
 ) -> dict:
     """
     This does a general key then value mismatch comparison of two dictionaries.
+    To compare many pairs with the same keys use a DictionaryComparator.
 
     Args:
         d1: The first dictionary to compare.
@@ -102,47 +339,5 @@ def compare_dictionaries(
     Returns:
         mismatches: The record of any key and value mismatches.
     """
-    flat_d1 = flatten(d1)
-    flat_d2 = flatten(d2)
-    flat_d1_keys = set(flat_d1.keys())
-    flat_d2_keys = set(flat_d2.keys())
-    thin_keys = flat_d1_keys.union(flat_d2_keys)
-    skipped_keys = skipped_keys or []
-
-    if skipped_keys:
-        _keys = [k for k in thin_keys if any(sk in k for sk in skipped_keys)]
-        skipped_keys.extend(_keys)
-    if exclusive_keys:
-        _keys = [
-            key for key in thin_keys if len(re.split("|".join(exclusive_keys), key)) < 2
-        ]
-        skipped_keys.extend(_keys)
-
-    mismatches = {}
-    f1_not_in_f2 = flat_d1_keys - set(skipped_keys) - flat_d2_keys
-    f2_not_in_f1 = flat_d2_keys - set(skipped_keys) - flat_d1_keys
-    mismatched_keys = list(f1_not_in_f2) + list(f2_not_in_f1)
-
-    mismatched_skipped_keys = set(mismatched_keys).union(skipped_keys)
-    if normalize:
-        for k in set(flat_d1.keys()).union(flat_d2.keys()):
-            if k not in mismatched_skipped_keys and isinstance(flat_d1.get(k), str):
-                flat_d1[k] = flat_d1[k].lower()
-            if k not in mismatched_skipped_keys and isinstance(flat_d2.get(k), str):
-                flat_d2[k] = flat_d2[k].lower()
-
-    mismatched_values = [
-        {"key": k, "d1": v, "d2": flat_d2[k]}
-        for k, v in flat_d1.items()
-        if k not in mismatched_skipped_keys and v != flat_d2.get(k)
-    ]
-
-    if mismatched_keys:
-        keys = {"f1_not_in_f2": list(f1_not_in_f2), "f2_not_in_f1": list(f2_not_in_f1)}
-        mismatches["keys"] = [{k: v for k, v in keys.items() if v}]
-    if mismatched_values:
-        mismatches["values"] = mismatched_values
-    if skipped_keys:
-        mismatches["skipped_keys"] = skipped_keys
-
-    return mismatches
+    comparator = DictionaryComparator(skipped_keys, exclusive_keys, normalize)
+    return comparator.compare(d1, d2)
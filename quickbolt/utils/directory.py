@@ -8,6 +8,22 @@ from aiofiles import open as aopen
 
 import quickbolt.utils.json as jh
 
+IGNORED_DIRS = {
+    ".git",
+    ".mypy_cache",
+    ".nox",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "node_modules",
+    "run_info",
+    "venv",
+}
+
+path_indexes: dict[str, dict[str, list[Path]]] = {}
+
 
 async def safe_mkdirs(path: str):
     """
@@ -121,6 +137,64 @@ def get_root_dir(root_checks: None | list[str] = None) -> str:
     return None
 
 
+def get_path_index(
+    root_dir: str, ignored_dirs: None | set[str] = None
+) -> dict[str, list[Path]]:
+    """
+    This gets the index of the files and directories under a root directory by name.
+    It's built once per process and root directory, see clear_path_index.
+
+    Args:
+        root_dir: The root directory to index.
+        ignored_dirs: The directory names not to descend into, IGNORED_DIRS by default.
+
+    Returns:
+        index: The paths under the root directory by name.
+    """
+    root_dir = str(root_dir)
+    if root_dir in path_indexes:
+        return path_indexes[root_dir]
+
+    ignored_dirs = IGNORED_DIRS if ignored_dirs is None else ignored_dirs
+    index: dict[str, list[Path]] = {}
+    for dir_path, dir_names, file_names in sos.walk(root_dir):
+        dir_names[:] = [d for d in dir_names if d not in ignored_dirs]
+        for name in dir_names + file_names:
+            index.setdefault(name, []).append(Path(dir_path, name))
+
+    path_indexes[root_dir] = index
+    return index
+
+
+def clear_path_index(root_dir: None | str = None):
+    """
+    This clears the cached path index e.g. after files were added or removed.
+
+    Args:
+        root_dir: The root directory to clear the index of, all of them by default.
+    """
+    if root_dir is None:
+        path_indexes.clear()
+    else:
+        path_indexes.pop(str(root_dir), None)
+
+
+def find_path(root_dir: str, path: str | Path) -> None | Path:
+    """
+    This finds the first indexed path under a root directory that contains a path.
+
+    Args:
+        root_dir: The root directory to look in.
+        path: The (partial) path to look for e.g. tests/some/test_file.py.
+
+    Returns:
+        path: The matching path or None if there isn't one.
+    """
+    path = Path(path)
+    candidates = get_path_index(root_dir).get(path.name, [])
+    return next((c for c in candidates if str(path) in str(c)), None)
+
+
 def get_src_app_dir(root_dir: None | str = None) -> str:
     """
     This finds which src app directory (app, map, ..) we're automating against.
@@ -136,10 +210,7 @@ def get_src_app_dir(root_dir: None | str = None) -> str:
     calling_test = calling_test.split("::")[0]
     calling_test_name = Path(calling_test).name
 
-    root_path = Path(root_dir)
-    file_path = next(
-        (f for f in root_path.rglob("*") if f.name == calling_test_name), None
-    )
+    file_path = get_path_index(root_dir).get(calling_test_name, [None])[0]
 
     return str(file_path.parent)
 
@@ -0,0 +1,137 @@
+class LatencyHistogram(object):
+    """
+    A mergeable log-linear latency histogram with microsecond resolution.
+    """
+
+    def __init__(self, sub_buckets: int = 64):
+        """
+        The constructor for LatencyHistogram.
+
+        Args:
+            sub_buckets: The linear buckets per power of two, must be a power of two.
+                The relative error of any recorded value is at most 1 / sub_buckets.
+        """
+        if sub_buckets < 2 or sub_buckets & (sub_buckets - 1):
+            raise ValueError(f"sub_buckets must be a power of two, got {sub_buckets}.")
+
+        self.sub_buckets = sub_buckets
+        self.shift = sub_buckets.bit_length() - 1
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: None | float = None
+        self.max: None | float = None
+
+    def bucket_index(self, micros: int) -> int:
+        """
+        This finds the bucket of a value.
+
+        Args:
+            micros: The value in microseconds.
+
+        Returns:
+            index: The index of the bucket holding the value.
+        """
+        if micros < self.sub_buckets:
+            return micros
+        exponent = micros.bit_length() - self.shift - 1
+        return exponent * self.sub_buckets + (micros >> exponent)
+
+    def bucket_bounds(self, index: int) -> tuple[int, int]:
+        """
+        This finds the value range of a bucket.
+
+        Args:
+            index: The index of the bucket.
+
+        Returns:
+            bounds: The inclusive low and exclusive high bound in microseconds.
+        """
+        if index < self.sub_buckets:
+            return index, index + 1
+        exponent = index // self.sub_buckets - 1
+        mantissa = index - exponent * self.sub_buckets
+        return mantissa << exponent, (mantissa + 1) << exponent
+
+    def record(self, seconds: float, count: int = 1):
+        """
+        This records a latency.
+
+        Args:
+            seconds: The latency in seconds.
+            count: How many times to record the latency.
+        """
+        micros = max(int(seconds * 1_000_000), 0)
+        index = self.bucket_index(micros)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+        self.count += count
+        self.total += seconds * count
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        This merges another histogram into this one.
+
+        Args:
+            other: The histogram to merge in.
+
+        Returns:
+            histogram: This histogram.
+        """
+        if other.sub_buckets != self.sub_buckets:
+            raise ValueError("Only histograms with the same sub_buckets can be merged.")
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        return self
+
+    def percentile(self, percent: float) -> float:
+        """
+        This estimates a percentile from the recorded latencies.
+
+        Args:
+            percent: The percentile between 0 and 100.
+
+        Returns:
+            seconds: The estimated latency in seconds.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                value = (low + high - 1) / 2 / 1_000_000
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """
+        This summarizes the histogram in seconds.
+
+        Returns:
+            summary: The count, min, max, mean and common percentiles.
+        """
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "min": round(self.min or 0.0, 6),
+            "max": round(self.max or 0.0, 6),
+            "mean": round(mean, 6),
+            "p50": round(self.percentile(50), 6),
+            "p90": round(self.percentile(90), 6),
+            "p99": round(self.percentile(99), 6),
+            "p999": round(self.percentile(99.9), 6),
+        }
@@ -21,7 +21,27 @@ def ensure_serializable(data: Any) -> Any:
         return str(data)
 
 
-def serialize(data: Any, other_exceptions: Any = None, safe=False) -> str:
+def serialize_bytes(data: Any, compact: bool = True) -> bytes:
+    """
+    This converts data to json bytes. Compact json is for the internal round trips
+    e.g. hashing, scrubbing and batch generation, where nobody reads the whitespace.
+
+    Args:
+        data: The data to convert.
+        compact: Whether to leave out the indentation.
+
+    Returns:
+        data: The converted data.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option)
+
+
+def serialize(
+    data: Any, other_exceptions: Any = None, safe=False, compact: bool = False
+) -> str:
     """
     This converts data to json.
 
@@ -29,6 +49,7 @@ def serialize(data: Any, other_exceptions: Any = None, safe=False) -> str:
         data: The data to convert.
         other_exceptions: Other exceptions to catch.
         safe: Whether to rase on an exception.
+        compact: Whether to leave out the indentation, see serialize_bytes.
 
     Returns:
         data: The converted data.
@@ -39,18 +60,24 @@ def serialize(data: Any, other_exceptions: Any = None, safe=False) -> str:
     exceptions = [orjson.JSONEncodeError] + other_exceptions
 
     try:
-        return orjson.dumps(
-            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
-        ).decode()
+        return serialize_bytes(data, compact).decode()
     except tuple(exceptions):
         if not safe:
             raise
         return data
 
 
+# a json string, kept as is, or the leading zeros of an integer e.g. 007 -> 7
+LEADING_ZEROS_PATTERN = re.compile(
+    r'("(?:[^"\\\n]|\\.)*")|(?<![\w.+-])0+(?=\d+(?![\d.eE]))'
+)
+
+
 def squash_leading_zeros(text: str) -> str:
     """
-    This removes leading zeros e.g. by squashing them.
+    This removes leading zeros e.g. by squashing them. The text is tokenized in
+    a single pass, the strings are kept as they are and the leading zeros of each
+    integer are removed.
 
     Args:
         text: The text to squash the zeros from.
@@ -58,27 +85,14 @@ def squash_leading_zeros(text: str) -> str:
     Returns:
         no_leading_zeros_text: The leading zeros free text.
     """
-    marked_text = re.sub(r'"(.*?)"', r"\g<0>QUOTEMARKED", text)
-    marked_text_lines = marked_text.split("\n")
-
-    for i, line in enumerate(marked_text_lines):
-        split_line = line.split(":")
-        value = split_line[-1]
-        digits = re.findall(r'"?[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"?', value)
-
-        if "QUOTEMARKED" not in value and digits:
-            digits = digits[0]
-            if digits.isdigit() and len(digits) > 1:
-                new_value = re.sub(r"\b0+(?=\d)", "", digits)
-                new_line = line.replace(digits, new_value)
-                marked_text_lines[i] = new_line
-
-    return "\n".join(marked_text_lines).replace("QUOTEMARKED", "")
+    # the strings are put back as they are and the leading zeros are dropped
+    return LEADING_ZEROS_PATTERN.sub(r"\1", text)
 
 
 def deserialize(text: str | bytes, other_exceptions: Any = None, safe=False) -> Any:
     """
-    This converts json to its pythonic object.
+    This converts json to its pythonic object. The text is loaded as is first and
+    only if that fails are its leading zeros squashed and loaded again.
 
     Args:
         text: The string to convert.
@@ -88,13 +102,28 @@ def deserialize(text: str | bytes, other_exceptions: Any = None, safe=False) ->
     Returns:
         data: The converted text or original text.
     """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        error = e
+    except TypeError:
+        if not safe:
+            raise
+        return text
+
     other_exceptions = other_exceptions or []
     if not isinstance(other_exceptions, list):
         other_exceptions = [other_exceptions]
     exceptions = [orjson.JSONDecodeError, TypeError] + other_exceptions
 
     try:
-        no_leading_zeros_text = squash_leading_zeros(text)
+        decoded_text = text
+        if isinstance(text, (bytes, bytearray, memoryview)):
+            decoded_text = bytes(text).decode(errors="replace")
+        no_leading_zeros_text = squash_leading_zeros(decoded_text)
+        # without leading zeros to squash the first error stands
+        if no_leading_zeros_text == decoded_text:
+            raise error
         return orjson.loads(no_leading_zeros_text)
     except tuple(exceptions):
         if not safe:
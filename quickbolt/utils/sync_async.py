@@ -1,6 +1,6 @@
 import asyncio
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, TypeVar
 
 T = TypeVar("T")
 
@@ -16,3 +16,53 @@ def force_sync(fn: Callable) -> Callable:
         return asyncio.run(fn(*args, **kwargs))
 
     return wrapper
+
+
+async def map_bounded(
+    fn: Callable[[Any], Awaitable[T]],
+    items: Iterable | AsyncIterable,
+    workers: int,
+) -> list[T]:
+    """
+    This maps an async function over items with at most workers of them in flight.
+    The items are pulled one at a time as the workers free up, so a generator is
+    never read ahead and only the items in flight are held in memory.
+
+    Args:
+        fn: The async function to map.
+        items: The items, an iterable or async iterable e.g. a generator.
+        workers: The max amount of concurrent calls.
+
+    Returns:
+        results: The results in the order the calls finished.
+    """
+    if isinstance(items, AsyncIterable):
+        iterator = aiter(items)
+    else:
+        iterator = aiter_sync(items)
+
+    lock = asyncio.Lock()
+    results = []
+    done = object()
+
+    async def worker():
+        while True:
+            async with lock:
+                item = await anext(iterator, done)
+            if item is done:
+                return
+            results.append(await fn(item))
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(workers, 1))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return results
+
+
+async def aiter_sync(items: Iterable):
+    for item in items:
+        yield item
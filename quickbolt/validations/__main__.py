@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import sys
+
+from quickbolt.validations.batch import validate_reports
+
+
+def main(args: None | list = None) -> int:
+    """
+    This validates the reports of a run_info tree against a validations tree e.g.
+    python -m quickbolt.validations run_info validations --workers 8
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    Returns:
+        code: The exit code, 1 if any report failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m quickbolt.validations",
+        description="Validate the scrubbed reports of a run_info folder in parallel.",
+    )
+    parser.add_argument("run_info", help="The run_info folder of the runs.")
+    parser.add_argument("validations", help="The validations folder of the references.")
+    parser.add_argument("--workers", type=int, help="The amount of processes.")
+    parser.add_argument("--skipped-keys", nargs="*", help="The keys to skip.")
+    parser.add_argument("--key-fields", nargs="*", help="The columns that pair rows.")
+    parser.add_argument("--summary", help="The path of the json summary.")
+    options = parser.parse_args(args)
+
+    summary = asyncio.run(
+        validate_reports(
+            options.run_info,
+            options.validations,
+            workers=options.workers,
+            skipped_keys=options.skipped_keys,
+            key_fields=options.key_fields,
+            summary_path=options.summary,
+        )
+    )
+
+    for result in summary["results"]:
+        if result["mismatches"] or result["unmatched"] or result["error"]:
+            print(
+                f"FAILED {result['report']}: {result['mismatches']} mismatches, "
+                f"{result['unmatched']} unmatched rows"
+                + (f", {result['error']}" if result["error"] else "")
+            )
+    print(
+        f"Validated {summary['reports']} reports, {summary['passed']} passed and "
+        f"{summary['failed']} failed."
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import asyncio
+import csv
+import os
+import re
+import tempfile
+from hashlib import blake2b
+from itertools import islice
+from pathlib import Path
+from typing import IO, AsyncGenerator, Generator
+
+import orjson
+
+import quickbolt.reporting.response_csv as rc
+import quickbolt.utils.compression as cx
+
+VERSION = 2
+
+
+def get_cache_path(csv_path: str) -> str:
+    path = Path(csv_path)
+    return str(path.parent / "__pycache__" / f"{path.name}.baseline")
+
+
+def hash_row(row: dict, pattern: re.Pattern) -> bytes:
+    """
+    This hashes the raw cells of a row that a comparison of the fields matching the
+    pattern could look at, the columns matching it and the ones it appears in. Equal
+    hashes mean the fields compare equal.
+
+    Args:
+        row: The row as a dictionary of raw strings, see rc.iter_csv_rows(typed=False).
+        pattern: The pattern of the compared fields e.g. ACTUAL_CODE|MESSAGE.
+
+    Returns:
+        hash: The hash of the row.
+    """
+    cells = [
+        [k, v]
+        for k, v in row.items()
+        if isinstance(k, str)
+        and (pattern.search(k) or (isinstance(v, str) and pattern.search(v)))
+    ]
+    return blake2b(orjson.dumps(cells), digest_size=16).digest()
+
+
+def read_records(csv_path: str, pattern: re.Pattern) -> Generator[tuple, None, None]:
+    """
+    This reads the records of a baseline from its csv file.
+
+    Args:
+        csv_path: The path of the baseline csv file.
+        pattern: The pattern of the compared fields.
+
+    Returns:
+        records: The raw scalar cells, hash and raw cells of each row, see load_row.
+    """
+    with cx.open_file(csv_path, "rt", encoding="ascii", newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, [])
+        for cells in reader:
+            if not cells:
+                continue
+            row = rc.parse_row(header, cells, typed=False)
+            scalars = {k: v for k, v in row.items() if k not in rc.JSON_COLUMNS}
+            # the cells are kept as pairs since the extra cells of a row are under None
+            yield scalars, hash_row(row, pattern), list(row.items())
+
+
+def dump_frame(value) -> bytes:
+    # orjson escapes the newlines of strings, so each frame is a single line
+    return orjson.dumps(value) + b"\n"
+
+
+def load_frame(cache_file: IO):
+    line = cache_file.readline()
+    if not line:
+        raise EOFError
+    return orjson.loads(line)
+
+
+def dump_record(record: tuple) -> list:
+    scalars, row_hash, cells = record
+    return [list(scalars.items()), row_hash.hex(), cells]
+
+
+def load_record(record: list) -> tuple:
+    scalars, row_hash, cells = record
+    return dict(scalars), bytes.fromhex(row_hash), cells
+
+
+def read_header(cache_file: IO) -> None | dict:
+    try:
+        header = load_frame(cache_file)
+    except (EOFError, orjson.JSONDecodeError):
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def get_cache_header(csv_path: str, pattern: re.Pattern) -> dict:
+    stat = os.stat(csv_path)
+    return {
+        "version": VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "pattern": pattern.pattern,
+    }
+
+
+def compile_baseline(
+    csv_path: str, pattern: re.Pattern, chunk_size: int = 1000
+) -> None | str:
+    """
+    This compiles a baseline csv file into a cache of hashed rows next to it e.g.
+    __pycache__/get_scrubbed.csv.baseline, stored as lines of json frames so reading
+    it back can't run code. The cache is reused until the mtime or size of the csv
+    file changes.
+
+    Args:
+        csv_path: The path of the baseline csv file.
+        pattern: The pattern of the compared fields.
+        chunk_size: How many records to store per frame.
+
+    Returns:
+        cache_path: The path of the compiled baseline, None if it can't be written.
+    """
+    cache_path = get_cache_path(csv_path)
+    header = get_cache_header(csv_path, pattern)
+    try:
+        with open(cache_path, "rb") as cache_file:
+            if read_header(cache_file) == header:
+                return cache_path
+    except OSError:
+        pass
+
+    try:
+        Path(cache_path).parent.mkdir(exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            dir=Path(cache_path).parent, prefix=f".{Path(cache_path).name}."
+        )
+    except OSError:
+        return None
+
+    try:
+        with os.fdopen(fd, "wb") as cache_file:
+            cache_file.write(dump_frame(header))
+            records = read_records(csv_path, pattern)
+            while chunk := list(islice(records, chunk_size)):
+                cache_file.write(dump_frame([dump_record(r) for r in chunk]))
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return cache_path
+
+
+def read_cache_chunk(cache_file: IO) -> None | list:
+    try:
+        return [load_record(r) for r in load_frame(cache_file)]
+    except EOFError:
+        return None
+
+
+def read_chunk(records: Generator, chunk_size: int = 1000) -> list:
+    return list(islice(records, chunk_size))
+
+
+async def iter_baseline(csv_path: str, fields: list) -> AsyncGenerator[tuple, None]:
+    """
+    This streams the records of a baseline, compiling it first if its cache is
+    missing or out of date.
+
+    Args:
+        csv_path: The path of the baseline csv file.
+        fields: The compared fields the rows are hashed by e.g. ['ACTUAL_CODE', 'MESSAGE'].
+
+    Returns:
+        records: The raw scalar cells, hash and raw cells of each row, see load_row.
+    """
+    pattern = re.compile("|".join(fields))
+    cache_path = await asyncio.to_thread(compile_baseline, csv_path, pattern)
+
+    if cache_path is None:
+        # the baseline is read straight from the csv file if its cache can't be written
+        records = read_records(csv_path, pattern)
+        while chunk := await asyncio.to_thread(read_chunk, records):
+            for record in chunk:
+                yield record
+        return
+
+    with open(cache_path, "rb") as cache_file:
+        await asyncio.to_thread(read_header, cache_file)
+        while (
+            chunk := await asyncio.to_thread(read_cache_chunk, cache_file)
+        ) is not None:
+            for record in chunk:
+                yield record
+
+
+def load_row(cells: list) -> dict:
+    """
+    This converts the raw cells of a baseline record into its row, only the rows
+    whose hash mismatches are converted.
+
+    Args:
+        cells: The raw cells of the row as (column, value) pairs.
+
+    Returns:
+        row: The row with its cells converted, see rc.parse_cells.
+    """
+    return rc.parse_cells(dict(cells))
@@ -0,0 +1,188 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import orjson
+from aiofiles import open as aopen
+
+import quickbolt.reporting.response_csv as rc
+import quickbolt.utils.compression as cx
+import quickbolt.utils.directory as drh
+from quickbolt.validations.validations import (
+    compare_references,
+    get_error_file_path,
+    get_error_rows,
+)
+
+SUFFIXES = [".csv"] + [f".csv{s}" for s in cx.SUFFIXES.values()]
+
+
+def find_csv_files(directory: Path, suffix: str = "") -> list[Path]:
+    return sorted(p for s in SUFFIXES for p in directory.rglob(f"*{suffix}{s}"))
+
+
+def find_report_pairs(run_info_dir: str, validations_dir: str) -> list[tuple]:
+    """
+    This pairs the scrubbed reports of a run_info tree with their references in a
+    validations tree. A reference is looked for in the folder mirroring the report's
+    e.g. run_logs/api/pass/get_scrubbed.csv -> validations/api/**/get_scrubbed.csv,
+    then anywhere in the validations tree.
+
+    Args:
+        run_info_dir: The run_info folder of the runs.
+        validations_dir: The validations folder of the references.
+
+    Returns:
+        pairs: The path of each report and its reference, None if there isn't one.
+    """
+    run_logs_dir = Path(run_info_dir) / "run_logs"
+    refs_dir = Path(validations_dir)
+
+    refs: dict[str, list[Path]] = {}
+    for ref in find_csv_files(refs_dir):
+        refs.setdefault(cx.strip_suffix(ref.name), []).append(ref)
+
+    pairs = []
+    for report in find_csv_files(run_logs_dir, "_scrubbed"):
+        report_dir = report.parent.relative_to(run_logs_dir)
+        if report_dir.name in ["pass", "fail"]:
+            report_dir = report_dir.parent
+
+        candidates = refs.get(cx.strip_suffix(report.name), [])
+        ref = next(
+            (r for r in candidates if r.is_relative_to(refs_dir / report_dir)),
+            candidates[0] if candidates else None,
+        )
+        pairs.append((str(report), None if ref is None else str(ref)))
+    return pairs
+
+
+async def validate_report_pair(
+    report_path: str,
+    ref_path: None | str,
+    skipped_keys: None | list = None,
+    key_fields: None | list = None,
+) -> dict:
+    """
+    This validates a report against its reference, writing its errors csv report.
+
+    Args:
+        report_path: The path of the scrubbed report.
+        ref_path: The path of its reference, None if there isn't one.
+        skipped_keys: The keys to skip in the comparison.
+        key_fields: The columns that pair the rows, see Validations.validate_references.
+
+    Returns:
+        result: The counts of mismatches and rows without a counterpart, the path
+            of the errors report and any error.
+    """
+    result = {
+        "report": report_path,
+        "reference": ref_path,
+        "mismatches": 0,
+        "unmatched": 0,
+        "error_file": None,
+        "error": None,
+    }
+    if ref_path is None:
+        result["error"] = "There's no reference for the report."
+        return result
+
+    try:
+        mismatches, unmatched_keys = await compare_references(
+            report_path, ref_path, skipped_keys, key_fields
+        )
+        result["mismatches"] = len(mismatches)
+        result["unmatched"] = len(unmatched_keys)
+
+        if mismatches:
+            csv_path = report_path.replace("_scrubbed.csv", ".csv")
+            error_file_path = get_error_file_path(csv_path)
+            await drh.safe_mkdirs(str(Path(error_file_path).parent))
+            await rc.add_rows_to_csv_report(
+                error_file_path, get_error_rows(mismatches), mode="w"
+            )
+            result["error_file"] = error_file_path
+    except Exception as e:
+        result["error"] = repr(e)
+    return result
+
+
+def validate_report(
+    report_path: str,
+    ref_path: None | str,
+    skipped_keys: None | list = None,
+    key_fields: None | list = None,
+) -> dict:
+    return asyncio.run(
+        validate_report_pair(report_path, ref_path, skipped_keys, key_fields)
+    )
+
+
+async def validate_reports(
+    run_info_dir: str,
+    validations_dir: str,
+    workers: None | int = None,
+    skipped_keys: None | list = None,
+    key_fields: None | list = None,
+    summary_path: None | str = None,
+    executor: None | Executor = None,
+) -> dict:
+    """
+    This validates every scrubbed report of a run_info tree against the references
+    of a validations tree, concurrently in a process pool. Each report with
+    mismatches gets its errors csv report in run_info/run_errors, like the teardown
+    of CorePytestBase writes.
+
+    Args:
+        run_info_dir: The run_info folder of the runs.
+        validations_dir: The validations folder of the references.
+        workers: The amount of validating processes, defaults to the cpu count.
+        skipped_keys: The keys to skip in the comparison.
+        key_fields: The columns that pair the rows, see Validations.validate_references.
+        summary_path: The path of the json summary, defaults to
+            run_info/run_errors/validation_summary.json.
+        executor: An executor to validate in instead of the default process pool.
+
+    Returns:
+        summary: The counts of reports that passed and failed and the result of each.
+    """
+    pairs = await asyncio.to_thread(find_report_pairs, run_info_dir, validations_dir)
+
+    owns_executor = executor is None
+    if executor is None:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn")
+        )
+
+    loop = asyncio.get_running_loop()
+    try:
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    executor, validate_report, report, ref, skipped_keys, key_fields
+                )
+                for report, ref in pairs
+            ]
+        )
+    finally:
+        if owns_executor:
+            executor.shutdown()
+
+    failed = [r for r in results if r["mismatches"] or r["unmatched"] or r["error"]]
+    summary = {
+        "reports": len(results),
+        "passed": len(results) - len(failed),
+        "failed": len(failed),
+        "missing_references": sum(1 for r in results if r["reference"] is None),
+        "results": results,
+    }
+
+    summary_path = summary_path or str(
+        Path(run_info_dir) / "run_errors" / "validation_summary.json"
+    )
+    await drh.safe_mkdirs(str(Path(summary_path).parent))
+    async with aopen(summary_path, "wb") as f:
+        await f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+    return summary
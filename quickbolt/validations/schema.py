@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Callable
+
+import orjson
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+Check = Callable[[Any], Any]
+
+# the fields a schema validation adds to a response, they're kept out of the csv reports
+SCHEMA_FIELDS = ["schema_mismatch", "schema_error"]
+
+
+def require_fastjsonschema():
+    if fastjsonschema is None:
+        raise ValueError(
+            "The schema validation needs the fastjsonschema package e.g. "
+            "pip install quickbolt[schema]."
+        )
+
+
+def compile_check(schema: dict | bool) -> Check:
+    """
+    This compiles a json schema into a check of a value.
+
+    Args:
+        schema: The json schema.
+
+    Returns:
+        check: The check, raising a fastjsonschema.JsonSchemaValueException if the
+            value is invalid.
+    """
+    require_fastjsonschema()
+    try:
+        # defaults aren't filled in so the message is reported as it was received
+        return fastjsonschema.compile(schema, use_default=False)
+    except fastjsonschema.JsonSchemaDefinitionException as e:
+        raise ValueError(f"The schema is invalid, {e}")
+
+
+def hash_schema(schema: dict | bool) -> bytes:
+    """
+    This hashes the content of a schema, so equal schemas share a key whichever
+    object they are e.g. after the options of a call are deep copied.
+
+    Args:
+        schema: The json schema.
+
+    Returns:
+        hash: The hash of the schema.
+    """
+    try:
+        data = orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
+    except TypeError as e:
+        raise ValueError(f"The schema is invalid, {e}")
+    return blake2b(data, digest_size=16).digest()
+
+
+class SchemaCache(object):
+    """
+    This is a bounded LRU cache of compiled schemas keyed on a hash of their content,
+    so the requests sharing a schema only compile it once.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        The constructor for SchemaCache.
+
+        Args:
+            maxsize: The max amount of compiled schemas to keep.
+        """
+        self.maxsize = maxsize
+        self.checks: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, schema: dict | bool) -> Check:
+        """
+        This gets the compiled check of a schema, compiling it if it isn't cached.
+
+        Args:
+            schema: The json schema.
+
+        Returns:
+            check: The compiled check of the schema.
+        """
+        key = hash_schema(schema)
+        check = self.checks.get(key)
+        if check is not None:
+            self.hits += 1
+            self.checks.move_to_end(key)
+            return check
+
+        self.misses += 1
+        check = compile_check(schema)
+        self.checks[key] = check
+        self.checks.move_to_end(key)
+        if len(self.checks) > self.maxsize:
+            self.checks.popitem(last=False)
+        return check
+
+
+schema_cache = SchemaCache()
+
+
+def validate(
+    value: Any, schema: dict | bool, cache: None | SchemaCache = None
+) -> None | str:
+    """
+    This validates a value against a json schema with fastjsonschema, compiling the
+    schema once. An invalid schema raises a ValueError.
+
+    Args:
+        value: The value to validate e.g. the message of a response.
+        schema: The json schema e.g. {'type': 'object', 'required': ['id']}.
+        cache: The cache of compiled schemas, a module wide one is used if None.
+
+    Returns:
+        error: The first error found, None if the value is valid.
+    """
+    check = (cache or schema_cache).get(schema)
+    try:
+        check(value)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return e.message
+    return None
+
+
+def validate_response(_return: dict, schema: None | dict | bool) -> dict:
+    """
+    This validates the message of a response against a schema, recording the
+    result in the response as schema_mismatch and schema_error.
+
+    Args:
+        _return: The response of a request or call.
+        schema: The json schema, the response is left as is if None.
+
+    Returns:
+        _return: The response.
+    """
+    if schema is None:
+        return _return
+
+    require_fastjsonschema()
+    try:
+        error = validate(_return.get("message"), schema)
+    except ValueError as e:
+        error = str(e)
+    _return["schema_mismatch"] = "X" if error else ""
+    _return["schema_error"] = error or ""
+    return _return
@@ -1,13 +1,216 @@
 import re
+from collections import deque
 from difflib import Differ
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncGenerator, AsyncIterable
 
 import quickbolt.reporting.response_csv as rc
+import quickbolt.utils.compression as cx
 import quickbolt.utils.dictionary as dh
 import quickbolt.utils.directory as drh
+import quickbolt.utils.json as jh
+import quickbolt.validations.baseline as bl
 from quickbolt.logging import AsyncLogger
 
+KEY_FIELDS = ["BATCH_NUMBER", "INDEX", "METHOD", "DESCRIPTION"]
+EXCLUSIVE_KEYS = ["ACTUAL_CODE", "MESSAGE"]
+
+
+def get_row_key(row: dict, key_fields: list) -> tuple:
+    return tuple(row.get(f) for f in key_fields)
+
+
+async def iter_keyed_rows(csv_path: str, key_fields: list) -> AsyncGenerator:
+    async for row in rc.iter_csv_rows(csv_path, typed=False):
+        yield get_row_key(row, key_fields), row
+
+
+async def iter_keyed_baseline(csv_path: str, key_fields: list) -> AsyncGenerator:
+    async for record in bl.iter_baseline(csv_path, EXCLUSIVE_KEYS):
+        yield get_row_key(record[0], key_fields), record
+
+
+async def align_rows(
+    actual_rows: AsyncIterable, expected_rows: None | AsyncIterable
+) -> AsyncGenerator[tuple, None]:
+    """
+    This pairs the rows of two reports by their key in a single pass over both.
+    Rows are only held while one report is ahead of the other, e.g. after an
+    inserted request, so memory stays bounded by how far they drift apart.
+
+    Args:
+        actual_rows: The key and row of each row of the actual report.
+        expected_rows: The key and row of each row of the expected report, None if
+            there isn't one.
+
+    Returns:
+        pairs: The key, actual row and expected row of each pair. Rows without a
+            counterpart come last with None in place of the missing row.
+    """
+    iterators = [
+        aiter(actual_rows),
+        None if expected_rows is None else aiter(expected_rows),
+    ]
+    pending: list[dict[tuple, deque]] = [{}, {}]
+
+    while any(iterators):
+        for side, iterator in enumerate(iterators):
+            if iterator is None:
+                continue
+            try:
+                key, row = await anext(iterator)
+            except StopAsyncIteration:
+                iterators[side] = None
+                continue
+
+            others = pending[1 - side].get(key)
+            if not others:
+                pending[side].setdefault(key, deque()).append(row)
+                continue
+
+            other = others.popleft()
+            if not others:
+                del pending[1 - side][key]
+            yield (key, row, other) if side == 0 else (key, other, row)
+
+    for key, rows in pending[0].items():
+        for row in rows:
+            yield key, row, None
+    for key, rows in pending[1].items():
+        for row in rows:
+            yield key, None, row
+
+
+async def compare_references(
+    actual_refs: str,
+    expected_refs: None | str,
+    skipped_keys: None | list = None,
+    key_fields: None | list = None,
+) -> tuple[list[dict], list[tuple]]:
+    """
+    This compares a report with its reference, see Validations.validate_references.
+
+    Args:
+        actual_refs: The actual (current) path of refs to validate.
+        expected_refs: The expected (stored) path of refs, None if there isn't one.
+        skipped_keys: The keys to skip in the comparison.
+        key_fields: The (non json) columns that pair the actual and expected rows,
+            defaults to KEY_FIELDS.
+
+    Returns:
+        comparison: The mismatches and the keys of the rows without a counterpart.
+    """
+    key_fields = key_fields or KEY_FIELDS
+    if set(key_fields) & set(rc.JSON_COLUMNS):
+        raise ValueError(f"The key fields can't be json columns {rc.JSON_COLUMNS}.")
+
+    pairs = align_rows(
+        iter_keyed_rows(str(actual_refs), key_fields),
+        iter_keyed_baseline(str(expected_refs), key_fields) if expected_refs else None,
+    )
+
+    pattern = re.compile("|".join(EXCLUSIVE_KEYS))
+    comparator = dh.DictionaryComparator(
+        skipped_keys, EXCLUSIVE_KEYS, list_skipped_keys=False
+    )
+    differ = Differ()
+    mismatches = []
+    mismatch_keys = []
+    unmatched_keys = []
+    async for key, a_row, e_record in pairs:
+        if a_row is None or e_record is None:
+            unmatched_keys.append(key)
+            continue
+
+        _, e_hash, e_data = e_record
+        if bl.hash_row(a_row, pattern) == e_hash:
+            continue
+
+        a_refs = rc.parse_cells(a_row)
+        e_refs = bl.load_row(e_data)
+        errors = comparator.compare(a_refs, e_refs)
+
+        e_values = errors.get("values")
+        if e_values:
+            e_val_copy = e_values[:]
+            for e in e_val_copy:
+                if "json." in e["key"].lower() and re.findall(
+                    r"[._](url|icon|manifest)", e["key"].lower()
+                ):
+                    diffs = differ.compare(e["d1"], e["d2"])
+                    diffs = [
+                        re.sub(r"[-+]\s+", "", d)
+                        for d in diffs
+                        if "- " in d or "+ " in d
+                    ]
+
+                    if not all(keyword in diffs for keyword in ["stg", "dev"]):
+                        e_values = [ev for ev in e_values if ev != e]
+
+        if errors.get("keys") or e_values:
+            errors["unscrubbed_refs"] = {}
+            errors["actual_refs"] = a_refs
+            errors["expected_refs"] = e_refs
+            mismatches.append(errors)
+            mismatch_keys.append(key)
+
+    if mismatches:
+        # the unscrubbed rows are only read for the context of the mismatches
+        unscrubbed_refs: dict = dict.fromkeys(mismatch_keys)
+        unscrubbed_path = str(actual_refs).replace("_scrubbed.csv", ".csv")
+        async for key, row in iter_keyed_rows(unscrubbed_path, key_fields):
+            if key in unscrubbed_refs and unscrubbed_refs[key] is None:
+                unscrubbed_refs[key] = rc.parse_cells(row)
+        for key, errors in zip(mismatch_keys, mismatches, strict=True):
+            errors["unscrubbed_refs"] = unscrubbed_refs[key] or {}
+
+    return mismatches, unmatched_keys
+
+
+def get_error_rows(mismatches: list[dict]) -> list[list]:
+    """
+    This lays out mismatches as the rows of an errors csv report.
+
+    Args:
+        mismatches: The mismatches of a report, see Validations.validate_references.
+
+    Returns:
+        rows: The rows of the errors report.
+    """
+    rows: list = []
+    for m in mismatches:
+        header_set = set(m["actual_refs"].keys()) | set(m["expected_refs"].keys())
+        headers = [""] + list(header_set)
+        if not rows:
+            rows.append(headers)
+
+        keys_set = {"expected_refs", "actual_refs", "unscrubbed_refs"} | set(m.keys())
+        for k in keys_set:
+            if "skip" not in k:
+                if isinstance(m[k], dict):
+                    rows.append([k] + [m[k].get(h, "") for h in headers[1:]])
+                else:
+                    rows.append([f"error_{k}"] + [jh.serialize((m[k]))])
+        rows.append([""])
+    return rows
+
+
+def get_error_file_path(csv_path: str) -> str:
+    """
+    This gets the path of the errors csv report of a report e.g.
+    run_info/run_logs/api/pass/get.csv -> run_info/run_errors/api/get_errors.csv.
+
+    Args:
+        csv_path: The path of the (unscrubbed) csv report.
+
+    Returns:
+        error_file_path: The path of its errors report.
+    """
+    error_file_path = re.sub(
+        r"/run_logs/", "/run_errors/", csv_path.replace(".csv", "_errors.csv")
+    )
+    return re.sub(r"/pass/|/fail/", "/", error_file_path)
+
 
 class Validations(object):
     """
@@ -44,12 +247,14 @@ class Validations(object):
         self.validations_dir = validations_dir or str(
             root_dir / "validations" / path_diff
         )
-        refs_dir = next(
-            (ref for ref in root_dir.rglob("*") if self.validations_dir in str(ref)),
-            None,
-        )
+        refs_dir = Path(self.validations_dir)
+        if not refs_dir.is_dir():
+            refs_dir = drh.find_path(str(root_dir), self.validations_dir)
+        patterns = ["*.csv"] + [f"*.csv{s}" for s in cx.SUFFIXES.values()]
         self.refs_paths = (
-            [str(ref) for ref in refs_dir.rglob("*.csv")] if refs_dir else []
+            [str(ref) for p in patterns for ref in refs_dir.rglob(p)]
+            if refs_dir
+            else []
         )
 
     async def validate_references(
@@ -58,77 +263,54 @@ class Validations(object):
         skipped_keys: None | list = None,
         expected_refs: None | str = None,
         safe: bool = True,
+        key_fields: None | list = None,
     ) -> list[dict]:
         """
         This validates stored json responses. Unfortunately if actual_refs is a string
-        the expected_refs must be passed.
+        the expected_refs must be passed. The reports are streamed and their rows are
+        paired by key, so an inserted or missing request only affects its own row. The
+        expected refs are read from their compiled baseline and only the rows whose
+        hashes differ are converted and compared in full, see baseline.iter_baseline.
 
         Args:
             actual_refs: The actual (current) path of refs to validate.
             skipped_keys: The keys to skip in the comparison.
             expected_refs: The expected (stored) path of refs to use as a reference.
             safe: Whether to raise an error on mismatches.
+            key_fields: The (non json) columns that pair the actual and expected rows,
+                defaults to KEY_FIELDS.
 
         Returns:
             mismatches: A record of any mismatching keys and or values.
         """
         await self.logger.info(f"Validating references for {actual_refs}.")
 
-        live_file = Path(actual_refs).name
-        _actual_refs = await rc.csv_to_dict(str(actual_refs))
-
+        # the refs match by name whether either of them is compressed or not
+        live_file = cx.strip_suffix(Path(actual_refs).name)
         _expected_refs = expected_refs or next(
-            (Path(r) for r in self.refs_paths if Path(r).name == live_file), []
+            (
+                Path(r)
+                for r in self.refs_paths
+                if cx.strip_suffix(Path(r).name) == live_file
+            ),
+            [],
+        )
+        key_fields = key_fields or KEY_FIELDS
+        mismatches, unmatched_keys = await compare_references(
+            str(actual_refs),
+            str(_expected_refs) if _expected_refs else None,
+            skipped_keys,
+            key_fields,
         )
-        if _expected_refs:
-            _expected_refs = await rc.csv_to_dict(str(_expected_refs))
 
-        if len(_actual_refs) != len(_expected_refs):
+        if unmatched_keys:
             message = (
                 "Test completed HOWEVER, verification isn't possible as the "
-                "actual and expected reference files aren't the same size. Check validation csv existence."
+                "actual and expected reference files aren't the same size. Check validation csv existence. "
+                f"Rows without a counterpart by {key_fields}: {unmatched_keys[:10]}."
             )
             await self.fail(message)
 
-        unscrubbed_refs = await rc.csv_to_dict(
-            actual_refs.replace("_scrubbed.csv", ".csv")
-        )
-
-        differ = Differ()
-        mismatches = []
-        for u_refs, a_refs, e_refs in zip(
-            unscrubbed_refs, _actual_refs, _expected_refs
-        ):
-            errors = dh.compare_dictionaries(
-                a_refs,
-                e_refs,
-                skipped_keys=skipped_keys,
-                exclusive_keys=["ACTUAL_CODE", "MESSAGE"],
-            )
-
-            e_values = errors.get("values")
-            if e_values:
-                e_val_copy = e_values[:]
-                for e in e_val_copy:
-                    if "json." in e["key"].lower() and re.findall(
-                        r"[._](url|icon|manifest)", e["key"].lower()
-                    ):
-                        diffs = differ.compare(e["d1"], e["d2"])
-                        diffs = [
-                            re.sub(r"[-+]\s+", "", d)
-                            for d in diffs
-                            if "- " in d or "+ " in d
-                        ]
-
-                        if not all(keyword in diffs for keyword in ["stg", "dev"]):
-                            e_values = [ev for ev in e_values if ev != e]
-
-            if errors.get("keys") or e_values:
-                errors["unscrubbed_refs"] = u_refs
-                errors["actual_refs"] = a_refs
-                errors["expected_refs"] = e_refs
-                mismatches.append(errors)
-
         if mismatches and not safe:
             await self.fail(f"Validated references with mismatches {mismatches}.")
 
@@ -0,0 +1,138 @@
+"""
+Benchmarks dictionary.flatten and unflatten against the previous recursive versions on
+wide (10k item arrays) and deep (20 levels) payloads.
+
+Run from the project root with: PYTHONPATH=. python scripts/benchmarks/dictionary_benchmark.py
+"""
+
+from timeit import timeit
+
+import quickbolt.utils.dictionary as dh
+
+
+def legacy_flatten(d: dict | list) -> dict:
+    def recurse(value, parent_key=""):
+        if isinstance(value, list):
+            if not value:
+                obj[parent_key] = value
+            else:
+                for i, v in enumerate(value):
+                    recurse(v, f"{parent_key}.{i}" if parent_key else str(i))
+        elif isinstance(value, dict):
+            if not value:
+                obj[parent_key] = value
+            else:
+                for k, v in value.items():
+                    recurse(v, f"{parent_key}.{k}" if parent_key else k)
+        else:
+            obj[parent_key] = value
+
+    obj = {}
+    recurse(d)
+    return obj
+
+
+def legacy_unflatten(flat_dict: dict) -> dict | list:
+    def assign(keys, value, d):
+        key = keys.pop(0)
+
+        if key.isdigit():
+            key = int(key)
+            if isinstance(d, dict):
+                d = [d]
+            while len(d) <= key:
+                d.append(None)
+        else:
+            if isinstance(d, list):
+                d[-1] = {}
+
+        if len(keys) == 0:
+            d[key] = value
+        else:
+            if isinstance(d, list):
+                d[key] = assign(
+                    keys, value, d[key] if key < len(d) and d[key] is not None else {}
+                )
+            else:
+                d[key] = assign(
+                    keys, value, d.get(key, [{}] if keys[0].isdigit() else {})
+                )
+
+        return d
+
+    if len(flat_dict) == 1 and "" in flat_dict:
+        return flat_dict[""]
+
+    unflattened = {}
+    for flat_key, value in flat_dict.items():
+        keys = flat_key.split(".")
+        unflattened = assign(keys, value, unflattened)
+
+    return unflattened
+
+
+def make_wide(items: int) -> dict:
+    return {
+        "total": items,
+        "users": [
+            {
+                "id": i,
+                "name": f"User Number{i}",
+                "tags": [f"tag{i % 10}", "common"],
+                "address": {"street": f"{i} Main St", "zip": f"{10000 + i}"},
+            }
+            for i in range(items)
+        ],
+        "ids": list(range(items)),
+    }
+
+
+def make_deep(depth: int, width: int) -> dict:
+    d = {"leaf": [{"value": i, "name": f"v{i}"} for i in range(width)]}
+    for level in range(depth):
+        d = {f"level{level}": d, "items": [level, {"nested": level}], "id": level}
+    return d
+
+
+def main():
+    payloads = {
+        "wide 1k": make_wide(1000),
+        "wide 10k": make_wide(10_000),
+        "deep 20 x 100": make_deep(20, 100),
+        "deep 20 x 10k": make_deep(20, 10_000),
+    }
+
+    for name, payload in payloads.items():
+        flat = dh.flatten(payload)
+        assert list(flat.items()) == list(legacy_flatten(payload).items())
+        assert dh.unflatten(dict(flat)) == legacy_unflatten(dict(flat)) == payload
+
+        number = 5 if len(flat) < 50_000 else 2
+        results = []
+        for op, legacy, current, data in [
+            ("flatten", legacy_flatten, dh.flatten, payload),
+            ("unflatten", legacy_unflatten, dh.unflatten, flat),
+        ]:
+            legacy_time = timeit(lambda f=legacy, d=data: f(d), number=number) / number
+            current_time = (
+                timeit(lambda f=current, d=data: f(d), number=number) / number
+            )
+            results.append(
+                f"{op} legacy {legacy_time * 1000:>7.1f} ms, "
+                f"current {current_time * 1000:>7.1f} ms, "
+                f"{legacy_time / current_time:>4.1f}x"
+            )
+        print(f"{name:>14}, {len(flat):>7} keys: " + ", ".join(results))
+
+    # the recursive versions hit the recursion limit on very deep payloads
+    payload = make_deep(2000, 1)
+    flat = dh.flatten(payload)
+    assert dh.flatten(dh.unflatten(dict(flat))) == flat
+    try:
+        legacy_flatten(payload)
+    except RecursionError:
+        print("deep 2000: legacy flatten hit the recursion limit, current didn't")
+
+
+if __name__ == "__main__":
+    main()
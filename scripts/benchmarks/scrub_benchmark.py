@@ -0,0 +1,80 @@
+"""
+Benchmarks response_csv.scrub against the previous replace-per-target scrub on large responses.
+
+Run from the project root with: PYTHONPATH=. python scripts/benchmarks/scrub_benchmark.py
+"""
+
+import re
+from timeit import timeit
+
+import quickbolt.reporting.response_csv as rc
+import quickbolt.utils.dictionary as dh
+import quickbolt.utils.json as jh
+
+
+def legacy_scrub(text: str, full: bool = False) -> str:
+    text_dict = jh.deserialize(text)
+    flat_scrubbed_text = dh.flatten(text_dict)
+
+    targets = []
+    for key, value in flat_scrubbed_text.items():
+        if isinstance(value, (int, float)):
+            val_type = type(value).__name__
+            flat_scrubbed_text[key] = f"{value} <{val_type}>"
+
+        target_str = str(flat_scrubbed_text[key])
+        target = [target_str]
+        if not full:
+            target = re.findall(
+                r"([A-Za-z]+[\d@]+[\w@]*|[\d@]+[A-Za-z]+[\w@]*|\d+)",
+                target_str,
+            )
+        targets.extend(target)
+    targets.sort(key=len, reverse=True)
+
+    unflat_scrubbed_text = dh.unflatten(flat_scrubbed_text)
+    scrubbed_text = jh.serialize(unflat_scrubbed_text)
+
+    for t in targets:
+        scrubbed_text = scrubbed_text.replace(t, "0" * len(t))
+
+    return scrubbed_text
+
+
+def make_message(items: int) -> dict:
+    return {
+        "total": items,
+        "next": f"https://api.example.com/v2/users?page=2&token=abc{items}def",
+        "users": [
+            {
+                "id": 100000 + i,
+                "uuid": f"5f0c{i:04x}-9b1e-4c7a-8d2f-{i:012d}",
+                "email": f"user{i}@example.com",
+                "name": f"User Number{i}",
+                "active": bool(i % 2),
+                "score": i / 7,
+                "tags": [f"tag{i % 10}", "common", f"v{i % 3}.0"],
+                "address": {"street": f"{i} Main St", "zip": f"{10000 + i}"},
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def main():
+    for items in [100, 1000, 5000]:
+        text = jh.serialize(make_message(items))
+        assert rc.scrub(text) == legacy_scrub(text)
+
+        number = 3 if items < 5000 else 1
+        legacy = timeit(lambda text=text: legacy_scrub(text), number=number) / number
+        current = timeit(lambda text=text: rc.scrub(text), number=number) / number
+        print(
+            f"{items:>5} items, {len(text) / 1024:>8.1f} KiB: "
+            f"legacy {legacy * 1000:>9.1f} ms, scrub {current * 1000:>7.1f} ms, "
+            f"{legacy / current:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from itertools import islice
+
+import pytest
+
+import quickbolt.batch_generation.batch_generation as bg
+from quickbolt.batch_generation import iter_batch
+
+pytestmark = pytest.mark.batch_generation
+
+url = "https://httpbin.org;/houseId/1b"
+good_url = "https://httpbin.org/houseId/1b"
+headers = {"Auth": "key1"}
+body = {"field1": "value1", "field2": 2}
+
+
+def entry(code, description, url=good_url, headers=headers, body=body):
+    return {
+        "code": code,
+        "description": f"house {description}",
+        "method": "post",
+        "headers": headers,
+        "url": url,
+        "json": body,
+    }
+
+
+def test_iter_batch():
+    batch = iter_batch("post", url, "house", headers=headers, json=body)
+
+    # the entries come in the order of their codes without sorting
+    assert list(batch) == [
+        entry("201", "good"),
+        entry("400", "invalid", url="https://httpbin.org/aaaaaaaaaaaaaaaaaaaaa/1b"),
+        entry("400", "invalid", url="https://httpbin.org/houseId/999aaa"),
+        entry("400", "invalid", url="https://httpbin.org/aaaaaaaaaaaaaaaaaaaaa/999aaa"),
+        entry("400", "invalid", body={"field1": "aaaaaaaaaaaaaaa999", "field2": 2}),
+        entry("400", "invalid", body={"field1": "value1", "field2": 999}),
+        entry("400", "invalid", body={"field1": "aaaaaaaaaaaaaaa999", "field2": 999}),
+        entry("401", "not auth", headers={"Auth": "aaa0"}),
+        entry("404", "not found", url="https://httpbin.org/aaaaaaa/1b"),
+        entry("404", "not found", url="https://httpbin.org/houseId/0a"),
+        entry("404", "not found", url="https://httpbin.org/aaaaaaa/0a"),
+        entry("404", "not found", body={"field1": "aaaaa0", "field2": 2}),
+        entry("404", "not found", body={"field1": "value1", "field2": 0}),
+        entry("404", "not found", body={"field1": "aaaaa0", "field2": 0}),
+    ]
+
+
+def test_iter_batch_unsafe_bodies():
+    batch = list(iter_batch("put", url, data=body, unsafe_bodies=True))
+
+    assert [(b["code"], b["description"]) for b in batch[-3:]] == [
+        ("???", "unsafe bodies")
+    ] * 3
+    assert batch[-1]["data"] == {
+        "field1": "value1 UNION SELECT * FROM information_schema.tables --",
+        "field2": "2 UNION SELECT * FROM information_schema.tables --",
+    }
+    assert batch[0]["code"] == "204"
+    assert all("json" not in b for b in batch)
+
+
+def test_iter_batch_lazy(monkeypatch):
+    generated = []
+
+    def iter_bad_data(*args, **kwargs):
+        for bad_data in original(*args, **kwargs):
+            generated.append(bad_data)
+            yield bad_data
+
+    original = bg.iter_bad_data
+    monkeypatch.setattr(bg, "iter_bad_data", iter_bad_data)
+
+    batch = iter_batch("post", url, json=body, min=False)
+    first = list(islice(batch, 2))
+    assert [b["code"] for b in first] == ["201", "400"]
+    # only the corruption of the first bad url was made
+    assert len(generated) == 1
+
+
+def test_iter_bad_bodies_unique():
+    # the single corruption and the corruption of every value are the same body
+    bad_bodies = list(bg.iter_bad_bodies({"a": "x", "file": "f.png"}))
+    assert bad_bodies == [{"a": "a", "file": "f.png"}]
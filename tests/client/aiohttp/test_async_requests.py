@@ -101,6 +101,12 @@ def test_request_multiple():
     test_request(batch)
 
 
+def test_request_stream():
+    batch = ({"method": "get", "headers": headers, "url": url} for _ in range(3))
+    response = test_request(batch, workers=2)
+    assert [r["index"] for r in response["responses"]] == [1, 2, 3]
+
+
 def test_request_delay():
     start = time.perf_counter()
     test_request(delay=2)
@@ -7,8 +7,12 @@ from time import perf_counter, sleep
 import pytest
 from aiofiles.ospath import exists as aexists
 
+import quickbolt.reporting.response_columnar as rcol
 import quickbolt.reporting.response_csv as rc
+import quickbolt.reporting.response_sqlite as rsql
+import quickbolt.validations.schema as sch
 from quickbolt.clients.aio_grpc import AioGPRC
+from quickbolt.logging import EventLogReader
 from tests.client.gprc.servers import helloworld_pb2, helloworld_pb2_grpc
 
 pytestmark = pytest.mark.client
@@ -144,3 +148,140 @@ async def test_call_report_full_scrub_fields():
     await pytest.aio_grpc.logging.delete_run_info(root_dir)
     path = pytest.aio_grpc.logging.log_file_path
     assert not await aexists(path)
+
+
+async def test_call_history_spill():
+    aio_grpc = AioGPRC(root_dir, history="spill")
+    for _ in range(2):
+        await aio_grpc.call(_options, report=False)
+
+    assert len(aio_grpc._return_history) == 2
+    _return = await aio_grpc._return_history.get(1)
+    assert _return["responses"][0]["batch_number"] == 2
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_event_log():
+    aio_grpc = AioGPRC(root_dir, event_log=True)
+    await aio_grpc.call([_options] * 3, report=False)
+
+    with EventLogReader(aio_grpc.logging.event_log_path) as reader:
+        assert reader.request(1, 3)["actual_code"] == "OK"
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_background_reports():
+    aio_grpc = AioGPRC(
+        root_dir, reuse=True, background_reports=True, buffered_reports=True
+    )
+    for _ in range(3):
+        await aio_grpc.call([_options] * 3)
+    await aio_grpc.close_reports()
+    await aio_grpc.close()
+
+    csv_path = aio_grpc.csv_path.replace(".csv", "_scrubbed.csv")
+    rows = [r for r in await rc.read_csv(csv_path) if any(r)]
+    assert len(rows) == 1 + 3 * 3
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_columnar_report():
+    aio_grpc = AioGPRC(root_dir, columnar_report=True)
+    await aio_grpc.call([_options] * 3)
+
+    columns = rcol.load_columnar_report(aio_grpc.columnar_path)
+    assert columns["actual_code"].tolist() == ["OK"] * 3
+    assert columns["address"].tolist() == [_options["address"]] * 3
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_sqlite_report():
+    aio_grpc = AioGPRC(root_dir, sqlite_report=True)
+    for _ in range(2):
+        await aio_grpc.call([_options] * 3)
+
+    rows = await rsql.query_sqlite_reports(
+        aio_grpc.sqlite_path, "SELECT * FROM responses WHERE batch_number = ?", (2,)
+    )
+    assert [r["actual_code"] for r in rows] == ["OK"] * 3
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_report_rotation():
+    aio_grpc = AioGPRC(root_dir, report_segment_size=1)
+    for _ in range(3):
+        await aio_grpc.call([_options] * 2)
+
+    scrubbed_csv_path = aio_grpc.csv_path.replace(".csv", "_scrubbed.csv")
+    assert len(rc.get_report_segments(aio_grpc.csv_path)) == 3
+    assert len(rc.get_report_segments(scrubbed_csv_path)) == 3
+    scrubbed_dict = await rc.csv_to_dict(scrubbed_csv_path)
+    assert [r["BATCH_NUMBER"] for r in scrubbed_dict] == [1, 1, 2, 2, 3, 3]
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_compression():
+    aio_grpc = AioGPRC(root_dir, compression="gzip", sqlite_report=True)
+    for _ in range(2):
+        await aio_grpc.call([_options] * 3)
+    await aio_grpc.logging.shutdown()
+
+    assert aio_grpc.csv_path.endswith(".csv.gz")
+    assert aio_grpc.sqlite_path.endswith(".db")
+    scrubbed_csv_path = aio_grpc.csv_path.replace(".csv", "_scrubbed.csv")
+    scrubbed_dict = await rc.csv_to_dict(scrubbed_csv_path)
+    assert [r["BATCH_NUMBER"] for r in scrubbed_dict] == [1, 1, 1, 2, 2, 2]
+
+    lines = [line async for line in aio_grpc.logging.read_log_file()]
+    assert lines
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_schema():
+    schema = {
+        "type": "object",
+        "required": ["message"],
+        "properties": {"message": {"type": "string", "pattern": "Hello"}},
+    }
+    wrong_schema = {"type": "object", "required": ["greeting"]}
+    options = [{**_options, "schema": schema}, {**_options, "schema": wrong_schema}]
+    # a call without a schema in the same batch
+    options.append(dict(_options))
+
+    aio_grpc = AioGPRC(root_dir)
+    response = await aio_grpc.call(options)
+
+    responses = response["responses"]
+    assert [r.get("schema_mismatch") for r in responses] == ["", "X", None]
+    assert responses[1]["schema_error"] == "data must contain ['greeting'] properties"
+
+    # the schema results are kept out of the reports so their rows stay aligned
+    scrubbed_csv_path = aio_grpc.csv_path.replace(".csv", "_scrubbed.csv")
+    rows = await rc.read_csv(scrubbed_csv_path)
+    assert "SCHEMA_MISMATCH" not in rows[0]
+    assert {len(r) for r in rows} == {len(rows[0])}
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_call_schema_cache(monkeypatch):
+    schema = {"type": "object", "required": ["message"]}
+    cache = sch.SchemaCache()
+    monkeypatch.setattr(sch, "schema_cache", cache)
+
+    aio_grpc = AioGPRC(root_dir)
+    # each call deep copies its options, so the schema is a new object each time
+    for _ in range(5):
+        await aio_grpc.call({**_options, "schema": schema}, report=False)
+
+    assert (cache.hits, cache.misses) == (4, 1)
+    assert len(cache.checks) == 1
+
+    await aio_grpc.logging.delete_run_info(root_dir)
@@ -0,0 +1,127 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from quickbolt.clients.aio_grpc import AioGPRC
+from tests.client.gprc.servers import helloworld_pb2, helloworld_pb2_grpc
+from tests.client.gprc.test_async_call import check_server
+
+pytestmark = pytest.mark.client
+
+path = Path(__file__)
+parent = path.joinpath(*path.parts[:-1])
+root_dir = str(parent / path.stem)
+_options = {
+    "secure": False,
+    "address": "localhost:50051",
+    "stub": helloworld_pb2_grpc.GreeterStub,
+    "method": "SayHello",
+    "method_args": helloworld_pb2.HelloRequest(name="Quickbolt"),
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_teardown():
+    process = check_server()
+
+    yield
+
+    process.kill()
+
+
+async def _load(rate=None, concurrency=1, keepalive=None, compression=None):
+    aio_grpc = AioGPRC(root_dir)
+    results = await aio_grpc.load(
+        _options,
+        duration=1,
+        rate=rate,
+        concurrency=concurrency,
+        keepalive=keepalive,
+        compression=compression,
+    )
+
+    assert results["duration"] >= 0.9
+    assert results["calls"] == results["codes"]["OK"]
+    if rate and not concurrency:
+        assert results["dropped"] == 0
+    assert results["latency"]["count"] == results["calls"]
+    assert results["histograms"]["OK"].count == results["calls"]
+    assert aio_grpc.channel is None
+
+    await aio_grpc.logging.delete_run_info(root_dir)
+    return results
+
+
+async def test_load():
+    await _load()
+
+
+async def test_load_rate():
+    results = await _load(rate=50, concurrency=None)
+    assert 45 <= results["calls"] <= 55
+
+
+async def test_load_rate_concurrency():
+    results = await _load(rate=50, concurrency=2)
+    assert results["calls"] <= 55
+
+
+async def test_load_concurrency():
+    results = await _load(concurrency=4)
+    assert results["calls"] > 4
+
+
+async def test_load_rate_drops(monkeypatch):
+    load_call = AioGPRC._load_call
+
+    async def slow_load_call(self, *args):
+        await asyncio.sleep(0.05)
+        await load_call(self, *args)
+
+    monkeypatch.setattr(AioGPRC, "_load_call", slow_load_call)
+    aio_grpc = AioGPRC(root_dir)
+    results = await aio_grpc.load(_options, duration=1, rate=100, concurrency=1)
+
+    # every tick either starts a call or is dropped, nothing queues behind the slots
+    assert results["calls"] + results["dropped"] == 100
+    assert results["calls"] <= 25
+    assert results["dropped"] >= 75
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+class BrokenStub(object):
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def SayHello(self, request, **kwargs):
+        raise TypeError("The request is broken.")
+
+
+@pytest.mark.parametrize("rate, concurrency", [(None, 2), (50, None)])
+async def test_load_errors(rate, concurrency):
+    aio_grpc = AioGPRC(root_dir)
+    options = {**_options, "stub": BrokenStub}
+    results = await aio_grpc.load(
+        options, duration=0.5, rate=rate, concurrency=concurrency
+    )
+
+    assert list(results["codes"]) == ["TypeError"]
+    assert results["histograms"]["TypeError"].count == results["calls"] > 0
+    assert aio_grpc.channel is None
+    await aio_grpc.logging.delete_run_info(root_dir)
+
+
+async def test_load_keepalive_compression():
+    keepalive = {"time_ms": 10000, "timeout_ms": 5000, "permit_without_calls": True}
+    await _load(rate=20, concurrency=None, keepalive=keepalive, compression="gzip")
+    await _load(concurrency=1, compression="deflate")
+
+
+async def test_load_bad_options():
+    aio_grpc = AioGPRC(root_dir)
+    with pytest.raises(ValueError):
+        await aio_grpc.load(_options, duration=1, rate=1, compression="brotli")
+    with pytest.raises(ValueError):
+        await aio_grpc.load(_options, duration=1)
+    await aio_grpc.logging.delete_run_info(root_dir)
@@ -4,6 +4,8 @@ from datetime import datetime
 import aiofiles.os as aos
 import pytest
 
+import quickbolt.logging.async_logger as al
+import quickbolt.utils.compression as cx
 import quickbolt.utils.directory as dh
 from quickbolt.logging import AsyncLogger
 
@@ -55,3 +57,80 @@ async def test_logging_by_time():
 
 async def test_logging_custom_root_by_time_():
     await create_logging(by_time=True)
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+async def test_logging_compression(compression):
+    root_dir = sos.path.dirname(__file__) + "/custom_root"
+
+    logging = AsyncLogger(root_dir=root_dir, compression=compression)
+    assert logging.log_file_path.endswith(f"async_logger.log{cx.SUFFIXES[compression]}")
+    assert logging.event_log_path.endswith("async_logger_events.jsonl")
+
+    await logging.logger.info("This is an example log message.")
+    await logging.request_logger.info("This is a {kind} log message.", kind="request")
+    await logging.request_logger.flush()
+
+    lines = [line async for line in logging.read_log_file()]
+    assert [line.split(" | ")[-1] for line in lines] == [
+        "This is an example log message.\n",
+        "This is a request log message.\n",
+    ]
+
+    await logging.shutdown()
+    await logging.delete_run_info(root_dir)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+async def test_request_lines_in_order(compression):
+    root_dir = sos.path.dirname(__file__) + "/custom_root"
+
+    logging = AsyncLogger(root_dir=root_dir, compression=compression)
+    # the request lines are buffered, but written ahead of the next record
+    await logging.request_logger.info("Request {i}.", i=1)
+    await logging.logger.info("Batch 1.")
+    await logging.request_logger.info("Request {i}.", i=2)
+    await logging.request_logger.info("Request {i}.", i=3)
+    await logging.logger.info("Batch 2.")
+    await logging.request_logger.info("Request {i}.", i=4)
+    await logging.request_logger.flush()
+
+    lines = [line async for line in logging.read_log_file()]
+    assert [line.split(" | ")[-1] for line in lines] == [
+        "Request 1.\n",
+        "Batch 1.\n",
+        "Request 2.\n",
+        "Request 3.\n",
+        "Batch 2.\n",
+        "Request 4.\n",
+    ]
+
+    await logging.shutdown()
+    await logging.delete_run_info(root_dir)
+
+
+async def test_read_compressed_log_in_chunks(monkeypatch):
+    root_dir = sos.path.dirname(__file__) + "/custom_root"
+    monkeypatch.setattr(al, "READ_SIZE", 100)
+    reads = []
+
+    async def to_thread(fn, *args):
+        reads.append(args)
+        return fn(*args)
+
+    logging = AsyncLogger(root_dir=root_dir, compression="gzip")
+    for i in range(50):
+        await logging.request_logger.info("Line {i} of the log.", i=i)
+    await logging.request_logger.flush()
+
+    monkeypatch.setattr(al.asyncio, "to_thread", to_thread)
+    lines = [line async for line in logging.read_log_file()]
+    assert [line.split(" | ")[-1] for line in lines] == [
+        f"Line {i} of the log.\n" for i in range(50)
+    ]
+    # the lines were read a few at a time
+    assert len([r for r in reads if r == (100,)]) > 10
+
+    monkeypatch.undo()
+    await logging.shutdown()
+    await logging.delete_run_info(root_dir)
@@ -0,0 +1,64 @@
+import os as sos
+
+import pytest
+
+from quickbolt.logging import AsyncLogger, EventLogReader
+
+pytestmark = pytest.mark.logging
+
+root_dir = sos.path.dirname(__file__) + "/custom_root"
+
+
+def make_return(batch_number, size):
+    return {
+        "duration": 0.5,
+        "responses": [
+            {
+                "description": "good",
+                "code_mismatch": "",
+                "batch_number": batch_number,
+                "index": i + 1,
+                "method": "GET",
+                "expected_code": "200",
+                "actual_code": "200",
+                "message": {"large": "x" * 1000},
+                "url": f"https://localhost/{i}",
+                "response_seconds": 0.01,
+                "delay_seconds": 0,
+                "utc_time": "2023-06-22T05:58:22.882526+00:00",
+            }
+            for i in range(size)
+        ],
+    }
+
+
+async def test_event_log():
+    logging = AsyncLogger(root_dir=root_dir, event_log=True)
+    for b in range(1, 6):
+        await logging.event_log.write_batch(make_return(b, b * 10))
+    await logging.event_log.write_batch({"duration": 0, "responses": []})
+
+    with EventLogReader(logging.event_log_path) as reader:
+        assert reader.batch_numbers == [1, 2, 3, 4, 5]
+
+        batch = reader.batch(4)
+        assert len(batch) == 40
+        assert all(e["batch_number"] == 4 for e in batch)
+        assert "message" not in batch[0]
+
+        event = reader.request(5, 37)
+        assert event["index"] == 37
+        assert event["url"] == "https://localhost/36"
+
+        assert reader.request(5, 51) is None
+        assert reader.batch(6) == []
+        assert len(list(reader)) == 150
+        assert len(list(reader)) == 150
+
+    await logging.delete_run_info(root_dir)
+
+
+async def test_event_log_disabled():
+    logging = AsyncLogger(root_dir=root_dir)
+    assert logging.event_log is None
+    await logging.delete_run_info(root_dir)
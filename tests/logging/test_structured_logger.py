@@ -0,0 +1,84 @@
+import os as sos
+
+import aiofiles.os as aos
+import pytest
+
+from quickbolt.logging import AsyncLogger
+from quickbolt.logging.structured_logger import StructuredLogger
+
+pytestmark = pytest.mark.logging
+
+root_dir = sos.path.dirname(__file__) + "/custom_root"
+
+
+async def read_lines(logging):
+    return [line async for line in logging.read_log_file()]
+
+
+async def test_buffered_until_flush():
+    logging = AsyncLogger(root_dir=root_dir, request_log={"flush_interval": 60})
+    request_logger = logging.request_logger
+
+    await request_logger.info("Made the request with {data}.", 0, data={"a": 1})
+    assert not await aos.path.exists(logging.log_file_path)
+
+    await request_logger.flush()
+    lines = await read_lines(logging)
+    assert len(lines) == 1
+    assert lines[0].endswith(" | INFO | aiologger | Made the request with {'a': 1}.\n")
+
+    await logging.delete_run_info(root_dir)
+
+
+async def test_flush_on_buffer_size():
+    logging = AsyncLogger(
+        root_dir=root_dir, request_log={"buffer_size": 150, "flush_interval": 60}
+    )
+    for i in range(10):
+        await logging.request_logger.info("Line {i} of the batch.", i, i=i)
+
+    lines = await read_lines(logging)
+    assert len(lines) == 9
+
+    await logging.shutdown()
+    assert len(await read_lines(logging)) == 10
+
+    await logging.delete_run_info(root_dir)
+
+
+async def test_level_sampling_truncation():
+    request_log = {"sample_rate": 0.25, "max_field_length": 5, "flush_interval": 60}
+    logging = AsyncLogger(root_dir=root_dir, request_log=request_log)
+    request_logger = logging.request_logger
+
+    for i in range(8):
+        await request_logger.info("Made {data}.", i, data="abcdefghij")
+    await request_logger.debug("Not logged {data}.", data="abc")
+    await request_logger.error("Not sampled {data}.", data="abc")
+    await request_logger.flush()
+
+    lines = await read_lines(logging)
+    assert len(lines) == 3
+    assert lines[0].endswith("Made abcde...<5 more chars>.\n")
+    assert lines[-1].endswith("Not sampled abc.\n")
+
+    await logging.delete_run_info(root_dir)
+
+
+@pytest.mark.parametrize("sample_rate", [0.1, 0.25, 0.6, 0.75])
+def test_sampling_share(sample_rate):
+    request_logger = StructuredLogger("sampling.log", sample_rate=sample_rate)
+    sampled = sum(request_logger.is_enabled("INFO", i) for i in range(1000))
+    assert sampled == 1000 * sample_rate
+    assert request_logger.is_enabled("INFO", 0)
+
+
+def test_truncate_containers():
+    request_logger = StructuredLogger("truncate.log", max_field_length=20)
+    # only the start of a large field is formatted
+    value = {"message": "a" * 100, "ids": list(range(10**6))}
+    assert request_logger.truncate(value) == "{'message': 'aaaaaaa...<more chars>"
+
+    value = {"a": [1, (2,), "b'c", b"d", None], "e": {}}
+    request_logger.max_field_length = 100
+    assert request_logger.truncate(value) == str(value)
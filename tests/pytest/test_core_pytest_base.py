@@ -0,0 +1,46 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import quickbolt.reporting.response_csv as rc
+from quickbolt.logging import AsyncLogger
+from quickbolt.pytest import CorePytestBase
+
+pytestmark = pytest.mark.core_pytest_base
+
+
+async def test_move_rotated_report_to_fail(tmp_path):
+    logging = AsyncLogger(root_dir=str(tmp_path))
+    await logging.logger.info("Failing the test.")
+    csv_path = logging.log_file_path.replace(".log", ".csv")
+
+    report_writer = rc.CsvReportWriter(buffer_size=0, max_segment_batches=1)
+    for batch_number in range(1, 4):
+        responses = [
+            {
+                "batch_number": batch_number,
+                "message": {"id": batch_number},
+                "server_headers": {},
+                "response_seconds": 0.1,
+                "delay_seconds": 0,
+            }
+        ]
+        await rc.create_csv_report(
+            csv_path, {"responses": responses}, scrub=True, report_writer=report_writer
+        )
+    await report_writer.close()
+    assert len(rc.get_report_segments(csv_path)) == 3
+    rows = await rc.read_csv(csv_path)
+
+    core = CorePytestBase()
+    core.validations = SimpleNamespace(logging=logging)
+    core.csv_path = csv_path
+    await core.move_pass_files_to_fail()
+
+    assert core.csv_path == csv_path.replace("/pass/", "/fail/")
+    assert await rc.read_csv(core.csv_path) == rows
+    scrubbed_csv_path = core.csv_path.replace(".csv", "_scrubbed.csv")
+    assert len(await rc.read_csv(scrubbed_csv_path)) == 4
+    # nothing of the report is left behind in the pass folder
+    assert [p.name for p in Path(csv_path).parent.iterdir()] == []
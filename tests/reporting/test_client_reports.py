@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+import quickbolt.reporting.response_csv as rc
+from quickbolt.reporting.client_reports import REPORT_OPTIONS, ClientReports
+
+pytestmark = pytest.mark.reporting
+
+
+def make_return():
+    return {
+        "duration": 0.5,
+        "responses": [
+            {
+                "batch_number": 1,
+                "index": i + 1,
+                "code_mismatch": "",
+                "actual_code": "200",
+                "message": {"id": i},
+                "server_headers": {},
+                "response_seconds": 0.1,
+                "delay_seconds": 0,
+                "kwargs": {},
+            }
+            for i in range(3)
+        ],
+    }
+
+
+async def test_record_batch(tmp_path):
+    reports = ClientReports(str(tmp_path), history="summary", buffered_reports=True)
+    await reports.record_batch(make_return())
+    await reports.record_batch({"duration": 0.1, "responses": []})
+    await reports.record_batch(make_return(), report=False)
+    await reports.flush()
+
+    assert [s["responses"] for s in reports._return_history] == [3, 0, 3]
+    assert len(await rc.csv_to_dict(reports.csv_path)) == 3
+    await reports.close_reports()
+
+
+def test_report_options(tmp_path):
+    assert "root_dir" not in REPORT_OPTIONS
+    assert {"history", "scrub_cache_size", "compact_reports"} <= set(REPORT_OPTIONS)
+
+    reports = ClientReports(str(tmp_path), columnar_report=True, scrub_cache_size=0)
+    assert reports.scrub_cache is None
+    assert os.path.basename(reports.columnar_path).endswith(".cols")
+
+
+async def test_scrub_cache_logged_on_close(tmp_path):
+    reports = ClientReports(str(tmp_path))
+    lines = []
+
+    async def info(msg):
+        lines.append(msg)
+
+    reports.logger.info = info
+    for _ in range(3):
+        await reports.record_batch(make_return())
+    assert not lines
+
+    await reports.close_reports()
+    assert lines == [
+        f"The scrub cache has {reports.scrub_cache.hits} hits and "
+        f"{reports.scrub_cache.misses} misses."
+    ]
+    assert reports.scrub_cache.hits
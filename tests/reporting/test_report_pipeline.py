@@ -0,0 +1,151 @@
+import asyncio
+import os as sos
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from random import randint
+
+import aiofiles.os as aos
+import pytest
+
+import quickbolt.reporting.response_csv as rc
+from quickbolt.reporting.report_pipeline import ReportPipeline
+
+pytestmark = pytest.mark.reporting
+
+
+@pytest.fixture(scope="module", autouse=True)
+def default_vaults():
+    pytest.csv_dir = f"{sos.path.dirname(__file__)}/validations"
+    pytest.responses = [
+        {
+            "description": "Get Test",
+            "code_mismatch": "",
+            "batch_number": 1,
+            "index": i,
+            "method": "GET",
+            "expected_code": "200",
+            "actual_code": "200",
+            "message": {"id": 1000 + i % 2, "token": "abc123", "when": "2023-06-22"},
+            "url": f"https://httpbin.org/anything/{i % 3}",
+            "server_headers": {"Content-Length": "310", "Date": "Thu, 22 Jun 2023"},
+            "utc_time": "2023-06-22T05:58:22.882526+00:00",
+            "headers": {"Authorization": "Bearer Token12345"},
+            "kwargs": {"json": {"ids": [i, 7]}},
+            "curl": f"curl -X GET https://httpbin.org/anything/{i % 3}",
+            "response_seconds": 0.5,
+            "delay_seconds": 0.0,
+        }
+        for i in range(1, 6)
+    ]
+
+
+def get_csv_paths(name):
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/{name}_{randoms}.csv"
+    return csv_path, csv_path.replace(".csv", "_scrubbed.csv")
+
+
+async def read_and_remove(paths):
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+        await aos.remove(path)
+    return contents
+
+
+async def test_report_pipeline(executor=None):
+    expected_paths = get_csv_paths("expected_pipeline")
+    pipeline_paths = get_csv_paths("report_pipeline")
+
+    scrub_cache = rc.ScrubCache()
+    pipeline = ReportPipeline(executor=executor, chunk_size=2)
+    for batch_number in range(1, 4):
+        responses = deepcopy(pytest.responses)
+        for r in responses:
+            r["batch_number"] = batch_number
+
+        _return = {"duration": 1.0, "responses": deepcopy(responses)}
+        await rc.create_csv_report(expected_paths[0], _return, scrub=True)
+
+        _return = {"duration": 1.0, "responses": responses}
+        await pipeline.submit(
+            pipeline_paths[0], _return, scrub=True, scrub_cache=scrub_cache
+        )
+        assert "json" not in _return["responses"][0]["kwargs"]
+    await pipeline.close()
+
+    assert scrub_cache.hits
+    assert await read_and_remove(pipeline_paths) == await read_and_remove(
+        expected_paths
+    )
+
+
+async def test_report_pipeline_threads():
+    with ThreadPoolExecutor(2) as executor:
+        await test_report_pipeline(executor=executor)
+
+
+async def test_report_pipeline_error():
+    with ThreadPoolExecutor(1) as executor:
+        pipeline = ReportPipeline(executor=executor)
+        _return = {"duration": 1.0, "responses": deepcopy(pytest.responses)}
+        await pipeline.submit(f"{pytest.csv_dir}/missing/report.csv", _return)
+
+        with pytest.raises(FileNotFoundError):
+            await pipeline.flush()
+        await pipeline.close()
+
+
+async def test_report_pipeline_snapshot():
+    expected_paths = get_csv_paths("expected_snapshot")
+    pipeline_paths = get_csv_paths("report_snapshot")
+
+    _return = {"duration": 1.0, "responses": deepcopy(pytest.responses)}
+    await rc.create_csv_report(expected_paths[0], deepcopy(_return), scrub=True)
+
+    with ThreadPoolExecutor(1) as executor:
+        pipeline = ReportPipeline(executor=executor)
+        await pipeline.submit(pipeline_paths[0], _return, scrub=True)
+        # changes after a batch was submitted aren't written
+        for r in _return["responses"]:
+            r["message"]["id"] = 0
+            r["headers"]["Authorization"] = "changed"
+            r["server_headers"]["Date"] = "changed"
+        await pipeline.close()
+
+    assert await read_and_remove(pipeline_paths) == await read_and_remove(
+        expected_paths
+    )
+
+
+async def test_report_pipeline_backpressure():
+    csv_paths = get_csv_paths("report_backpressure")
+    scrubbing = threading.Event()
+
+    with ThreadPoolExecutor(1) as executor:
+        # the scrubbing waits behind this until it's let go
+        executor.submit(scrubbing.wait)
+        try:
+            pipeline = ReportPipeline(executor=executor, max_pending=1)
+
+            async def submit():
+                _return = {"duration": 1.0, "responses": deepcopy(pytest.responses)}
+                await pipeline.submit(csv_paths[0], _return, scrub=True)
+
+            # the writer holds the first batch and the queue the second
+            await submit()
+            await asyncio.sleep(0)
+            await submit()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(submit(), 0.1)
+        finally:
+            scrubbing.set()
+
+        await submit()
+        await pipeline.close()
+
+    rows = await rc.read_csv(csv_paths[1])
+    assert len([r for r in rows if r and r[0] == "Get Test"]) == 3 * 5
+    await read_and_remove(csv_paths)
@@ -0,0 +1,83 @@
+import os as sos
+from copy import deepcopy
+from random import randint
+
+import aiofiles.os as aos
+import numpy as np
+import pytest
+
+import quickbolt.reporting.response_columnar as rcol
+import quickbolt.reporting.response_csv as rc
+
+pytestmark = pytest.mark.reporting
+
+
+@pytest.fixture(scope="module", autouse=True)
+def default_vaults():
+    pytest.csv_dir = f"{sos.path.dirname(__file__)}/validations"
+    pytest.responses = [
+        {
+            "description": None,
+            "code_mismatch": "X" if i == 3 else "",
+            "batch_number": 1,
+            "index": i,
+            "method": "GET",
+            "expected_code": "200",
+            "actual_code": "404" if i == 3 else "200",
+            "message": {"id": i, "name": "Quickbolt"},
+            "url": f"https://httpbin.org/anything/{i % 2}",
+            "server_headers": {"Content-Length": "310"},
+            "utc_time": f"2023-06-22T05:58:2{i}.882526+00:00",
+            "headers": {"Authorization": "Bearer Token12345"},
+            "kwargs": {"json": {"ids": [i]}},
+            "response_seconds": 0.5 * i,
+            "delay_seconds": 0.0,
+        }
+        for i in range(1, 4)
+    ]
+
+
+def get_path():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    return f"{pytest.csv_dir}/response_columnar_{randoms}.cols"
+
+
+async def test_create_columnar_report():
+    path = get_path()
+    for batch_number in range(1, 3):
+        responses = deepcopy(pytest.responses)
+        for r in responses:
+            r["batch_number"] = batch_number
+        rc.prepare_responses(responses)
+        await rcol.create_columnar_report(path, {"responses": responses})
+
+    columns = rcol.load_columnar_report(path)
+    assert columns["batch_number"].tolist() == [1, 1, 1, 2, 2, 2]
+    assert columns["index"].tolist() == [1, 2, 3] * 2
+    assert columns["response_seconds"].tolist() == [0.5, 1.0, 1.5] * 2
+    assert columns["description"].tolist() == [""] * 6
+    assert columns["url"][1] == "https://httpbin.org/anything/0"
+    assert columns["utc_time"][2] == np.datetime64("2023-06-22T05:58:23.882526")
+
+    mismatches = columns["code_mismatch"] == "X"
+    assert columns["actual_code"][mismatches].tolist() == ["404", "404"]
+
+    bodies = rcol.read_bodies(path, columns, mismatches)
+    assert bodies[0]["message"] == {"id": 3, "name": "Quickbolt"}
+    assert bodies[1]["body"] == {"ids": [3]}
+    assert len(rcol.read_bodies(path, columns)) == 6
+
+    await aos.remove(path)
+    await aos.remove(rcol.get_bodies_path(path))
+
+
+async def test_load_empty_columnar_report():
+    path = get_path()
+    await rcol.create_columnar_report(path, {"responses": []})
+    assert not await aos.path.exists(path)
+
+    open(path, "wb").close()
+    columns = rcol.load_columnar_report(path)
+    assert not len(columns["index"])
+    assert rcol.read_bodies(path, columns) == []
+    await aos.remove(path)
@@ -1,4 +1,5 @@
 import asyncio
+import csv
 import os as sos
 from random import randint
 from shutil import copy
@@ -7,6 +8,7 @@ import aiofiles.os as aos
 import pytest
 
 import quickbolt.reporting.response_csv as rc
+import quickbolt.utils.compression as cx
 import quickbolt.utils.json as jh
 
 pytestmark = pytest.mark.reporting
@@ -68,6 +70,64 @@ async def test_read_csv():
     assert len(response_csv) == 2
 
 
+async def test_read_csv_cells(tmp_path):
+    csv_path = str(tmp_path / "cells.csv")
+    rows = [
+        ["A", "B", "C", "D", "E"],
+        ['{"a": true, "b": null}', "{'a': (1, 2)}", "[007]", "x[0", "1"],
+        ["<CIMultiDictProxy('A': '1')>", "[]", '["a"]', "", "{}"],
+    ]
+    await rc.add_rows_to_csv_report(csv_path, rows)
+
+    assert await rc.read_csv(csv_path) == [
+        rows[0],
+        [{"a": True, "b": None}, {"a": (1, 2)}, [7], "x[0", "1"],
+        ["<CIMultiDictProxy('A': '1')>", [], ["a"], "", {}],
+    ]
+
+
+@pytest.mark.parametrize(
+    "data, full, expected",
+    [
+        # the outputs of the original flatten and replace scrub
+        # the empty dict of a.b is dropped, only the one unflatten makes is kept
+        (
+            {"a.b": {}, "a": {"b": "ab1"}, "c": {"2": "x"}},
+            True,
+            {"a": {"b": "000"}, "c": [{}, None, "0"]},
+        ),
+        (
+            {"a.b": {}, "a": {"b": 3.5}, "1": {"v2": 0}},
+            True,
+            [{"a": {"b": "00000000000"}}, {"v2": "0000000"}],
+        ),
+        (
+            {"a.b": {}, "a": {"b": 3.5}, "1": {"v2": 0}},
+            False,
+            [{"a": {"b": "0.0 <float>"}}, {"v2": "0 <int>"}],
+        ),
+        (
+            {"k1": {}, "tok9z": 7, "a.b": "k1"},
+            True,
+            {"00": 0, "tok9z": "0000000", "a": {"b": "00"}},
+        ),
+        (
+            {"k1": {}, "tok9z": 7, "a.b": "k1"},
+            False,
+            {"00": {}, "tok9z": "0 <int>", "a": {"b": "00"}},
+        ),
+        (
+            {"id": {"2": "x1y"}, "user.name": "ab12", "user": {"name": "cd34"}},
+            True,
+            {"id": [{}, None, "000"], "user": {"name": "0000"}},
+        ),
+        ({"0": "ab12", "1": {"x": 5}}, True, ["0000", {"x": "0000000"}]),
+    ],
+)
+def test_scrub_flat_keys(data, full, expected):
+    assert jh.deserialize(rc.scrub(jh.serialize(data), full)) == expected
+
+
 def test_scrub():
     data = {"new_field": "Test12345"}
     data_message = jh.serialize(data)
@@ -228,6 +288,26 @@ async def test_delete_last_n_rows_from_csv_report():
     await aos.remove(csv_copy)
 
 
+async def test_delete_last_n_rows_keeps_multiline_cells():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/delete_rows_{randoms}.csv"
+    rows = [["A", "B"], ["1", '{\n  "a": "x\ny"\n}'], [], ['"2"', "multi\nline"], ["3"]]
+    await rc.add_rows_to_csv_report(csv_path, rows)
+
+    await rc.delete_last_n_rows_from_csv_report(csv_path, 2)
+    with open(csv_path, encoding="ascii", newline="") as f:
+        assert list(csv.reader(f)) == rows[:3]
+
+    await rc.delete_last_n_rows_from_csv_report(csv_path, 0)
+    await rc.delete_last_n_rows_from_csv_report(csv_path, 1)
+    with open(csv_path, encoding="ascii", newline="") as f:
+        assert list(csv.reader(f)) == rows[:2]
+
+    await rc.delete_last_n_rows_from_csv_report(csv_path, 5)
+    assert not await aos.path.getsize(csv_path)
+    await aos.remove(csv_path)
+
+
 async def test_add_column_to_csv_report():
     csv_copy, _ = await test_create_csv_report(delete=False)
     await rc.add_column_to_csv_report(
@@ -239,3 +319,277 @@ async def test_add_column_to_csv_report():
     assert response_csv[1][-1] == "New Column Value1"
     assert response_csv[2][-1] == "New Column Value2"
     await aos.remove(csv_copy)
+
+
+def test_scrub_cache():
+    scrub_cache = rc.ScrubCache(maxsize=2)
+    data = {"message": {"error": "Not found 404"}, "headers": pytest.test_field}
+
+    scrubbed_data = rc.scrub_data(data, scrub_cache=scrub_cache)
+    assert scrubbed_data == rc.scrub_data(data)
+    assert (scrub_cache.hits, scrub_cache.misses) == (0, 2)
+
+    for _ in range(3):
+        assert rc.scrub_data(data, scrub_cache=scrub_cache) == scrubbed_data
+    assert (scrub_cache.hits, scrub_cache.misses) == (6, 2)
+
+    rc.scrub_data({"message": data["message"]}, ["message"], scrub_cache=scrub_cache)
+    assert scrub_cache.misses == 3
+    assert len(scrub_cache.values) == 2
+
+
+async def test_csv_report_writer():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/report_writer_{randoms}.csv"
+    expected_csv_path = csv_path.replace(".csv", "_expected.csv")
+
+    report_writer = rc.CsvReportWriter(flush_interval=60)
+    assert not await report_writer.has_rows(csv_path)
+
+    for _ in range(2):
+        response = {"responses": [dict(pytest.response["responses"][0])]}
+        await rc.create_csv_report(expected_csv_path, response)
+        response = {"responses": [dict(pytest.response["responses"][0])]}
+        await rc.create_csv_report(csv_path, response, report_writer=report_writer)
+
+    assert await report_writer.has_rows(csv_path)
+    assert not await aos.path.exists(csv_path)
+
+    await report_writer.close()
+    assert await rc.read_csv(csv_path) == await rc.read_csv(expected_csv_path)
+    await aos.remove(csv_path)
+    await aos.remove(expected_csv_path)
+
+
+async def test_iter_csv_rows():
+    rows = [row async for row in rc.iter_csv_rows(pytest.csv_path, chunk_size=1)]
+    assert rows == await rc.csv_to_dict(pytest.csv_path)
+    assert rows[0]["INDEX"] == 1
+
+    raw_rows = [row async for row in rc.iter_csv_rows(pytest.csv_path, typed=False)]
+    assert len(raw_rows) == len(rows)
+    assert all(isinstance(v, str) for v in raw_rows[0].values())
+
+
+def test_parse_cell():
+    for cell in ["", "GET", "200", "007", "1.5", "true", "null", '"q"', "[1, 02]"]:
+        assert rc.parse_cell(cell) == jh.deserialize(cell, safe=True)
+    assert rc.parse_cell('{\n  "a": 007\n}', json_column=True) == {"a": 7}
+    assert rc.parse_cell({"a": 1}) == {"a": 1}
+
+
+async def test_add_column_to_csv_report_keeps_cells():
+    def read_rows(path):
+        with open(path, encoding="ascii", newline="") as f:
+            return list(csv.reader(f))
+
+    csv_copy, _ = await test_create_csv_report(delete=False)
+    await rc.add_rows_to_csv_report(csv_copy, [[""], [""], ["Last", "Row"]])
+    before = read_rows(csv_copy)
+
+    await rc.add_column_to_csv_report(csv_copy, ["Title", {"a": 1}])
+
+    after = read_rows(csv_copy)
+    assert [r[:-1] if r else r for r in after] == before
+    assert [r[-1] for r in after if r] == (
+        ["Title"]
+        + [""] * (len([r for r in before if r]) - 2)
+        + [jh.serialize({"a": 1})]
+    )
+
+    with pytest.raises(ValueError):
+        await rc.add_column_to_csv_report(csv_copy, ["Title"] + [""] * 9)
+    assert read_rows(csv_copy) == after
+    await aos.remove(csv_copy)
+
+
+async def test_csv_report_writer_after_add_column():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/report_writer_{randoms}.csv"
+
+    report_writer = rc.CsvReportWriter(buffer_size=0)
+    await report_writer.write_rows(csv_path, [["A"], ["1"]])
+    await rc.add_column_to_csv_report(csv_path, ["B", "2"])
+    await report_writer.write_rows(csv_path, [["3", "4"]])
+    await report_writer.close()
+
+    assert await rc.read_csv(csv_path) == [["A", "B"], ["1", "2"], ["3", "4"]]
+    await aos.remove(csv_path)
+
+
+async def test_csv_report_rotation():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/rotation_{randoms}.csv"
+    expected_csv_path = csv_path.replace(".csv", "_expected.csv")
+
+    report_writer = rc.CsvReportWriter(buffer_size=0, max_segment_batches=2)
+    for batch_number in range(1, 6):
+        responses = [dict(pytest.response["responses"][0], batch_number=batch_number)]
+        await rc.create_csv_report(expected_csv_path, {"responses": responses})
+        responses = [dict(pytest.response["responses"][0], batch_number=batch_number)]
+        await rc.create_csv_report(
+            csv_path, {"responses": responses}, report_writer=report_writer
+        )
+    await report_writer.close()
+
+    segment_paths = rc.get_report_segments(csv_path)
+    assert segment_paths == [rc.get_segment_path(csv_path, n) for n in (1, 2, 3)]
+    manifest = rc.load_manifest(csv_path)
+    assert [(s["first_batch"], s["last_batch"]) for s in manifest["segments"]] == [
+        (1, 2),
+        (3, 4),
+        (5, 5),
+    ]
+
+    assert await rc.csv_to_dict(csv_path) == await rc.csv_to_dict(expected_csv_path)
+    assert await rc.read_csv(csv_path) == await rc.read_csv(expected_csv_path)
+
+    for path in segment_paths + [rc.get_manifest_path(csv_path), expected_csv_path]:
+        await aos.remove(path)
+
+
+async def test_rotated_csv_report_edits():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/rotated_edits_{randoms}.csv"
+
+    report_writer = rc.CsvReportWriter(buffer_size=0, max_segment_batches=2)
+    for batch_number in range(1, 6):
+        responses = [dict(pytest.response["responses"][0], batch_number=batch_number)]
+        await rc.create_csv_report(
+            csv_path, {"responses": responses}, report_writer=report_writer
+        )
+    await report_writer.close()
+    segment_paths = rc.get_report_segments(csv_path)
+
+    def get_batches():
+        return [
+            (s["first_batch"], s["last_batch"], s["batches"])
+            for s in rc.load_manifest(csv_path)["segments"]
+        ]
+
+    def check_sizes():
+        for segment in rc.load_manifest(csv_path)["segments"]:
+            path = sos.path.join(pytest.csv_dir, segment["path"])
+            assert segment["size"] == sos.path.getsize(path)
+
+    # the last segment only holds batch 5 so it's removed
+    await rc.delete_last_n_rows_from_csv_report(csv_path, 1)
+    assert not sos.path.exists(segment_paths[2])
+    assert rc.get_report_segments(csv_path) == segment_paths[:2]
+    assert get_batches() == [(1, 2, 2), (3, 4, 2)]
+
+    # batch 4 and the blank row before it are cut from the end of the second segment
+    await rc.delete_last_n_rows_from_csv_report(csv_path, 2)
+    rows = await rc.csv_to_dict(csv_path)
+    assert [r["BATCH_NUMBER"] for r in rows] == [1, 2, 3]
+    assert get_batches() == [(1, 2, 2), (3, 3, 1)]
+    check_sizes()
+
+    await rc.add_column_to_csv_report(csv_path, ["COLUMN", "x", "y"])
+    rows = await rc.csv_to_dict(csv_path)
+    assert [r["COLUMN"] for r in rows] == ["", "x", "y"]
+    for segment_path in segment_paths[:2]:
+        with open(segment_path, encoding="ascii", newline="") as f:
+            assert next(csv.reader(f))[-1] == "COLUMN"
+    check_sizes()
+
+    # appended rows go to the last segment
+    await rc.add_rows_to_csv_report(csv_path, [[""], ["a"]])
+    with open(segment_paths[1], encoding="ascii", newline="") as f:
+        assert list(csv.reader(f))[-1] == ["a"]
+    check_sizes()
+
+    for path in segment_paths[:2] + [rc.get_manifest_path(csv_path)]:
+        await aos.remove(path)
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+async def test_compressed_csv_report(compression):
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/compressed_{randoms}.csv"
+    compressed_csv_path = csv_path + cx.get_suffix(compression)
+
+    report_writers = {
+        path: rc.CsvReportWriter(buffer_size=0, max_segment_batches=2)
+        for path in [csv_path, compressed_csv_path]
+    }
+    for batch_number in range(1, 4):
+        for path, report_writer in report_writers.items():
+            responses = [
+                dict(pytest.response["responses"][0], batch_number=batch_number)
+            ]
+            await rc.create_csv_report(
+                path, {"responses": responses}, report_writer=report_writer
+            )
+    for report_writer in report_writers.values():
+        await report_writer.close()
+
+    segment_paths = rc.get_report_segments(compressed_csv_path)
+    assert segment_paths[1] == f"{pytest.csv_dir}/compressed_{randoms}-2.csv" + (
+        cx.get_suffix(compression)
+    )
+    assert await rc.read_csv(compressed_csv_path) == await rc.read_csv(csv_path)
+    assert await rc.csv_to_dict(compressed_csv_path) == await rc.csv_to_dict(csv_path)
+
+    for path in [csv_path, compressed_csv_path]:
+        await rc.add_rows_to_csv_report(path, [["a"], ["b", {"c": 1}]])
+        await rc.delete_last_n_rows_from_csv_report(path, 1)
+        await rc.add_column_to_csv_report(path, ["COLUMN", "value"])
+    assert await rc.read_csv(compressed_csv_path) == await rc.read_csv(csv_path)
+
+    with open(compressed_csv_path, "rb") as f:
+        assert not f.read().startswith(b"DESCRIPTION")
+
+    for path in report_writers:
+        for segment_path in rc.get_report_segments(path):
+            await aos.remove(segment_path)
+        await aos.remove(rc.get_manifest_path(path))
+
+
+async def test_compact_csv_report():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/compact_{randoms}.csv"
+    compact_csv_path = csv_path.replace(".csv", "_compact.csv")
+
+    report_writer = rc.CsvReportWriter(buffer_size=0, compact=True)
+    for _ in range(2):
+        response = {"responses": [dict(pytest.response["responses"][0])]}
+        await rc.create_csv_report(csv_path, response, scrub=True)
+        response = {"responses": [dict(pytest.response["responses"][0])]}
+        await rc.create_csv_report(
+            compact_csv_path, response, scrub=True, report_writer=report_writer
+        )
+    await report_writer.close()
+
+    for path, compact_path in [
+        (csv_path, compact_csv_path),
+        (
+            csv_path.replace(".csv", "_scrubbed.csv"),
+            compact_csv_path.replace(".csv", "_scrubbed.csv"),
+        ),
+    ]:
+        assert await rc.csv_to_dict(compact_path) == await rc.csv_to_dict(path)
+        assert sos.path.getsize(compact_path) < sos.path.getsize(path)
+        await aos.remove(path)
+        await aos.remove(compact_path)
+
+
+async def test_csv_report_schema_fields():
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    csv_path = f"{pytest.csv_dir}/schema_{randoms}.csv"
+
+    response = pytest.response["responses"][0]
+    responses = [
+        dict(response),
+        dict(response, schema_mismatch="X", schema_error="data must be object"),
+    ]
+    await rc.create_csv_report(csv_path, {"responses": responses})
+    # a later batch adding a schema keeps the rows aligned with the header
+    responses = [dict(response, schema_mismatch="", schema_error="")]
+    await rc.create_csv_report(csv_path, {"responses": responses})
+
+    rows = await rc.read_csv(csv_path)
+    assert "SCHEMA_MISMATCH" not in rows[0]
+    assert [len(r) for r in rows] == [len(rows[0])] * 4
+
+    await aos.remove(csv_path)
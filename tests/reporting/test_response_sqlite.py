@@ -0,0 +1,92 @@
+import os as sos
+from copy import deepcopy
+from random import randint
+
+import aiofiles.os as aos
+import pytest
+
+import quickbolt.reporting.response_csv as rc
+import quickbolt.reporting.response_sqlite as rsql
+
+pytestmark = pytest.mark.reporting
+
+
+@pytest.fixture(scope="module", autouse=True)
+def default_vaults():
+    pytest.csv_dir = f"{sos.path.dirname(__file__)}/validations"
+    pytest.responses = [
+        {
+            "description": "Corrupted url not found" if i == 3 else "Get Test",
+            "code_mismatch": "X" if i == 3 else "",
+            "batch_number": 1,
+            "index": i,
+            "method": "GET",
+            "expected_code": 200,
+            "actual_code": "502" if i == 3 else "200",
+            "message": {"id": i, "name": "Quickbolt"},
+            "url": f"https://httpbin.org/anything/{i}",
+            "server_headers": {"Content-Length": "310"},
+            "utc_time": "2023-06-22T05:58:22.882526+00:00",
+            "headers": {"Authorization": "Bearer Token12345"},
+            "kwargs": {"json": {"ids": [i]}},
+            "curl": f"curl -X GET https://httpbin.org/anything/{i}",
+            "response_seconds": 0.5 * i,
+            "delay_seconds": 0.0,
+        }
+        for i in range(1, 4)
+    ]
+
+
+async def create_sqlite_report(batches=2):
+    randoms = "".join(str(randint(0, 9)) for _ in range(10))
+    db_path = f"{pytest.csv_dir}/response_sqlite_{randoms}.db"
+    for batch_number in range(1, batches + 1):
+        responses = deepcopy(pytest.responses)
+        for r in responses:
+            r["batch_number"] = batch_number
+        rc.prepare_responses(responses)
+        await rsql.create_sqlite_report(db_path, {"responses": responses})
+    return db_path
+
+
+async def remove_sqlite_report(db_path):
+    for suffix in ["", "-wal", "-shm"]:
+        not await aos.path.exists(db_path + suffix) or await aos.remove(
+            db_path + suffix
+        )
+
+
+async def test_create_sqlite_report():
+    db_path = await create_sqlite_report()
+
+    rows = rsql.query_sqlite_report(db_path, 'SELECT * FROM responses ORDER BY "id"')
+    assert [(r["batch_number"], r["index"]) for r in rows] == [
+        (b, i) for b in (1, 2) for i in (1, 2, 3)
+    ]
+    assert rows[0]["expected_code"] == "200"
+    assert rows[0]["response_seconds"] == 0.5
+    assert rows[0]["message"] == {"id": 1, "name": "Quickbolt"}
+    assert rows[0]["body"] == {"ids": [1]}
+    assert rows[0]["extra"] == {"curl": "curl -X GET https://httpbin.org/anything/1"}
+
+    plan = rsql.query_sqlite_report(
+        db_path, "EXPLAIN QUERY PLAN SELECT * FROM responses WHERE actual_code = '502'"
+    )
+    assert "responses_actual_code" in plan[0]["detail"]
+
+    await remove_sqlite_report(db_path)
+
+
+async def test_query_sqlite_reports():
+    db_paths = [await create_sqlite_report(1) for _ in range(3)]
+
+    rows = await rsql.query_sqlite_reports(
+        db_paths,
+        "SELECT * FROM responses WHERE actual_code LIKE ? AND description LIKE ?",
+        ("5%", "%not found%"),
+    )
+    assert [r["report"] for r in rows] == db_paths
+    assert {r["index"] for r in rows} == {3}
+
+    for db_path in db_paths:
+        await remove_sqlite_report(db_path)
@@ -0,0 +1,85 @@
+import os as sos
+
+import aiofiles.os as aos
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from quickbolt.reporting.return_history import ReturnHistory
+
+pytestmark = pytest.mark.reporting
+
+
+def make_return(batch_number):
+    return {
+        "duration": 0.5,
+        "responses": [
+            {
+                "batch_number": batch_number,
+                "index": i + 1,
+                "code_mismatch": "X" if i else "",
+                "actual_code": "200" if i else "404",
+                "message": {"field": f"value{i}"},
+                "server_headers": CIMultiDictProxy(CIMultiDict({"Server": "test"})),
+            }
+            for i in range(3)
+        ],
+    }
+
+
+async def test_full():
+    history = ReturnHistory()
+    for b in range(5):
+        await history.append(make_return(b))
+    assert len(history) == 5
+    assert history[0]["responses"][0]["batch_number"] == 0
+
+
+async def test_last():
+    history = ReturnHistory("last", size=2)
+    for b in range(5):
+        await history.append(make_return(b))
+    assert len(history) == 2
+    assert [h["responses"][0]["batch_number"] for h in history] == [3, 4]
+
+
+async def test_summary():
+    history = ReturnHistory("summary")
+    await history.append(make_return(1))
+    assert history[0] == {
+        "duration": 0.5,
+        "batch_number": 1,
+        "responses": 3,
+        "codes": {"404": 1, "200": 2},
+        "code_mismatches": 2,
+        "schema_mismatches": 0,
+    }
+
+
+async def test_spill():
+    spill_path = f"{sos.path.dirname(__file__)}/validations/history/spill.jsonl"
+    history = ReturnHistory("spill", spill_path=spill_path)
+    for b in range(5):
+        await history.append(make_return(b))
+
+    assert len(history) == 5
+    assert not history.batches
+    assert (await history.get(-1))["responses"][0]["batch_number"] == 4
+    assert (await history.get(2))["responses"][0]["server_headers"] == {
+        "Server": "test"
+    }
+    batch_numbers = [h["responses"][0]["batch_number"] async for h in history]
+    assert batch_numbers == list(range(5))
+    with pytest.raises(TypeError):
+        history[0]
+
+    await aos.remove(spill_path)
+    await aos.rmdir(sos.path.dirname(spill_path))
+
+
+def test_bad_policy():
+    with pytest.raises(ValueError):
+        ReturnHistory("everything")
+    with pytest.raises(ValueError):
+        ReturnHistory("last")
+    with pytest.raises(ValueError):
+        ReturnHistory("spill")
@@ -0,0 +1,41 @@
+import pytest
+
+import quickbolt.utils.compression as cx
+
+pytestmark = pytest.mark.utils
+
+
+def test_get_suffix():
+    assert cx.get_suffix(None) == ""
+    assert cx.get_suffix("gzip") == ".gz"
+    assert cx.get_suffix("zstd") == ".zst"
+
+    with pytest.raises(ValueError):
+        cx.get_suffix("bz2")
+
+
+def test_get_compression():
+    assert cx.get_compression("test.csv") is None
+    assert cx.get_compression("test.csv.gz") == "gzip"
+    assert cx.get_compression("test.log.zst") == "zstd"
+
+    assert cx.strip_suffix("test.csv.gz") == "test.csv"
+    assert cx.strip_suffix("test.csv") == "test.csv"
+
+
+@pytest.mark.parametrize("suffix", ["", ".gz", ".zst"])
+def test_append(tmp_path, suffix):
+    path = str(tmp_path / f"test.log{suffix}")
+    cx.append(path, "first line\n")
+
+    # a file with members written so far can be read before the next append
+    with cx.open_file(path) as f:
+        assert f.read() == "first line\n"
+
+    cx.append(path, "second line\n")
+    with cx.open_file(path) as f:
+        assert f.readlines() == ["first line\n", "second line\n"]
+
+    if suffix:
+        with open(path, "rb") as f:
+            assert not f.read().startswith(b"first line")
@@ -73,3 +73,35 @@ def test_compare_dicts_normalize():
         test_dict, changed_test_dict_casing, normalize=True
     )
     assert mismatches == {}
+
+
+def test_comparator_matches_compare_dictionaries():
+    comparator = dh.DictionaryComparator(skipped_keys=["int1"])
+    for d1, d2 in [(test_dict, changed_test_dict), (changed_test_dict, test_dict)]:
+        mismatches = comparator.compare(d1, d2)
+        expected_mismatches = dh.compare_dictionaries(d1, d2, skipped_keys=["int1"])
+        assert sorted(mismatches.pop("skipped_keys")) == sorted(
+            expected_mismatches.pop("skipped_keys")
+        )
+        assert mismatches == expected_mismatches
+
+
+def test_comparator_skipped_keys_not_changed():
+    skipped_keys = ["int1"]
+    comparator = dh.DictionaryComparator(skipped_keys=skipped_keys)
+    comparator.compare(test_dict, changed_test_dict)
+    dh.compare_dictionaries(test_dict, changed_test_dict, skipped_keys=skipped_keys)
+    assert skipped_keys == ["int1"]
+
+
+def test_comparator_list_skipped_keys():
+    comparator = dh.DictionaryComparator(
+        exclusive_keys=["list1"], list_skipped_keys=False
+    )
+    assert comparator.compare(test_dict, changed_test_dict) == {}
+
+    changed_list_dict = deepcopy(test_dict)
+    changed_list_dict["dict1"]["list1"] = ["str1", "str2", "str3"]
+    mismatches = comparator.compare(test_dict, changed_list_dict)
+    assert mismatches["keys"] == [{"f2_not_in_f1": ["dict1.list1.2"]}]
+    assert "dict1.str1" in mismatches["skipped_keys"]
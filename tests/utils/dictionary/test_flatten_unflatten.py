@@ -157,3 +157,19 @@ def test_unflatten_list_dict():
     original = {}
     unflat_dict = dh.unflatten(pytest.flat_empty_dict)
     assert unflat_dict == original
+
+
+def test_flatten_unflatten_deep():
+    deep_dict = {"leaf": [1, {"id": 2}]}
+    for level in range(2000):
+        deep_dict = {f"level{level}": deep_dict, "items": [level]}
+
+    flat_dict = dh.flatten(deep_dict)
+    assert len(flat_dict) == 2000 + 2
+    assert dh.flatten(dh.unflatten(dict(flat_dict))) == flat_dict
+
+
+def test_unflatten_unordered():
+    flat_dict = {"list.2.id": 3, "list.0": 1, "dict.key": "value", "list.1": 2}
+    unflat_dict = dh.unflatten(flat_dict)
+    assert unflat_dict == {"list": [1, 2, {"id": 3}], "dict": {"key": "value"}}
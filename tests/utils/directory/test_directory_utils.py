@@ -129,3 +129,29 @@ async def test_expand_directory():
     actual_files = [e.name for e in expanded_dir]
     expected_files = ["directory", "__init__.py", "test_directory_utils.py"]
     assert actual_files == expected_files
+
+
+async def test_get_path_index():
+    dh.clear_path_index()
+    index = dh.get_path_index(pytest.base_path)
+    assert Path(__file__) in index[Path(__file__).name]
+    assert dh.get_path_index(pytest.base_path) is index
+
+    path = pytest.base_path + "/node_modules/test_directory_utils.py"
+    dh.safe_mkdirs_sync(str(Path(path).parent))
+    Path(path).touch()
+
+    dh.clear_path_index(pytest.base_path)
+    index = dh.get_path_index(pytest.base_path)
+    assert index[Path(__file__).name] == [Path(__file__)]
+    assert "node_modules" not in index
+
+    await aos.remove(path)
+    await aos.rmdir(str(Path(path).parent))
+    dh.clear_path_index()
+
+
+async def test_find_path():
+    file_path = dh.find_path(pytest.base_path, "directory/test_directory_utils.py")
+    assert file_path == Path(__file__)
+    assert dh.find_path(pytest.base_path, "other/test_directory_utils.py") is None
@@ -0,0 +1,43 @@
+import pytest
+
+from quickbolt.utils.histogram import LatencyHistogram
+
+pytestmark = pytest.mark.utils
+
+
+def test_record():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+
+    summary = histogram.to_dict()
+    assert summary["count"] == 100
+    assert summary["min"] == 0.001
+    assert summary["max"] == 0.1
+    assert summary["p50"] == pytest.approx(0.05, rel=0.02)
+    assert summary["p99"] == pytest.approx(0.099, rel=0.02)
+
+
+def test_merge():
+    histogram1 = LatencyHistogram()
+    histogram2 = LatencyHistogram()
+    combined = LatencyHistogram()
+    for ms in range(1, 51):
+        histogram1.record(ms / 1000)
+        combined.record(ms / 1000)
+    for ms in range(51, 101):
+        histogram2.record(ms / 1000)
+        combined.record(ms / 1000)
+
+    merged = histogram1.merge(histogram2)
+    assert merged.counts == combined.counts
+    assert merged.to_dict() == combined.to_dict()
+
+
+def test_empty():
+    assert LatencyHistogram().to_dict()["p50"] == 0.0
+
+
+def test_bad_sub_buckets():
+    with pytest.raises(ValueError):
+        LatencyHistogram(sub_buckets=10)
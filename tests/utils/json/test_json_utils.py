@@ -41,6 +41,15 @@ def test_serialize_safe():
     assert data == bad_test_dict
 
 
+def test_serialize_bytes():
+    data = jh.serialize_bytes(test_dict)
+    assert data == b'{"str1":"value1","int1":2,"list1":["str1","str2"],"list2":[0,1]}'
+    assert jh.serialize_bytes(test_dict, compact=False).decode() == jh.serialize(
+        test_dict
+    )
+    assert jh.serialize(test_dict, compact=True) == data.decode()
+
+
 def test_deserialize():
     test_dict_json = jh.serialize(test_dict)
     data = jh.deserialize(test_dict_json)
@@ -79,3 +88,15 @@ def test_not_deserialize_not_safe():
 def test_not_deserialize_safe():
     data = jh.deserialize(bad_test_dict, safe=True)
     assert data == bad_test_dict
+
+
+def test_squash_leading_zeros():
+    text = '{"id": "0012", "ids": [007, 0, 10, 000], "score": 0.05, "e": 1e05}'
+    expected_text = '{"id": "0012", "ids": [7, 0, 10, 0], "score": 0.05, "e": 1e05}'
+    assert jh.squash_leading_zeros(text) == expected_text
+    assert jh.squash_leading_zeros('["a \\" 007", 007]') == '["a \\" 007", 7]'
+
+
+def test_deserialize_bytes():
+    assert jh.deserialize(b'{"id": 007}') == {"id": 7}
+    assert jh.deserialize(b"<html>", safe=True) == b"<html>"
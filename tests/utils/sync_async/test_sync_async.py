@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+import quickbolt.utils.sync_async as sa
+
+pytestmark = pytest.mark.utils
+
+
+async def test_map_bounded():
+    in_flight = []
+    pulled = []
+
+    def items():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    async def fn(i):
+        in_flight.append(i)
+        # no more items are pulled than there are workers
+        assert len(pulled) - len(in_flight) <= 3
+        await asyncio.sleep(0.001 * (i % 3))
+        return i * 2
+
+    results = await sa.map_bounded(fn, items(), workers=3)
+    assert sorted(results) == [i * 2 for i in range(20)]
+
+
+async def test_map_bounded_async_iterable():
+    async def items():
+        for i in range(5):
+            yield i
+
+    running = 0
+    max_running = 0
+
+    async def fn(i):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return i
+
+    assert sorted(await sa.map_bounded(fn, items(), workers=2)) == list(range(5))
+    assert max_running == 2
+    assert await sa.map_bounded(fn, [], workers=0) == []
+
+
+async def test_map_bounded_error():
+    async def fn(i):
+        if i == 1:
+            raise ValueError(i)
+        await asyncio.sleep(1)
+
+    with pytest.raises(ValueError):
+        await sa.map_bounded(fn, range(4), workers=4)
@@ -0,0 +1,78 @@
+import os
+import pickle
+import re
+from shutil import copy
+
+import orjson
+import pytest
+
+import quickbolt.reporting.response_csv as rc
+import quickbolt.validations.baseline as bl
+
+pytestmark = pytest.mark.validations
+
+fields = ["ACTUAL_CODE", "MESSAGE"]
+pattern = re.compile("|".join(fields))
+
+
+@pytest.fixture()
+def csv_path(tmp_path):
+    path = tmp_path / "get_example_scrubbed.csv"
+    copy(f"{os.path.dirname(__file__)}/get_example_scrubbed.csv", path)
+    return str(path)
+
+
+async def test_iter_baseline(csv_path):
+    records = [r async for r in bl.iter_baseline(csv_path, fields)]
+    assert os.path.exists(bl.get_cache_path(csv_path))
+
+    rows = await rc.csv_to_dict(csv_path)
+    assert [bl.load_row(data) for _, _, data in records] == rows
+
+    raw_rows = [r async for r in rc.iter_csv_rows(csv_path, typed=False)]
+    assert [h for _, h, _ in records] == [bl.hash_row(r, pattern) for r in raw_rows]
+    assert records[0][0]["INDEX"] == "1"
+    assert "MESSAGE" not in records[0][0]
+
+
+async def test_compile_baseline_cache(csv_path):
+    cache_path = bl.compile_baseline(csv_path, pattern)
+    mtime_ns = os.stat(cache_path).st_mtime_ns
+    assert bl.compile_baseline(csv_path, pattern) == cache_path
+    assert os.stat(cache_path).st_mtime_ns == mtime_ns
+
+    # an edit of the baseline invalidates its cache
+    with open(csv_path) as f:
+        text = f.read()
+    with open(csv_path, "w") as f:
+        f.write(
+            text.replace("not found,,2,3,GET,404,404", "not found,,2,3,GET,404,5000")
+        )
+
+    records = [r async for r in bl.iter_baseline(csv_path, fields)]
+    assert bl.load_row(records[-1][2])["ACTUAL_CODE"] == 5000
+
+
+async def test_baseline_cache_is_json(csv_path):
+    cache_path = bl.get_cache_path(csv_path)
+    os.makedirs(os.path.dirname(cache_path))
+    # a cache from an older version is rebuilt rather than loaded
+    with open(cache_path, "wb") as f:
+        pickle.dump({"version": 1}, f)
+
+    records = [r async for r in bl.iter_baseline(csv_path, fields)]
+    with open(cache_path, "rb") as f:
+        frames = [orjson.loads(line) for line in f]
+    assert frames[0]["version"] == bl.VERSION
+    assert sum(len(chunk) for chunk in frames[1:]) == len(records)
+    assert isinstance(records[0][1], bytes)
+
+
+def test_hash_row():
+    row = {"INDEX": "1", "ACTUAL_CODE": "200", "MESSAGE": "{}", "BODY": "{}"}
+    row_hash = bl.hash_row(row, pattern)
+
+    assert bl.hash_row({**row, "INDEX": "2"}, pattern) == row_hash
+    assert bl.hash_row({**row, "ACTUAL_CODE": "500"}, pattern) != row_hash
+    # a nested key of another column could be compared so it's hashed too
+    assert bl.hash_row({**row, "BODY": "{'MESSAGE': 1}"}, pattern) != row_hash
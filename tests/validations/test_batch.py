@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copy
+
+import orjson
+import pytest
+
+import quickbolt.reporting.response_csv as rc
+from quickbolt.validations.__main__ import main
+from quickbolt.validations.batch import find_report_pairs, validate_reports
+
+pytestmark = pytest.mark.validations
+
+data_dir = os.path.dirname(__file__)
+
+
+@pytest.fixture()
+def trees(tmp_path):
+    run_info_dir = tmp_path / "run_info"
+    report_dir = run_info_dir / "run_logs" / "api" / "pass"
+    report_dir.mkdir(parents=True)
+    copy(f"{data_dir}/get_example.csv", report_dir)
+    copy(f"{data_dir}/get_example_scrubbed.csv", report_dir)
+    copy(f"{data_dir}/get_example_mismatch.csv", report_dir / "mismatch.csv")
+    copy(
+        f"{data_dir}/get_example_scrubbed_mismatch.csv",
+        report_dir / "mismatch_scrubbed.csv",
+    )
+    copy(f"{data_dir}/get_example_scrubbed.csv", report_dir / "orphan_scrubbed.csv")
+
+    validations_dir = tmp_path / "validations"
+    refs_dir = validations_dir / "api" / "pytest"
+    refs_dir.mkdir(parents=True)
+    refs_path = f"{data_dir}/validations/pytest"
+    copy(f"{refs_path}/get_example_scrubbed.csv", refs_dir)
+    copy(
+        f"{refs_path}/get_example_scrubbed_mismatch.csv",
+        refs_dir / "mismatch_scrubbed.csv",
+    )
+    return str(run_info_dir), str(validations_dir)
+
+
+def test_find_report_pairs(trees):
+    run_info_dir, validations_dir = trees
+    pairs = {
+        os.path.basename(report): ref and os.path.relpath(ref, validations_dir)
+        for report, ref in find_report_pairs(run_info_dir, validations_dir)
+    }
+    assert pairs == {
+        "get_example_scrubbed.csv": "api/pytest/get_example_scrubbed.csv",
+        "mismatch_scrubbed.csv": "api/pytest/mismatch_scrubbed.csv",
+        "orphan_scrubbed.csv": None,
+    }
+
+
+async def test_validate_reports(trees):
+    run_info_dir, validations_dir = trees
+    with ThreadPoolExecutor(2) as executor:
+        summary = await validate_reports(
+            run_info_dir, validations_dir, executor=executor
+        )
+
+    assert (summary["reports"], summary["passed"], summary["failed"]) == (3, 1, 2)
+    assert summary["missing_references"] == 1
+
+    results = {os.path.basename(r["report"]): r for r in summary["results"]}
+    result = results["mismatch_scrubbed.csv"]
+    assert result["mismatches"] == 1
+    assert result["error_file"] == (
+        f"{run_info_dir}/run_errors/api/mismatch_errors.csv"
+    )
+    error_rows = await rc.read_csv(result["error_file"])
+    assert ["error_values"] in [r[:1] for r in error_rows]
+
+    with open(f"{run_info_dir}/run_errors/validation_summary.json", "rb") as f:
+        assert orjson.loads(f.read()) == summary
+
+
+def test_main(trees, capsys):
+    run_info_dir, validations_dir = trees
+    summary_path = f"{run_info_dir}/summary.json"
+    assert (
+        main(
+            [run_info_dir, validations_dir, "--workers", "2", "--summary", summary_path]
+        )
+        == 1
+    )
+
+    output = capsys.readouterr().out
+    assert "Validated 3 reports, 1 passed and 2 failed." in output
+    assert os.path.exists(summary_path)
+
+    assert (
+        main(
+            [
+                run_info_dir,
+                validations_dir,
+                "--skipped-keys",
+                "ACTUAL_CODE",
+                "--summary",
+                summary_path,
+            ]
+        )
+        == 1
+    )
+    with open(summary_path, "rb") as f:
+        assert orjson.loads(f.read())["failed"] == 1
@@ -0,0 +1,96 @@
+import pytest
+
+import quickbolt.validations.schema as sch
+
+pytestmark = pytest.mark.validations
+
+pytest.importorskip("fastjsonschema")
+
+schema = {
+    "type": "object",
+    "required": ["id", "name", "tags"],
+    "additionalProperties": False,
+    "definitions": {"tag": {"enum": ["a", "b"]}},
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "name": {"type": "string", "minLength": 1, "pattern": "^[a-z]+$"},
+        "tags": {
+            "type": "array",
+            "items": {"$ref": "#/definitions/tag"},
+            "maxItems": 2,
+            "uniqueItems": True,
+        },
+        "score": {"anyOf": [{"type": "null"}, {"type": "number", "maximum": 10}]},
+        "pair": {"type": "array", "items": [{"type": "string"}, {"type": "integer"}]},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "value, error",
+    [
+        ({"id": 1, "name": "abc", "tags": ["a"], "score": None}, None),
+        ({"id": 1, "name": "abc", "tags": [], "score": 9.5, "pair": ["a", 1]}, None),
+        ([], "data must be object"),
+        ({"id": 1, "name": "abc"}, "data must contain ['tags'] properties"),
+        (
+            {"id": 1, "name": "abc", "tags": [], "other": 1},
+            "data must not contain {'other'} properties",
+        ),
+        (
+            {"id": 0, "name": "abc", "tags": []},
+            "data.id must be bigger than or equal to 1",
+        ),
+        (
+            {"id": 1, "name": "ABC", "tags": []},
+            "data.name must match pattern ^[a-z]+$",
+        ),
+        (
+            {"id": 1, "name": "abc", "tags": ["a", "c"]},
+            "data.tags[1] must be one of ['a', 'b']",
+        ),
+        (
+            {"id": 1, "name": "abc", "tags": [], "pair": ["a", "b"]},
+            "data.pair[1] must be integer",
+        ),
+    ],
+)
+def test_validate(value, error):
+    assert sch.validate(value, schema) == error
+
+
+def test_validate_invalid_schema():
+    with pytest.raises(ValueError):
+        sch.validate({}, {"type": "unknown"})
+
+
+def test_schema_cache():
+    cache = sch.SchemaCache(maxsize=1)
+    schema = {"type": "object", "required": []}
+    for _ in range(3):
+        sch.validate({}, schema, cache)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # an equal schema that's another object, keys in any order, is a hit
+    sch.validate({}, {"required": [], "type": "object"}, cache)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    sch.validate({}, {"type": "object", "required": ["id"]}, cache)
+    assert len(cache.checks) == 1
+    assert cache.misses == 2
+
+
+def test_validate_response():
+    _return = {"message": {"id": 1}}
+    assert sch.validate_response(_return, None) == {"message": {"id": 1}}
+
+    sch.validate_response(_return, {"required": ["id"]})
+    assert _return["schema_mismatch"] == ""
+    assert _return["schema_error"] == ""
+
+    sch.validate_response(_return, {"required": ["name"]})
+    assert _return["schema_mismatch"] == "X"
+    assert _return["schema_error"] == "data must contain ['name'] properties"
+
+    sch.validate_response(_return, {"type": "unknown"})
+    assert _return["schema_error"].startswith("The schema is invalid")
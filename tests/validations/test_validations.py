@@ -1,3 +1,4 @@
+import csv
 import os
 
 import pytest
@@ -66,6 +67,52 @@ async def test_validate_references_mismatch_not_safe():
     await Validations(root_dir=pytest.root_dir).logging.delete_run_info()
 
 
+def write_reordered_refs(dir_path, name, inserted_row=None):
+    with open(f"{pytest.root_dir}/{name}", newline="") as f:
+        header, *rows = [r for r in csv.reader(f) if r]
+
+    # the first request of the second batch comes back last
+    rows = rows[:1] + rows[2:] + rows[1:2]
+    if inserted_row:
+        rows.insert(1, inserted_row)
+
+    path = f"{dir_path}/{name}"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows([header] + rows)
+    return path
+
+
+async def test_validate_references_aligned_by_key(tmp_path):
+    validations = Validations(root_dir=pytest.root_dir)
+    actual_path = write_reordered_refs(tmp_path, "get_example_scrubbed_mismatch.csv")
+    write_reordered_refs(tmp_path, "get_example_mismatch.csv")
+
+    mismatches = await validations.validate_references(actual_path)
+    assert len(mismatches) == 1
+    assert mismatches[0]["values"] == [{"key": "ACTUAL_CODE", "d1": 404, "d2": 999}]
+    assert mismatches[0]["actual_refs"]["INDEX"] == 2
+    assert mismatches[0]["expected_refs"]["INDEX"] == 2
+    assert mismatches[0]["unscrubbed_refs"]["INDEX"] == 2
+
+    await validations.logging.delete_run_info()
+
+
+async def test_validate_references_inserted_row(tmp_path):
+    validations = Validations(root_dir=pytest.root_dir, debug=True)
+    inserted_row = ["new", "", "2", "4", "GET"]
+    actual_path = write_reordered_refs(
+        tmp_path, "get_example_scrubbed.csv", inserted_row
+    )
+
+    mismatches = await validations.validate_references(actual_path)
+    assert not mismatches
+
+    logs = "".join([line async for line in validations.logging.read_log_file()])
+    assert "('2', '4', 'GET', 'new')" in logs
+
+    await validations.logging.delete_run_info()
+
+
 async def test_fail_no_debug():
     validations = Validations(root_dir=pytest.root_dir)
     log_file_path = validations.logging.log_file_path